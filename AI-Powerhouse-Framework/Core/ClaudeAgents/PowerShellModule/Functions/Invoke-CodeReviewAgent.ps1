@@ -32,7 +32,7 @@ function Invoke-CodeReviewAgent {
     
     if ($FilePath) {
         if (Test-Path $FilePath) {
-            $fileContent = Get-Content $FilePath -Raw
+            $fileContent = Get-AgentFileContent $FilePath
             $fullPrompt += "`n`nReview this code:`n`nFile: $FilePath`n`n$fileContent"
         } else {
             Write-Error "File not found: $FilePath"
@@ -45,7 +45,7 @@ function Invoke-CodeReviewAgent {
     }
     
     try {
-        $response = claude $fullPrompt
+        $response = Invoke-AgentClaude -AgentName "CodeReview" $fullPrompt
         Write-Host $response
         
         Write-AgentLog -AgentName "CodeReview" -FilePath $FilePath -Prompt $Prompt -Response $response
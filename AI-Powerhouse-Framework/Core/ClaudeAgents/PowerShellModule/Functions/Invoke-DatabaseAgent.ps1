@@ -55,7 +55,7 @@ function Invoke-DatabaseAgent {
         Write-Host ""
         
         # Execute Claude with the agent prompt
-        $Response = claude $AgentPrompt $FullQuery
+        $Response = Invoke-AgentClaude -AgentName "Database" $AgentPrompt $FullQuery
         
         Write-Host "Database Agent Response:" -ForegroundColor Green
         Write-Host $Response
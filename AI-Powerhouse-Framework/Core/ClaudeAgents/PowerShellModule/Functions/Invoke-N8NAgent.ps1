@@ -64,7 +64,7 @@ Please provide a comprehensive n8n workflow solution following your established
         Write-Host ""
         
         # Execute Claude with the agent prompt
-        $Response = claude $AgentPrompt $FullQuery
+        $Response = Invoke-AgentClaude -AgentName "N8N" $AgentPrompt $FullQuery
         
         Write-Host "N8N Agent Response:" -ForegroundColor Green
         Write-Host $Response
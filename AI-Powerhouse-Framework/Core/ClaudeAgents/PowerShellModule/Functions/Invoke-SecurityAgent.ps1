@@ -35,7 +35,7 @@ function Invoke-SecurityAgent {
     
     if ($FilePath) {
         if (Test-Path $FilePath) {
-            $fileContent = Get-Content $FilePath -Raw
+            $fileContent = Get-AgentFileContent $FilePath
             $fullPrompt += "`n`nFile: $FilePath`n`n$fileContent"
         } else {
             Write-Error "File not found: $FilePath"
@@ -48,7 +48,7 @@ function Invoke-SecurityAgent {
     }
     
     try {
-        $response = claude $fullPrompt
+        $response = Invoke-AgentClaude -AgentName "Security" $fullPrompt
         Write-Host $response
         
         # Log interaction
@@ -40,7 +40,7 @@ function Invoke-TestingAgent {
     
     if ($FilePath) {
         if (Test-Path $FilePath) {
-            $fileContent = Get-Content $FilePath -Raw
+            $fileContent = Get-AgentFileContent $FilePath
             $fullPrompt += "`n`nGenerate tests for this code:`n`nFile: $FilePath`n`n$fileContent"
         } else {
             Write-Error "File not found: $FilePath"
@@ -53,7 +53,7 @@ function Invoke-TestingAgent {
     }
     
     try {
-        $response = claude $fullPrompt
+        $response = Invoke-AgentClaude -AgentName "Testing" $fullPrompt
         Write-Host $response
         
         Write-AgentLog -AgentName "Testing" -FilePath $FilePath -Prompt $Prompt -Response $response
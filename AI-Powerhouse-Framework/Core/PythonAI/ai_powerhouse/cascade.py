@@ -0,0 +1,239 @@
+"""
+Small-to-large model cascades with cheap answer validation
+
+A cascade sends a prompt to a fast, cheap model first and only escalates to a
+larger model when the answer fails a validator. Validators are callables
+``check(prompt, response, resample)`` returning None when the answer is
+acceptable, or a short reason for escalating. They may be coroutine
+functions; ``resample`` is an async callable that asks the same step again,
+for self-consistency style checks.
+"""
+
+import difflib
+import inspect
+import json
+import re
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from .deadline import Deadline
+from .response import AIResponse
+
+if TYPE_CHECKING:
+    from .core import AIPowerhouse
+
+
+Validator = Callable[[str, AIResponse, Callable[[], Awaitable[AIResponse]]], Any]
+
+REFUSAL_PATTERN = re.compile(
+    r"\b(I(?:'m| am) (?:sorry|unable|not able)|I can(?:'|no)t (?:help|assist|answer)|"
+    r"as an AI(?: language model)?|I don't have (?:access|enough information))",
+    re.IGNORECASE
+)
+
+TRUNCATED_REASONS = {"length", "max_tokens", "MAX_TOKENS"}
+
+
+def non_empty() -> Validator:
+    """Reject failed or blank answers"""
+    def check(prompt, response, resample):
+        if not response.ok:
+            return f"error: {response.error_type}"
+        if not response.text.strip():
+            return "empty answer"
+        return None
+    return check
+
+
+def complete() -> Validator:
+    """Reject answers cut off by the token limit"""
+    def check(prompt, response, resample):
+        return "truncated" if response.finish_reason in TRUNCATED_REASONS else None
+    return check
+
+
+def no_refusal(pattern: re.Pattern = REFUSAL_PATTERN) -> Validator:
+    """Reject answers where the small model declines or hedges"""
+    def check(prompt, response, resample):
+        return "refusal" if pattern.search(response.text[:400]) else None
+    return check
+
+
+def length(min_chars: int = 0, max_chars: Optional[int] = None) -> Validator:
+    """Reject answers outside a character range"""
+    def check(prompt, response, resample):
+        size = len(response.text.strip())
+        if size < min_chars:
+            return f"too short ({size} chars)"
+        if max_chars is not None and size > max_chars:
+            return f"too long ({size} chars)"
+        return None
+    return check
+
+
+def matches(pattern: str, flags: int = 0) -> Validator:
+    """Require the answer to match a regular expression (e.g. a label set)"""
+    compiled = re.compile(pattern, flags)
+    
+    def check(prompt, response, resample):
+        return None if compiled.search(response.text) else "format mismatch"
+    return check
+
+
+def json_format() -> Validator:
+    """Require the answer to be valid JSON, optionally inside a code fence"""
+    def check(prompt, response, resample):
+        text = response.text.strip()
+        fenced = re.match(r"^```(?:json)?\s*(.*?)\s*```$", text, re.DOTALL)
+        try:
+            json.loads(fenced.group(1) if fenced else text)
+        except ValueError:
+            return "invalid JSON"
+        return None
+    return check
+
+
+def self_consistency(samples: int = 1, threshold: float = 0.6) -> Validator:
+    """Resample the same model and require the answers to agree
+    
+    Costs extra small-model calls, so it belongs last in the validator list.
+    """
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+    
+    async def check(prompt, response, resample):
+        for _ in range(samples):
+            other = await resample()
+            if not other.ok:
+                return "resample failed"
+            ratio = difflib.SequenceMatcher(None, normalize(response.text), normalize(other.text)).ratio()
+            if ratio < threshold:
+                return f"inconsistent ({ratio:.2f})"
+        return None
+    return check
+
+
+DEFAULT_VALIDATORS = [non_empty(), complete(), no_refusal()]
+
+
+class CascadeStep:
+    """A provider/model pair in the cascade, cheapest first"""
+    
+    __slots__ = ("provider", "model")
+    
+    def __init__(self, provider: str, model: Optional[str] = None):
+        self.provider = provider
+        self.model = model
+    
+    def __repr__(self) -> str:
+        return f"CascadeStep({self.provider}, {self.model or 'default'})"
+
+
+class CascadeStats:
+    """Escalation rate and estimated latency saved by a cascade"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.escalations = 0
+        self.reasons: Dict[str, int] = {}
+        self.latency_saved = 0.0
+        self._final_latency = 0.0
+        self._final_calls = 0
+    
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalations / self.requests if self.requests else 0.0
+    
+    @property
+    def final_latency_mean(self) -> Optional[float]:
+        """Mean latency of the final step, the baseline for latency_saved; None until it has run"""
+        return self._final_latency / self._final_calls if self._final_calls else None
+    
+    def record(self, reasons: List[str], spent: float, final_latency: Optional[float]):
+        """Track one request
+        
+        spent is the time taken by the cheap steps. Latency saved by an answer
+        accepted early is estimated against the mean latency of the final step
+        as seen on escalated requests; escalations cost the time they wasted.
+        """
+        self.requests += 1
+        if final_latency is not None:
+            self.escalations += 1
+            self._final_latency += final_latency
+            self._final_calls += 1
+            self.latency_saved -= spent
+        elif self._final_calls:
+            self.latency_saved += self._final_latency / self._final_calls - spent
+        for reason in reasons:
+            key = reason.split(" ")[0].rstrip(":")
+            self.reasons[key] = self.reasons.get(key, 0) + 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "escalations": self.escalations,
+            "escalation_rate": self.escalation_rate,
+            "latency_saved": self.latency_saved,
+            "final_latency_mean": self.final_latency_mean,
+            "reasons": dict(self.reasons),
+        }
+
+
+class Cascade:
+    """Try cheap steps first and escalate only when validators reject the answer"""
+    
+    def __init__(self, ai: "AIPowerhouse", steps: Sequence[CascadeStep],
+                 validators: Optional[List[Validator]] = None):
+        if not steps:
+            raise ValueError("A cascade needs at least one step")
+        self.ai = ai
+        self.steps = list(steps)
+        self.validators = DEFAULT_VALIDATORS if validators is None else validators
+        self.stats = CascadeStats()
+    
+    async def _validate(self, prompt: str, response: AIResponse,
+                        resample: Callable[[], Awaitable[AIResponse]],
+                        validators: List[Validator]) -> Optional[str]:
+        for validator in validators:
+            reason = validator(prompt, response, resample)
+            if inspect.isawaitable(reason):
+                reason = await reason
+            if reason:
+                return reason
+        return None
+    
+    async def run(self, prompt: str, validators: Optional[List[Validator]] = None,
+                  **options) -> AIResponse:
+        """Answer with the first step whose response passes every validator
+        
+        A timeout (or deadline) option bounds the whole cascade, escalations
+        included, rather than each step.
+        """
+        deadline = Deadline.within(options.pop("timeout", None), options.pop("deadline", None))
+        if deadline is not None:
+            options["deadline"] = deadline
+        validators = self.validators if validators is None else validators
+        reasons: List[str] = []
+        start = time.perf_counter()
+        for index, step in enumerate(self.steps):
+            step_options = dict(options)
+            if step.model:
+                step_options["model"] = step.model
+            
+            def resample(step=step, step_options=step_options):
+                return self.ai.ask_provider(step.provider, prompt, **step_options)
+            
+            if index == len(self.steps) - 1:
+                spent = time.perf_counter() - start
+                response = await resample()
+                final_latency = time.perf_counter() - start - spent if reasons else None
+                break
+            response = await resample()
+            reason = await self._validate(prompt, response, resample, validators)
+            if reason is None:
+                spent, final_latency = time.perf_counter() - start, None
+                break
+            reasons.append(reason)
+        
+        self.stats.record(reasons, spent, final_latency)
+        return response
@@ -0,0 +1,150 @@
+"""
+Consensus selection across provider responses without an extra LLM call
+"""
+
+import difflib
+import re
+from typing import Dict, List, Mapping, Optional, Set, Tuple, Union
+
+from .response import AIResponse
+from .similarity import jaccard, line_shingles, shingles, similarity_matrix
+
+
+CODE_BLOCK = re.compile(r"```([\w+-]*)[^\n]*\n(.*?)```", re.DOTALL)
+
+
+def split_code(text: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """Separate prose from fenced code blocks, returning (prose, [(lang, code)])"""
+    blocks = [(lang.lower(), code) for lang, code in CODE_BLOCK.findall(text)]
+    return CODE_BLOCK.sub(" ", text), blocks
+
+
+def _features(text: str) -> Tuple[Set[int], Optional[Set[int]]]:
+    """Prose shingles and, if the text has code blocks, code line shingles"""
+    prose, blocks = split_code(text)
+    code = line_shingles("\n".join(code for _, code in blocks)) if blocks else None
+    return shingles(prose), code
+
+
+def _feature_similarity(a: Tuple[Set[int], Optional[Set[int]]],
+                        b: Tuple[Set[int], Optional[Set[int]]], code_weight: float) -> float:
+    prose = jaccard(a[0], b[0])
+    if a[1] is None and b[1] is None:
+        return prose
+    code = jaccard(a[1], b[1]) if a[1] is not None and b[1] is not None else 0.0
+    return (1 - code_weight) * prose + code_weight * code
+
+
+def response_similarity(a: str, b: str, code_weight: float = 0.5) -> float:
+    """Similarity of two answers, comparing code blocks line by line
+    
+    Prose is compared on word shingles. When both answers contain code, the
+    code is compared on whitespace-insensitive lines and weighted by
+    code_weight, so formatting differences in code do not hide agreement.
+    """
+    return _feature_similarity(_features(a), _features(b), code_weight)
+
+
+def code_diff(a: str, b: str, name_a: str = "a", name_b: str = "b") -> str:
+    """Unified diff of the code blocks of two answers (the whole text if neither has code)"""
+    _, code_a = split_code(a)
+    _, code_b = split_code(b)
+    if not code_a and not code_b:
+        left, right = a.splitlines(), b.splitlines()
+    else:
+        left = [line for _, code in code_a for line in code.splitlines()]
+        right = [line for _, code in code_b for line in code.splitlines()]
+    return "\n".join(difflib.unified_diff(left, right, name_a, name_b, lineterm=""))
+
+
+class ConsensusResult:
+    """Pairwise similarities and the answer that agrees most with the others"""
+    
+    def __init__(self, names: List[str], matrix: List[List[float]],
+                 responses: Dict[str, AIResponse], failed: List[str]):
+        self.names = names
+        self.matrix = matrix
+        self.responses = responses
+        self.failed = failed
+    
+    def similarity(self, a: str, b: str) -> float:
+        return self.matrix[self.names.index(a)][self.names.index(b)]
+    
+    @property
+    def scores(self) -> Dict[str, float]:
+        """Mean similarity of each answer to every other answer"""
+        count = len(self.names)
+        if count < 2:
+            return {name: 1.0 for name in self.names}
+        return {
+            name: (sum(self.matrix[i]) - 1.0) / (count - 1)
+            for i, name in enumerate(self.names)
+        }
+    
+    @property
+    def winner(self) -> Optional[str]:
+        """The medoid answer; ties go to the earlier provider"""
+        scores = self.scores
+        return max(self.names, key=lambda name: scores[name]) if scores else None
+    
+    @property
+    def consensus(self) -> Optional[AIResponse]:
+        return self.responses[self.winner] if self.winner else None
+    
+    @property
+    def agreement(self) -> float:
+        """Mean pairwise similarity of all answers"""
+        count = len(self.names)
+        if count < 2:
+            return 1.0 if count else 0.0
+        pairs = [self.matrix[i][j] for i in range(count) for j in range(i + 1, count)]
+        return sum(pairs) / len(pairs)
+    
+    def outliers(self, threshold: float = 0.2) -> List[str]:
+        """Answers whose mean similarity to the others is below threshold"""
+        return [name for name, score in self.scores.items() if score < threshold]
+    
+    def diff(self, a: str, b: Optional[str] = None) -> str:
+        """Diff an answer against another one, by default against the consensus"""
+        b = b or self.winner
+        return code_diff(self.responses[b].text, self.responses[a].text, b, a)
+    
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "winner": self.winner,
+            "agreement": self.agreement,
+            "scores": self.scores,
+            "matrix": {a: dict(zip(self.names, row)) for a, row in zip(self.names, self.matrix)},
+            "failed": self.failed,
+        }
+
+
+def compare_responses(responses: Mapping[str, Union[AIResponse, str]], code_weight: float = 0.5,
+                      method: str = "auto") -> ConsensusResult:
+    """Score successful responses against each other and pick a consensus
+    
+    Answers with code blocks use the code-aware similarity; otherwise the
+    shingle matrix from the similarity module is used, with MinHash for
+    larger sets (see similarity_matrix).
+    """
+    answers: Dict[str, AIResponse] = {}
+    failed = []
+    for name, response in responses.items():
+        if not isinstance(response, AIResponse):
+            response = AIResponse(text=str(response))
+        if response.ok and response.text.strip():
+            answers[name] = response
+        else:
+            failed.append(name)
+    
+    names = list(answers)
+    texts = [answers[name].text for name in names]
+    if any(CODE_BLOCK.search(text) for text in texts):
+        features = [_features(text) for text in texts]
+        matrix = [[1.0] * len(names) for _ in names]
+        for i in range(len(names)):
+            for j in range(i + 1, len(names)):
+                matrix[i][j] = matrix[j][i] = _feature_similarity(features[i], features[j], code_weight)
+    else:
+        matrix = similarity_matrix(texts, method)
+    return ConsensusResult(names, matrix, answers, failed)
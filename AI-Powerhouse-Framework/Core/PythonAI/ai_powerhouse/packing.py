@@ -0,0 +1,160 @@
+"""
+Micro-batching of short prompts into packed provider requests
+"""
+
+import asyncio
+import re
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from .response import AIResponse
+
+if TYPE_CHECKING:
+    from .core import AIPowerhouse
+
+
+SLOT_MARKER = re.compile(r"^\s*<<<(\d+)>>>\s*$", re.MULTILINE)
+
+PACK_INSTRUCTION = (
+    "You will receive {count} independent prompts, each introduced by a marker "
+    "line such as <<<1>>>. Answer every prompt separately and completely, as if "
+    "it were the only one. Start each answer with the same marker line as its "
+    "prompt and do not write anything outside the marked sections."
+)
+
+
+def pack_prompts(prompts: List[str]) -> str:
+    """Combine prompts into one request with numbered slots"""
+    slots = "\n\n".join(f"<<<{i}>>>\n{prompt.strip()}" for i, prompt in enumerate(prompts, 1))
+    return f"{PACK_INSTRUCTION.format(count=len(prompts))}\n\n{slots}"
+
+
+def unpack_reply(text: str, count: int) -> List[Optional[str]]:
+    """Split a packed reply into per-slot answers; missing or empty slots are None"""
+    answers: List[Optional[str]] = [None] * count
+    matches = list(SLOT_MARKER.finditer(text))
+    for i, match in enumerate(matches):
+        slot = int(match.group(1))
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        answer = text[match.end():end].strip()
+        if 1 <= slot <= count and answer and answers[slot - 1] is None:
+            answers[slot - 1] = answer
+    return answers
+
+
+def last_slot(text: str) -> Optional[int]:
+    """Number of the slot answered last in a packed reply, if any"""
+    matches = list(SLOT_MARKER.finditer(text))
+    return int(matches[-1].group(1)) if matches else None
+
+
+class PromptPacker:
+    """Gather short prompts arriving within a small window into one request
+    
+    Each caller awaits its own result. Prompts that are too long, or that
+    contain the slot marker syntax, are sent on their own; slots missing from
+    a packed reply, the slot a reply was cut off in (finish_reason "length"),
+    and every slot of a failed packed request, are retried individually.
+    """
+    
+    def __init__(self, ai: "AIPowerhouse", provider: str, window: float = 0.02,
+                 max_batch: int = 16, max_prompt_chars: int = 500):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.ai = ai
+        self.provider = provider
+        self.window = window
+        self.max_batch = max_batch
+        self.max_prompt_chars = max_prompt_chars
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.requests_sent = 0
+        self.prompts_packed = 0
+        self.slots_retried = 0
+    
+    def can_pack(self, prompt: str) -> bool:
+        return len(prompt) <= self.max_prompt_chars and "<<<" not in prompt
+    
+    async def submit(self, prompt: str) -> AIResponse:
+        """Queue a prompt and wait for its individual answer"""
+        if not self.can_pack(prompt):
+            self.requests_sent += 1
+            return await self.ai.ask_provider(self.provider, prompt)
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((prompt, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+    
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _single(self, prompt: str, future: asyncio.Future):
+        try:
+            self.requests_sent += 1
+            response = await self.ai.ask_provider(self.provider, prompt)
+        except Exception as e:
+            response = AIResponse.failure(e, provider=self.provider)
+        if not future.done():
+            future.set_result(response)
+    
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]):
+        if len(batch) == 1:
+            await self._single(*batch[0])
+            return
+        
+        prompts = [prompt for prompt, _ in batch]
+        self.requests_sent += 1
+        try:
+            packed = await self.ai.ask_provider(self.provider, pack_prompts(prompts))
+        except Exception as e:
+            packed = AIResponse.failure(e, provider=self.provider)
+        
+        answers = unpack_reply(packed.text, len(batch)) if packed.ok else [None] * len(batch)
+        truncated = packed.ok and packed.finish_reason == "length"
+        if truncated:
+            # The answer being written when the token limit hit is incomplete
+            slot = last_slot(packed.text)
+            if slot is not None and 1 <= slot <= len(batch):
+                answers[slot - 1] = None
+        answered_chars = sum(len(a) for a in answers if a) or 1
+        prompt_chars = sum(len(p) for p in prompts) or 1
+        retries = []
+        for (prompt, future), answer in zip(batch, answers):
+            if future.done():
+                # The caller was cancelled; resolving it again would raise
+                continue
+            if answer is None:
+                retries.append(self._single(prompt, future))
+                continue
+            self.prompts_packed += 1
+            # Usage is shared by the whole request; apportion it by size
+            future.set_result(AIResponse(
+                text=answer,
+                provider=packed.provider,
+                model=packed.model,
+                input_tokens=round(packed.input_tokens * len(prompt) / prompt_chars)
+                if packed.input_tokens is not None else None,
+                output_tokens=round(packed.output_tokens * len(answer) / answered_chars)
+                if packed.output_tokens is not None else None,
+                # Slots before the cut-off one ended at the next marker, not at the limit
+                finish_reason=None if truncated else packed.finish_reason,
+                started_at=packed.started_at,
+                latency=packed.latency
+            ))
+        self.slots_retried += len(retries)
+        if retries:
+            await asyncio.gather(*retries)
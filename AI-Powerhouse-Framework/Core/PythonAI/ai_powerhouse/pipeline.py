@@ -0,0 +1,198 @@
+"""
+Parallel dependency-graph executor for agent pipelines
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from . import tracing
+from .agents import AgentRegistry, get_registry
+from .core import AIPowerhouse
+from .minify import MinifiedSource, minify_file
+from .response import AIResponse
+
+
+# The agent-pipeline 'all' set: independent reviews run concurrently, while
+# tests and docs build on the code review findings.
+DEFAULT_PIPELINE = {
+    "security": [],
+    "review": [],
+    "performance": [],
+    "electronics": [],
+    "testing": ["review"],
+    "docs": ["review"],
+}
+
+
+def read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+class PipelineNode:
+    """An agent in the pipeline and the nodes whose output it needs"""
+    
+    __slots__ = ("name", "agent", "depends_on", "prompt", "provider")
+    
+    def __init__(self, name: str, agent: Optional[str] = None,
+                 depends_on: Optional[Sequence[str]] = None, prompt: Optional[str] = None,
+                 provider: Optional[str] = None):
+        self.name = name
+        self.agent = agent or name
+        self.depends_on = list(depends_on or [])
+        self.prompt = prompt
+        self.provider = provider
+
+
+class PipelineResult:
+    """Responses and timings of a pipeline run"""
+    
+    def __init__(self):
+        self.responses: Dict[str, AIResponse] = {}
+        self.timings: Dict[str, tuple] = {}
+        self.elapsed = 0.0
+        self.context: Optional[MinifiedSource] = None
+    
+    @property
+    def ok(self) -> bool:
+        return all(response.ok for response in self.responses.values())
+
+
+class AgentPipeline:
+    """Run agents as a dependency graph
+    
+    Nodes without a path between them run concurrently, the target file is
+    read once and shared, and each node receives the output of the nodes it
+    depends on. Total latency is bounded by the critical path rather than the
+    sum of all agents. The file is minified unless minify is False; line
+    numbers in the returned findings refer to the original file.
+    """
+    
+    def __init__(self, nodes: List[PipelineNode], ai: Optional[AIPowerhouse] = None,
+                 registry: Optional[AgentRegistry] = None,
+                 max_concurrency: Optional[int] = None, minify: bool = True):
+        self.nodes = {node.name: node for node in nodes}
+        if len(self.nodes) != len(nodes):
+            raise ValueError("Pipeline node names must be unique")
+        self.ai = ai or AIPowerhouse()
+        self.registry = registry or get_registry()
+        self.max_concurrency = max_concurrency
+        self.minify = minify
+        unknown = [node.agent for node in nodes if node.agent not in self.registry]
+        if unknown:
+            raise ValueError(f"Unknown agents in pipeline: {', '.join(unknown)}")
+        self.order = self._topological_order()
+    
+    @classmethod
+    def default(cls, agents: Optional[List[str]] = None, provider: Optional[str] = None,
+                **kwargs) -> "AgentPipeline":
+        """Build the standard pipeline, optionally restricted to some agents"""
+        selected = list(DEFAULT_PIPELINE) if not agents or "all" in agents else agents
+        nodes = [
+            PipelineNode(
+                name,
+                depends_on=[d for d in DEFAULT_PIPELINE.get(name, []) if d in selected],
+                provider=provider
+            )
+            for name in selected
+        ]
+        return cls(nodes, **kwargs)
+    
+    def _topological_order(self) -> List[str]:
+        for node in self.nodes.values():
+            missing = [d for d in node.depends_on if d not in self.nodes]
+            if missing:
+                raise ValueError(f"Node '{node.name}' depends on unknown nodes: {', '.join(missing)}")
+        
+        remaining = {name: set(node.depends_on) for name, node in self.nodes.items()}
+        order = []
+        while remaining:
+            ready = sorted(name for name, deps in remaining.items() if not deps)
+            if not ready:
+                raise ValueError(f"Pipeline has a dependency cycle between: {', '.join(sorted(remaining))}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+    
+    def _node_prompt(self, node: PipelineNode, prompt: Optional[str],
+                     upstream: Dict[str, AIResponse]) -> Optional[str]:
+        parts = [p for p in (prompt, node.prompt) if p]
+        findings = [
+            f"## {name} agent\n{response.text}"
+            for name, response in upstream.items() if response.ok
+        ]
+        if findings:
+            parts.append("Findings from earlier agents in this pipeline:\n\n" + "\n\n".join(findings))
+        return "\n\n".join(parts) or None
+    
+    async def run(self, file_path: Optional[str] = None, prompt: Optional[str] = None,
+                  on_result: Optional[Callable[[str, AIResponse], None]] = None) -> PipelineResult:
+        """Execute the pipeline on a file and/or prompt"""
+        attributes = {"pipeline.nodes": self.order, "code.filepath": file_path}
+        with tracing.span("pipeline", attributes=attributes) as span:
+            result = await self._run(file_path, prompt, on_result)
+            span.set_attribute("pipeline.failed", [n for n, r in result.responses.items() if not r.ok])
+        return result
+    
+    async def _run(self, file_path: Optional[str], prompt: Optional[str],
+                   on_result: Optional[Callable[[str, AIResponse], None]]) -> PipelineResult:
+        result = PipelineResult()
+        start = time.perf_counter()
+        
+        # Shared file context, read and minified once for every agent
+        content = None
+        if file_path is not None:
+            with tracing.span("pipeline.context", attributes={"code.filepath": file_path}):
+                if self.minify:
+                    result.context = await asyncio.to_thread(minify_file, file_path)
+                    content = result.context.text
+                else:
+                    content = await asyncio.to_thread(read_text, file_path)
+        # Downstream agents see the minified text, so they get findings as written;
+        # the results carry line numbers mapped back to the original file
+        raw: Dict[str, AIResponse] = {}
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        tasks: Dict[str, asyncio.Task] = {}
+        
+        async def execute(node: PipelineNode) -> AIResponse:
+            if node.depends_on:
+                await asyncio.gather(*(tasks[d] for d in node.depends_on))
+            upstream = {d: raw[d] for d in node.depends_on}
+            agent = self.registry.get(node.agent)
+            message = agent.build_prompt(self._node_prompt(node, prompt, upstream), file_path, content)
+            
+            node_start = time.perf_counter() - start
+            try:
+                with tracing.span(f"pipeline.node {node.name}", attributes={"pipeline.depends_on": node.depends_on}):
+                    if semaphore:
+                        async with semaphore:
+                            response = await agent.ask(self.ai, message, node.provider)
+                    else:
+                        response = await agent.ask(self.ai, message, node.provider)
+            except Exception as e:
+                response = AIResponse.failure(e, provider=node.provider)
+            
+            raw[node.name] = response
+            if result.context is not None:
+                response = result.context.remap_response(response)
+            result.responses[node.name] = response
+            result.timings[node.name] = (node_start, time.perf_counter() - start)
+            if on_result:
+                on_result(node.name, response)
+            return response
+        
+        for name in self.order:
+            tasks[name] = asyncio.ensure_future(execute(self.nodes[name]))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            result.elapsed = time.perf_counter() - start
+        
+        return result
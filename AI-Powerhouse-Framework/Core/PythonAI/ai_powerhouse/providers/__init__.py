@@ -1,10 +1,26 @@
 """
 AI Provider interfaces and implementations
+
+Concrete providers are imported lazily so that importing this package does
+not pull in every SDK.
 """
 
+import importlib
+
 from .base import BaseProvider
-from .claude import ClaudeProvider
-from .gemini import GeminiProvider
-from .openai_provider import OpenAIProvider
+from .registry import ProviderMap, ProviderSpec, provider_specs
+
+_LAZY_PROVIDERS = {
+    "ClaudeProvider": ".claude",
+    "GeminiProvider": ".gemini",
+    "OpenAIProvider": ".openai_provider",
+    "OpenAICompatibleProvider": ".openai_compatible",
+}
+
+__all__ = ["BaseProvider", "ProviderMap", "ProviderSpec", "provider_specs", *_LAZY_PROVIDERS]
+
 
-__all__ = ["BaseProvider", "ClaudeProvider", "GeminiProvider", "OpenAIProvider"]
+def __getattr__(name: str):
+    if name in _LAZY_PROVIDERS:
+        return getattr(importlib.import_module(_LAZY_PROVIDERS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
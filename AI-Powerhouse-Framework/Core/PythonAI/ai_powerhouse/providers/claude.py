@@ -2,9 +2,12 @@
 Claude (Anthropic) AI Provider
 """
 
-import asyncio
-from typing import Optional
+import time
+from typing import Any, Callable, Dict, Optional
 from .base import BaseProvider
+from ..deadline import request_timeout
+from ..profiling import stage
+from ..response import AIResponse
 
 try:
     import anthropic
@@ -18,32 +21,94 @@ class ClaudeProvider(BaseProvider):
     def __init__(self, api_key: str, model: str = "claude-3-sonnet-20240229", **kwargs):
         super().__init__(api_key, model, **kwargs)
         self.client = None
+        self.async_client = None
         if anthropic:
             self.client = anthropic.Anthropic(api_key=api_key)
+            # Requests go through the async client so a cancelled call
+            # closes its HTTP request instead of tying up a thread
+            self.async_client = anthropic.AsyncAnthropic(api_key=api_key)
     
     @property
     def provider_name(self) -> str:
         return "Claude"
     
-    async def generate_response(self, prompt: str, **kwargs) -> str:
+    async def generate_response(self, prompt: str, **kwargs) -> AIResponse:
         """Generate response using Claude"""
         if not self.client:
             raise RuntimeError("Anthropic client not available. Install with: pip install anthropic")
         
+        n = kwargs.pop('n', 1)
+        if n > 1:
+            # The Messages API has no multi-choice option
+            return await self._generate_concurrently(prompt, n, **kwargs)
+        
+        model = kwargs.get('model') or self.model
+        started_at = time.time()
+        start = time.perf_counter()
         try:
-            # Claude expects messages format
-            message = await asyncio.to_thread(
-                self.client.messages.create,
-                model=self.model,
-                max_tokens=kwargs.get('max_tokens', 4000),
-                temperature=kwargs.get('temperature', 0.7),
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
+            # Network time and model generation: the SDK call covers both
+            with stage("request"):
+                message = await self.async_client.messages.create(**self._request(prompt, model, kwargs))
+            return self._response(message, started_at, start)
+        except Exception as e:
+            return AIResponse.failure(
+                e,
+                provider=self.provider_name,
+                model=model,
+                started_at=started_at,
+                latency=time.perf_counter() - start
             )
-            return message.content[0].text
+    
+    async def generate_stream(self, prompt: str, on_text: Callable[[str], None], **kwargs) -> AIResponse:
+        """Stream a Claude response, passing text to on_text as it arrives"""
+        if not self.client:
+            raise RuntimeError("Anthropic client not available. Install with: pip install anthropic")
+        
+        model = kwargs.get('model') or self.model
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            with stage("request"):
+                async with self.async_client.messages.stream(**self._request(prompt, model, kwargs)) as stream:
+                    async for text in stream.text_stream:
+                        on_text(text)
+                    message = await stream.get_final_message()
+            return self._response(message, started_at, start)
         except Exception as e:
-            return f"Error from Claude: {str(e)}"
+            return AIResponse.failure(
+                e,
+                provider=self.provider_name,
+                model=model,
+                started_at=started_at,
+                latency=time.perf_counter() - start
+            )
+    
+    def _request(self, prompt: str, model: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Messages API arguments; Claude keeps the system prompt out of the messages"""
+        request = {
+            "model": model,
+            "max_tokens": kwargs.get('max_tokens', 4000),
+            "temperature": kwargs.get('temperature', 0.7),
+            "messages": [*kwargs.get('history', ()), {"role": "user", "content": prompt}],
+        }
+        if kwargs.get('system'):
+            request['system'] = kwargs['system']
+        timeout = request_timeout(kwargs)
+        if timeout is not None:
+            request['timeout'] = timeout
+        return request
+    
+    def _response(self, message, started_at: float, start: float) -> AIResponse:
+        return AIResponse(
+            text=message.content[0].text if message.content else "",
+            provider=self.provider_name,
+            model=message.model,
+            input_tokens=message.usage.input_tokens,
+            output_tokens=message.usage.output_tokens,
+            finish_reason=message.stop_reason,
+            started_at=started_at,
+            latency=time.perf_counter() - start
+        )
     
     def validate_connection(self) -> bool:
         """Validate Claude API connection"""
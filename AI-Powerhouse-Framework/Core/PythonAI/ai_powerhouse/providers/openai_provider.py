@@ -2,9 +2,12 @@
 OpenAI Provider (including Codex)
 """
 
-import asyncio
-from typing import Optional
+import time
+from typing import Any, Callable, Dict, Optional
 from .base import BaseProvider
+from ..deadline import request_timeout
+from ..profiling import stage
+from ..response import AIResponse
 
 try:
     import openai
@@ -15,34 +18,126 @@ except ImportError:
 class OpenAIProvider(BaseProvider):
     """OpenAI provider for GPT models and Codex"""
     
-    def __init__(self, api_key: str, model: str = "gpt-4", **kwargs):
+    # Ask for token usage in the last chunk of streamed responses
+    stream_usage = True
+    
+    def __init__(self, api_key: str, model: str = "gpt-4", base_url: Optional[str] = None,
+                 headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None, **kwargs):
         super().__init__(api_key, model, **kwargs)
+        self.base_url = base_url
         self.client = None
+        self.async_client = None
         if openai:
-            self.client = openai.OpenAI(api_key=api_key)
+            client_options = {"api_key": api_key, "base_url": base_url, "default_headers": headers}
+            if timeout is not None:
+                client_options["timeout"] = timeout
+            self.client = openai.OpenAI(**client_options)
+            # Requests go through the async client so a cancelled call
+            # closes its HTTP request instead of tying up a thread
+            self.async_client = openai.AsyncOpenAI(**client_options)
     
     @property
     def provider_name(self) -> str:
         return "OpenAI"
     
-    async def generate_response(self, prompt: str, **kwargs) -> str:
+    async def generate_response(self, prompt: str, **kwargs) -> AIResponse:
         """Generate response using OpenAI"""
         if not self.client:
             raise RuntimeError("OpenAI client not available. Install with: pip install openai")
         
+        model = kwargs.get('model') or self.model
+        started_at = time.time()
+        start = time.perf_counter()
         try:
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=self.model,
-                max_tokens=kwargs.get('max_tokens', 4000),
-                temperature=kwargs.get('temperature', 0.7),
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
+            with stage("request"):
+                response = await self.async_client.chat.completions.create(
+                    # Native multi-choice: n candidates share one request and prompt
+                    n=kwargs.get('n', 1),
+                    **self._request(prompt, model, kwargs)
+                )
+            usage = response.usage
+            return AIResponse(
+                text=response.choices[0].message.content or "",
+                candidates=[choice.message.content or "" for choice in response.choices],
+                provider=self.provider_name,
+                model=response.model,
+                input_tokens=usage.prompt_tokens if usage else None,
+                output_tokens=usage.completion_tokens if usage else None,
+                finish_reason=response.choices[0].finish_reason,
+                started_at=started_at,
+                latency=time.perf_counter() - start
+            )
+        except Exception as e:
+            return AIResponse.failure(
+                e,
+                provider=self.provider_name,
+                model=model,
+                started_at=started_at,
+                latency=time.perf_counter() - start
+            )
+    
+    async def generate_stream(self, prompt: str, on_text: Callable[[str], None], **kwargs) -> AIResponse:
+        """Stream a chat completion, passing text to on_text as it arrives"""
+        if not self.client:
+            raise RuntimeError("OpenAI client not available. Install with: pip install openai")
+        
+        model = kwargs.get('model') or self.model
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            request = self._request(prompt, model, kwargs)
+            if self.stream_usage:
+                request['stream_options'] = {"include_usage": True}
+            parts = []
+            usage = None
+            finish_reason = None
+            with stage("request"):
+                stream = await self.async_client.chat.completions.create(stream=True, **request)
+                async with stream:
+                    async for chunk in stream:
+                        model = chunk.model or model
+                        usage = chunk.usage or usage
+                        if not chunk.choices:
+                            continue
+                        text = chunk.choices[0].delta.content
+                        if text:
+                            parts.append(text)
+                            on_text(text)
+                        finish_reason = chunk.choices[0].finish_reason or finish_reason
+            return AIResponse(
+                text="".join(parts),
+                provider=self.provider_name,
+                model=model,
+                input_tokens=usage.prompt_tokens if usage else None,
+                output_tokens=usage.completion_tokens if usage else None,
+                finish_reason=finish_reason,
+                started_at=started_at,
+                latency=time.perf_counter() - start
             )
-            return response.choices[0].message.content
         except Exception as e:
-            return f"Error from OpenAI: {str(e)}"
+            return AIResponse.failure(
+                e,
+                provider=self.provider_name,
+                model=model,
+                started_at=started_at,
+                latency=time.perf_counter() - start
+            )
+    
+    def _request(self, prompt: str, model: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Chat completions arguments shared by plain and streamed requests"""
+        messages = [*kwargs.get('history', ()), {"role": "user", "content": prompt}]
+        if kwargs.get('system'):
+            messages.insert(0, {"role": "system", "content": kwargs['system']})
+        request = {
+            "model": model,
+            "max_tokens": kwargs.get('max_tokens', 4000),
+            "temperature": kwargs.get('temperature', 0.7),
+            "messages": messages,
+        }
+        timeout = request_timeout(kwargs)
+        if timeout is not None:
+            request['timeout'] = timeout
+        return request
     
     def validate_connection(self) -> bool:
         """Validate OpenAI API connection"""
@@ -0,0 +1,255 @@
+"""
+Repository-wide incremental code analysis
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+from .core import AIPowerhouse
+from .minify import minify_source, skip_reason
+from .response import AIResponse
+
+
+ANALYSIS_PROMPT = (
+    "Analyze this code for issues, improvements, and best practices:\n\n"
+    "File: {path}\n\n{content}"
+)
+
+MANIFEST_NAME = ".ai-powerhouse-manifest.json"
+MANIFEST_VERSION = 1
+
+DEFAULT_EXTENSIONS = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".ps1", ".psm1", ".go", ".rs", ".java",
+    ".cs", ".c", ".h", ".cpp", ".hpp", ".rb", ".php", ".sql", ".sh", ".kt", ".swift",
+}
+
+SKIP_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", "dist",
+    "build", ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox", ".nox",
+}
+
+
+class FileAnalysis:
+    """Analysis outcome for a single file"""
+    
+    __slots__ = ("path", "digest", "results", "cached", "error", "tokens_saved")
+    
+    def __init__(self, path: str, digest: str, results: Optional[Dict[str, str]] = None,
+                 cached: bool = False, error: Optional[str] = None, tokens_saved: int = 0):
+        self.path = path
+        self.digest = digest
+        self.results = results or {}
+        self.cached = cached
+        self.error = error
+        self.tokens_saved = tokens_saved
+    
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RepositoryReport:
+    """Results of a repository analysis run"""
+    
+    def __init__(self, root: Path):
+        self.root = root
+        self.files: Dict[str, FileAnalysis] = {}
+        self.elapsed = 0.0
+    
+    @property
+    def analyzed(self) -> int:
+        return sum(1 for f in self.files.values() if not f.cached and not f.error)
+    
+    @property
+    def reused(self) -> int:
+        return sum(1 for f in self.files.values() if f.cached)
+    
+    @property
+    def failed(self) -> int:
+        return sum(1 for f in self.files.values() if f.error)
+    
+    @property
+    def tokens_saved(self) -> int:
+        """Estimated prompt tokens removed by minification in this run"""
+        return sum(f.tokens_saved for f in self.files.values())
+    
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "root": str(self.root),
+            "elapsed": self.elapsed,
+            "analyzed": self.analyzed,
+            "reused": self.reused,
+            "failed": self.failed,
+            "tokens_saved": self.tokens_saved,
+            "files": {path: f.to_dict() for path, f in sorted(self.files.items())},
+        }
+
+
+class RepositoryAnalyzer:
+    """Analyse every source file under a directory with bounded concurrency
+    
+    A content-hash manifest records the digest and successful results of every
+    file. Files whose size and mtime are unchanged are not even re-read, and
+    files whose content hash matches a previous run (including moved or copied
+    files) reuse the stored results without calling any provider.
+    """
+    
+    def __init__(
+        self,
+        ai: Optional[AIPowerhouse] = None,
+        providers: Optional[List[str]] = None,
+        concurrency: int = 4,
+        manifest_path: Optional[str] = None,
+        extensions: Optional[Set[str]] = None,
+        max_file_bytes: int = 200_000,
+        prompt_template: str = ANALYSIS_PROMPT,
+        minify: bool = True
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.ai = ai or AIPowerhouse()
+        self.providers = providers
+        self.concurrency = concurrency
+        self.manifest_path = manifest_path
+        self.extensions = extensions or DEFAULT_EXTENSIONS
+        self.max_file_bytes = max_file_bytes
+        self.prompt_template = prompt_template
+        self.minify = minify
+    
+    def discover(self, root: Path) -> Iterator[Path]:
+        """Yield analysable files under root, skipping VCS and build directories"""
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for filename in sorted(filenames):
+                path = Path(dirpath) / filename
+                if os.path.splitext(filename)[1].lower() not in self.extensions:
+                    continue
+                if skip_reason(path.relative_to(root).as_posix()):
+                    # Vendored, generated and lock files are not the repository's own code
+                    continue
+                yield path
+    
+    def _fingerprint(self) -> str:
+        """Identify the analysis setup so template or model changes invalidate results"""
+        providers = self.providers or self.ai.get_available_providers()
+        models = {name: self.ai.providers[name].model for name in providers if name in self.ai.providers}
+        setup = json.dumps(
+            {"prompt": self.prompt_template, "models": models, "minify": self.minify}, sort_keys=True
+        )
+        return hashlib.sha256(setup.encode("utf-8")).hexdigest()
+    
+    def _load_manifest(self, path: Path, fingerprint: str) -> Dict[str, Dict[str, object]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("fingerprint") != fingerprint:
+            return {}
+        return manifest.get("files", {})
+    
+    def _save_manifest(self, path: Path, fingerprint: str, entries: Dict[str, Dict[str, object]]):
+        manifest = {"version": MANIFEST_VERSION, "fingerprint": fingerprint, "files": entries}
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, sort_keys=True)
+        os.replace(tmp_path, path)
+    
+    async def analyze(
+        self,
+        root: str,
+        on_result: Optional[Callable[[FileAnalysis], None]] = None
+    ) -> RepositoryReport:
+        """Analyse a directory tree, reusing results for unchanged files"""
+        start = time.perf_counter()
+        root_path = Path(root).resolve()
+        manifest_path = Path(self.manifest_path) if self.manifest_path else root_path / MANIFEST_NAME
+        fingerprint = self._fingerprint()
+        previous = self._load_manifest(manifest_path, fingerprint)
+        by_digest = {entry["sha256"]: entry for entry in previous.values() if entry.get("results")}
+        
+        report = RepositoryReport(root_path)
+        entries: Dict[str, Dict[str, object]] = {}
+        pending = []
+        
+        for file_path in self.discover(root_path):
+            rel_path = file_path.relative_to(root_path).as_posix()
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            if stat.st_size > self.max_file_bytes:
+                continue
+            
+            entry = previous.get(rel_path)
+            content = None
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                digest = entry["sha256"]
+            else:
+                content = file_path.read_bytes()
+                digest = hashlib.sha256(content).hexdigest()
+            
+            entries[rel_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+            known = by_digest.get(digest)
+            if known:
+                entries[rel_path]["results"] = known["results"]
+                analysis = FileAnalysis(rel_path, digest, dict(known["results"]), cached=True)
+                report.files[rel_path] = analysis
+                if on_result:
+                    on_result(analysis)
+            else:
+                pending.append((rel_path, file_path, digest, content))
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def run(rel_path: str, file_path: Path, digest: str, content: Optional[bytes]):
+            async with semaphore:
+                if content is None:
+                    content = await asyncio.to_thread(file_path.read_bytes)
+                text = content.decode("utf-8", errors="replace")
+                tokens_saved = 0
+                context = None
+                if self.minify:
+                    context = minify_source(text, rel_path)
+                    text, tokens_saved = context.text, context.tokens_saved
+                prompt = self.prompt_template.format(path=rel_path, content=text)
+                responses = await self.ai.ask(prompt, self.providers)
+            if context is not None:
+                # Findings cite lines of the minified text; point them at the file
+                responses = {
+                    name: context.remap_response(r) if isinstance(r, AIResponse) else r
+                    for name, r in responses.items()
+                }
+            
+            if "error" in responses and len(responses) == 1:
+                analysis = FileAnalysis(
+                    rel_path, digest, error=str(responses["error"]), tokens_saved=tokens_saved
+                )
+            else:
+                failures = [f"{name}: {r.error}" for name, r in responses.items() if not r.ok]
+                analysis = FileAnalysis(
+                    rel_path,
+                    digest,
+                    {name: str(r) for name, r in responses.items()},
+                    error="; ".join(failures) or None,
+                    tokens_saved=tokens_saved
+                )
+                if not failures:
+                    # Only successful analyses are worth reusing
+                    entries[rel_path]["results"] = analysis.results
+            
+            report.files[rel_path] = analysis
+            if on_result:
+                on_result(analysis)
+        
+        try:
+            await asyncio.gather(*(run(*item) for item in pending))
+        finally:
+            self._save_manifest(manifest_path, fingerprint, entries)
+            report.elapsed = time.perf_counter() - start
+        
+        return report
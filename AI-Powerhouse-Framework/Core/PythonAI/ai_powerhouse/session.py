@@ -0,0 +1,136 @@
+"""
+Multi-turn chat sessions with a bounded, compacted history
+
+A session keeps recent turns verbatim and folds older ones into a short
+extractive summary once the history exceeds its token budget. Turns are
+folded several at a time, so the system prompt and summary - the start of
+every request - only change on compaction and provider-side prefix caching
+keeps working between compactions. Because the history is bounded, the
+request size and per-turn latency stay flat however long the session runs.
+"""
+
+import re
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .response import AIResponse
+
+if TYPE_CHECKING:
+    from .core import AIPowerhouse
+
+
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+CODE_BLOCK = re.compile(r"```.*?```", re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) without a tokenizer"""
+    return (len(text) + 3) // 4
+
+
+def lead(text: str, max_chars: int = 160) -> str:
+    """First sentence of a text, with code blocks elided and length capped"""
+    text = " ".join(CODE_BLOCK.sub("[code]", text).split())
+    sentence = SENTENCE_END.split(text, 1)[0]
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars - 3].rstrip() + "..."
+
+
+class Turn:
+    """One prompt and the reply it got"""
+    
+    __slots__ = ("prompt", "reply", "tokens")
+    
+    def __init__(self, prompt: str, reply: str):
+        self.prompt = prompt
+        self.reply = reply
+        self.tokens = estimate_tokens(prompt) + estimate_tokens(reply)
+    
+    def summary(self) -> str:
+        return f"- User: {lead(self.prompt)} Assistant: {lead(self.reply)}"
+    
+    def to_messages(self) -> List[Dict[str, str]]:
+        return [{"role": "user", "content": self.prompt}, {"role": "assistant", "content": self.reply}]
+
+
+class ChatSession:
+    """A conversation with one provider whose history stays within a token budget
+    
+    token_budget bounds the system prompt, summary and verbatim turns sent with
+    each request (the new prompt comes on top). When it is exceeded, the oldest
+    compact_turns turns are folded into the summary; the summary itself keeps
+    at most a quarter of the budget, dropping its oldest lines first. The
+    latest keep_turns turns are never folded, even if they alone exceed the
+    budget, so the model always sees the exchange it is following up on.
+    """
+    
+    def __init__(self, ai: "AIPowerhouse", provider_name: str, system: Optional[str] = None,
+                 token_budget: int = 4000, compact_turns: int = 4, keep_turns: int = 2):
+        if token_budget < 1 or compact_turns < 1 or keep_turns < 1:
+            raise ValueError("token_budget, compact_turns and keep_turns must be positive")
+        self.ai = ai
+        self.provider_name = provider_name
+        self.system = system
+        self.token_budget = token_budget
+        self.compact_turns = compact_turns
+        self.keep_turns = keep_turns
+        self.turns: List[Turn] = []
+        self.summary: List[str] = []
+        self.summarized_turns = 0
+        self.compactions = 0
+    
+    @property
+    def system_prompt(self) -> Optional[str]:
+        """The stable prefix: the system prompt followed by the summary"""
+        parts = [self.system] if self.system else []
+        if self.summary:
+            parts.append("\n".join([SUMMARY_HEADER] + self.summary))
+        return "\n\n".join(parts) or None
+    
+    @property
+    def history(self) -> List[Dict[str, str]]:
+        return [message for turn in self.turns for message in turn.to_messages()]
+    
+    @property
+    def tokens(self) -> int:
+        """Estimated tokens of context sent before each new prompt"""
+        prefix = self.system_prompt
+        return (estimate_tokens(prefix) if prefix else 0) + sum(turn.tokens for turn in self.turns)
+    
+    def _compact(self):
+        """Fold the oldest turns into the summary until the history fits the budget"""
+        while self.tokens > self.token_budget and len(self.turns) > self.keep_turns:
+            count = min(self.compact_turns, len(self.turns) - self.keep_turns)
+            folded = self.turns[:count]
+            del self.turns[:count]
+            self.summary.extend(turn.summary() for turn in folded)
+            self.summarized_turns += len(folded)
+            self.compactions += 1
+            while self.summary and estimate_tokens("\n".join(self.summary)) > self.token_budget // 4:
+                self.summary.pop(0)
+    
+    async def ask(self, prompt: str, **options) -> AIResponse:
+        """Send a prompt with the session history; successful turns join the history"""
+        if self.system_prompt:
+            options["system"] = self.system_prompt
+        response = await self.ai.ask_provider(self.provider_name, prompt, history=self.history, **options)
+        if response.ok:
+            self.turns.append(Turn(prompt, response.text))
+            self._compact()
+        return response
+    
+    def reset(self):
+        """Forget the conversation, keeping the system prompt"""
+        self.turns = []
+        self.summary = []
+        self.summarized_turns = 0
+        self.compactions = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider_name,
+            "turns": len(self.turns),
+            "summarized_turns": self.summarized_turns,
+            "compactions": self.compactions,
+            "tokens": self.tokens,
+            "token_budget": self.token_budget,
+        }
@@ -0,0 +1,162 @@
+"""
+Shadow traffic: mirror live requests to a candidate provider or model
+
+A ShadowMode copies a sample of the requests sent to one provider to a
+candidate in the background. The primary response is returned as soon as it
+is ready; shadow calls run as separate tasks under their own in-flight cap and
+are dropped, not queued, when the cap is reached. When the candidate has a
+scheduler they also wait there at batch priority, so they never take capacity
+from primary traffic. Each finished pair, including failed primary calls, is
+recorded for a side-by-side report.
+"""
+
+import asyncio
+import collections
+import random
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Set, Tuple
+
+from .consensus import response_similarity
+from .response import AIResponse
+from .scheduler import BATCH
+
+if TYPE_CHECKING:
+    from .core import AIPowerhouse
+
+
+def parse_target(target: str) -> Tuple[str, Optional[str]]:
+    """Split a "provider[:model]" shadow target"""
+    provider, _, model = target.partition(":")
+    return provider.strip(), model.strip() or None
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+class ShadowSample:
+    """One primary response paired with the candidate's answer to the same request"""
+    
+    __slots__ = ("primary", "shadow", "similarity")
+    
+    def __init__(self, primary: AIResponse, shadow: AIResponse):
+        self.primary = primary
+        self.shadow = shadow
+        self.similarity = (
+            response_similarity(primary.text, shadow.text) if primary.ok and shadow.ok else None
+        )
+
+
+class ShadowMode:
+    """Mirror sampled requests for one primary provider to a candidate
+    
+    candidate names the provider to mirror to (the primary itself when only
+    the model changes) and model optionally overrides its model. At most
+    max_concurrency shadow calls are in flight; the last max_samples pairs
+    are kept for the report.
+    """
+    
+    def __init__(self, ai: "AIPowerhouse", primary: str, candidate: Optional[str] = None,
+                 model: Optional[str] = None, sample_rate: float = 0.1, max_concurrency: int = 2,
+                 max_samples: int = 1000):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.ai = ai
+        self.primary = primary
+        self.candidate = candidate or primary
+        self.model = model
+        self.sample_rate = sample_rate
+        self.max_concurrency = max_concurrency
+        self.samples: Deque[ShadowSample] = collections.deque(maxlen=max_samples)
+        self.mirrored = 0
+        self.dropped = 0
+        self.unpaired = 0
+        self._tasks: Set[asyncio.Task] = set()
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+    
+    @property
+    def label(self) -> str:
+        return f"{self.candidate}:{self.model}" if self.model else self.candidate
+    
+    async def _call(self, prompt: str, kwargs: Dict[str, Any]) -> AIResponse:
+        options = dict(kwargs, priority=BATCH)
+        if self.model:
+            options["model"] = self.model
+        deadline = options.get("deadline")
+        try:
+            call = self.ai._call_provider(self.candidate, prompt, options, None)
+            # The candidate gets the primary's deadline, so shadows never outlive the request
+            return await (deadline.wait(call) if deadline else call)
+        except Exception as e:
+            return AIResponse.failure(e, provider=self.candidate, model=self.model)
+    
+    def mirror(self, prompt: str, kwargs: Dict[str, Any]) -> Optional[asyncio.Task]:
+        """Start a shadow call for a sampled request, or return None without waiting"""
+        if random.random() >= self.sample_rate or self.candidate not in self.ai.providers:
+            return None
+        if len(self._tasks) >= self.max_concurrency:
+            self.dropped += 1
+            return None
+        task = asyncio.ensure_future(self._call(prompt, kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.mirrored += 1
+        return task
+    
+    def pair(self, task: asyncio.Task, primary: Optional[AIResponse]):
+        """Record the pair once the shadow call finishes; never waits for it"""
+        def record(done: asyncio.Task):
+            if primary is None or done.cancelled():
+                self.unpaired += 1
+            elif done.result().error_type == "SchedulerFull":
+                self.dropped += 1
+            else:
+                self.samples.append(ShadowSample(primary, done.result()))
+        task.add_done_callback(record)
+    
+    async def drain(self):
+        """Wait for shadow calls still in flight (e.g. before shutdown or reporting)"""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+            # Let the pairing callbacks scheduled by the finished tasks run
+            await asyncio.sleep(0)
+    
+    def report(self) -> Dict[str, Any]:
+        """Paired latency, token and similarity statistics"""
+        def side(responses: List[AIResponse]) -> Dict[str, Any]:
+            latencies = [r.latency for r in responses if r.ok and r.latency is not None]
+            return {
+                "errors": sum(1 for r in responses if not r.ok),
+                "latency_mean": _mean(latencies),
+                "latency_p50": _percentile(latencies, 0.5),
+                "latency_p95": _percentile(latencies, 0.95),
+                "input_tokens_mean": _mean([r.input_tokens for r in responses if r.input_tokens is not None]),
+                "output_tokens_mean": _mean([r.output_tokens for r in responses if r.output_tokens is not None]),
+            }
+        
+        samples = list(self.samples)
+        similarities = [s.similarity for s in samples if s.similarity is not None]
+        return {
+            "primary": self.primary,
+            "candidate": self.label,
+            "sample_rate": self.sample_rate,
+            "mirrored": self.mirrored,
+            "dropped": self.dropped,
+            "unpaired": self.unpaired,
+            "pairs": len(samples),
+            "similarity_mean": _mean(similarities),
+            "similarity_p5": _percentile(similarities, 0.05),
+            "primary_stats": side([s.primary for s in samples]),
+            "candidate_stats": side([s.shadow for s in samples]),
+        }
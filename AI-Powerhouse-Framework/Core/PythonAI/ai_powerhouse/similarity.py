@@ -0,0 +1,172 @@
+"""
+Local text similarity: shingling, exact Jaccard and MinHash signatures
+
+Hashes are stable across processes (blake2b rather than the salted built-in
+hash) so signatures can be stored and compared later. numpy is used to
+vectorise signature computation when it is installed.
+"""
+
+import hashlib
+import re
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def stable_hash(value: str) -> int:
+    """64-bit hash that is identical in every process"""
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words and punctuation"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def shingles(text: str, k: int = 3) -> Set[int]:
+    """Hashed k-token shingles; short texts fall back to single tokens"""
+    tokens = tokenize(text)
+    if len(tokens) < k:
+        return {stable_hash(token) for token in tokens}
+    return {stable_hash(" ".join(tokens[i:i + k])) for i in range(len(tokens) - k + 1)}
+
+
+def line_shingles(code: str) -> Set[int]:
+    """Whitespace-insensitive line hashes, suited to comparing code"""
+    lines = (" ".join(line.split()) for line in code.splitlines())
+    return {stable_hash(line) for line in lines if line}
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    """Exact Jaccard similarity of two shingle sets (1.0 for two empty sets)"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """Fixed-size MinHash signatures approximating Jaccard similarity
+    
+    Each permutation is simulated by a universal hash (a * x + b) mod p over
+    the low 32 bits of the shingle hash. The coefficients are derived from
+    stable hashes, so the same num_perm always yields comparable signatures.
+    """
+    
+    def __init__(self, num_perm: int = 64, k: int = 3):
+        if num_perm < 1:
+            raise ValueError("num_perm must be at least 1")
+        self.num_perm = num_perm
+        self.k = k
+        self.coefficients = [
+            (stable_hash(f"minhash-a-{i}") % MAX_HASH + 1, stable_hash(f"minhash-b-{i}") & MAX_HASH)
+            for i in range(num_perm)
+        ]
+        if np is not None:
+            self._a = np.array([a for a, _ in self.coefficients], dtype=np.uint64)
+            self._b = np.array([b for _, b in self.coefficients], dtype=np.uint64)
+    
+    def signature_from_shingles(self, items: Iterable[int]) -> Tuple[int, ...]:
+        values = [value & MAX_HASH for value in items]
+        if not values:
+            return (MAX_HASH,) * self.num_perm
+        if np is not None:
+            # a, b and x all fit in 32 bits, so a * x + b cannot overflow uint64
+            hashes = np.array(values, dtype=np.uint64)[:, None]
+            mixed = (hashes * self._a + self._b) % np.uint64(MERSENNE_PRIME) & np.uint64(MAX_HASH)
+            return tuple(int(v) for v in mixed.min(axis=0))
+        return tuple(
+            min((a * value + b) % MERSENNE_PRIME & MAX_HASH for value in values)
+            for a, b in self.coefficients
+        )
+    
+    def signature(self, text: str) -> Tuple[int, ...]:
+        return self.signature_from_shingles(shingles(text, self.k))
+    
+    @staticmethod
+    def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+        """Estimated Jaccard similarity: the share of matching signature slots"""
+        if len(a) != len(b):
+            raise ValueError("Signatures must have the same length")
+        return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class OnePermutationHasher:
+    """MinHash signatures from a single hash per shingle (one-permutation hashing)
+    
+    Each shingle hash picks one of num_perm bins and only the bin minimum is
+    kept, so a signature costs one pass over the shingles instead of one per
+    slot. Empty bins borrow the value of the next filled bin (rotation
+    densification). Signatures compare with MinHasher.similarity but are not
+    interchangeable with MinHasher signatures.
+    """
+    
+    def __init__(self, num_perm: int = 64, k: int = 3):
+        if num_perm < 1:
+            raise ValueError("num_perm must be at least 1")
+        self.num_perm = num_perm
+        self.k = k
+    
+    def signature_from_shingles(self, items: Iterable[int]) -> Tuple[int, ...]:
+        size = self.num_perm
+        empty = MAX_HASH + 1
+        bins = [empty] * size
+        for value in items:
+            index = value % size
+            value >>= 32
+            if value < bins[index]:
+                bins[index] = value
+        if empty in bins:
+            if bins.count(empty) == size:
+                return (MAX_HASH,) * size
+            for index in range(size):
+                if bins[index] == empty:
+                    offset = 1
+                    while bins[(index + offset) % size] == empty:
+                        offset += 1
+                    # Distance-dependent offset keeps borrowed values distinct per bin
+                    bins[index] = (bins[(index + offset) % size] + offset * 0x9E3779B1) & MAX_HASH
+        return tuple(bins)
+    
+    def signature(self, text: str) -> Tuple[int, ...]:
+        return self.signature_from_shingles(shingles(text, self.k))
+
+
+def similarity_matrix(texts: Sequence[str], method: str = "auto", k: int = 3,
+                      hasher: Optional[MinHasher] = None) -> List[List[float]]:
+    """Pairwise similarity of texts
+    
+    method is "jaccard" (exact), "minhash" (fixed cost per pair), or "auto",
+    which uses exact Jaccard for a handful of texts and MinHash beyond that.
+    """
+    count = len(texts)
+    if method == "auto":
+        method = "jaccard" if count <= 8 else "minhash"
+    if method not in ("jaccard", "minhash"):
+        raise ValueError(f"Unknown similarity method: {method}")
+    
+    matrix = [[1.0] * count for _ in range(count)]
+    if method == "jaccard":
+        items = [shingles(text, k) for text in texts]
+        compare = jaccard
+    else:
+        hasher = hasher or MinHasher(k=k)
+        items = [hasher.signature(text) for text in texts]
+        compare = MinHasher.similarity
+        if np is not None and count > 1:
+            signatures = np.array(items, dtype=np.uint64)
+            agreement = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+            return agreement.tolist()
+    
+    for i in range(count):
+        for j in range(i + 1, count):
+            matrix[i][j] = matrix[j][i] = compare(items[i], items[j])
+    return matrix
@@ -0,0 +1,271 @@
+"""
+OpenTelemetry-compatible tracing spans with a local file exporter
+
+Spans are written as OTLP/JSON lines (one ``{"resourceSpans": [...]}``
+object per line), which the OpenTelemetry Collector's otlpjsonfile receiver
+and most trace viewers can import, so a run can be inspected offline without
+any tracing SDK installed. Trace context crosses process boundaries in the
+W3C ``TRACEPARENT`` environment variable: child processes started with
+child_env() - PowerShell agents, the claude CLI, nested Python runs - join
+the same trace and export to the same file (``AI_TRACE_FILE``).
+
+Tracing is off unless AI_TRACE_FILE is set or configure() is called. While it
+is off, span() returns a shared no-op context manager.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+TRACE_FILE_ENV = "AI_TRACE_FILE"
+TRACEPARENT_ENV = "TRACEPARENT"
+SERVICE_NAME = "ai-powerhouse"
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# OTLP span kinds and status codes
+KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class Span:
+    """One timed operation in a trace"""
+    
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns",
+                 "attributes", "status", "status_message")
+    
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None,
+                 kind: str = "internal", attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = {key: value for key, value in (attributes or {}).items() if value is not None}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+    
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+    
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+    
+    def set_error(self, message: str, error_type: Optional[str] = None):
+        self.status = STATUS_ERROR
+        self.status_message = message
+        if error_type:
+            self.attributes["error.type"] = error_type
+    
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+    
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e9
+    
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status, "message": self.status_message},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class NoopSpan:
+    """Stands in for a Span while tracing is off, so call sites need no checks"""
+    
+    __slots__ = ()
+    traceparent = None
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def set_error(self, message: str, error_type: Optional[str] = None):
+        pass
+
+
+class FileSpanExporter:
+    """Append finished spans to a file as OTLP/JSON lines
+    
+    Spans are buffered and written batch_size at a time (and at exit), each
+    batch as a single append so concurrent processes sharing the file do not
+    interleave their lines.
+    """
+    
+    def __init__(self, path: str, batch_size: int = 32, service_name: str = SERVICE_NAME):
+        self.path = Path(path).expanduser()
+        self.batch_size = batch_size
+        self.service_name = service_name
+        self._pending: List[Span] = []
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atexit.register(self.flush)
+    
+    def export(self, span: Span):
+        with self._lock:
+            self._pending.append(span)
+            if len(self._pending) < self.batch_size:
+                return
+            spans, self._pending = self._pending, []
+        self._write(spans)
+    
+    def flush(self):
+        with self._lock:
+            spans, self._pending = self._pending, []
+        if spans:
+            self._write(spans)
+    
+    def _write(self, spans: List[Span]):
+        record = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({
+                    "service.name": self.service_name,
+                    "process.pid": os.getpid(),
+                })},
+                "scopeSpans": [{
+                    "scope": {"name": "ai_powerhouse"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+_NOOP = NoopSpan()
+_DISABLED = contextlib.nullcontext(_NOOP)
+_current: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("trace_span", default=None)
+_exporter: Optional[FileSpanExporter] = None
+
+
+def configure(path: Optional[str]) -> Optional[FileSpanExporter]:
+    """Export spans to path (None turns tracing off); reconfiguring to the same path is a no-op"""
+    global _exporter
+    if path is None:
+        if _exporter is not None:
+            _exporter.flush()
+        _exporter = None
+    elif _exporter is None or _exporter.path != Path(path).expanduser():
+        if _exporter is not None:
+            _exporter.flush()
+        _exporter = FileSpanExporter(path)
+    return _exporter
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple]:
+    """(trace_id, parent span_id) from a W3C traceparent, or None if it is missing or malformed"""
+    match = TRACEPARENT.match((value or "").strip().lower())
+    return (match.group(1), match.group(2)) if match else None
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def _span(name: str, kind: str, attributes: Dict[str, Any]) -> Iterator[Span]:
+    parent = _current.get()
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        # A process started by a traced parent continues its trace
+        remote = parse_traceparent(os.environ.get(TRACEPARENT_ENV))
+        trace_id, parent_id = remote or (secrets.token_hex(16), None)
+    span = Span(name, trace_id, parent_id, kind, attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        if span.status != STATUS_ERROR:
+            span.set_error(str(e) or type(e).__name__, type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        span.end()
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(span)
+
+
+def span(name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None):
+    """Trace a block as a span (a child of the current one); yields a NoopSpan when tracing is off"""
+    if _exporter is None:
+        return _DISABLED
+    return _span(name, kind, attributes or {})
+
+
+def record_response(span: Span, response: Any):
+    """Set OpenTelemetry GenAI attributes (model, token usage, finish reason, error) from an AIResponse"""
+    if response is None:
+        return
+    span.set_attribute("gen_ai.response.model", response.model)
+    span.set_attribute("gen_ai.usage.input_tokens", response.input_tokens)
+    span.set_attribute("gen_ai.usage.output_tokens", response.output_tokens)
+    if response.finish_reason:
+        span.set_attribute("gen_ai.response.finish_reasons", [response.finish_reason])
+    if not response.ok:
+        span.set_error(response.error or "", response.error_type)
+
+
+def child_env(env: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+    """Environment for a subprocess that continues the current trace
+    
+    Returns None (inherit the environment unchanged) while tracing is off.
+    """
+    if _exporter is None:
+        return env
+    env = dict(os.environ if env is None else env)
+    env[TRACE_FILE_ENV] = str(_exporter.path)
+    parent = _current.get()
+    if parent is not None:
+        env[TRACEPARENT_ENV] = parent.traceparent
+    return env
+
+
+def flush():
+    if _exporter is not None:
+        _exporter.flush()
+
+
+configure(os.environ.get(TRACE_FILE_ENV) or None)
@@ -30,12 +30,13 @@ async def main():
     prompt = "Write a simple 'Hello, World!' function in Python"
     print(f"\nAsking all providers: '{prompt}'")
     
-    responses = await ai.ask(prompt)
-    
     print("\nResponses:")
-    for provider, response in responses.items():
+    async for provider, response in ai.ask_as_completed(prompt):
         print(f"\n--- {provider.title()} ---")
-        print(response[:200] + "..." if len(response) > 200 else response)
+        text = str(response)
+        print(text[:200] + "..." if len(text) > 200 else text)
+        if response.ok and response.latency is not None:
+            print(f"({response.model}, {response.latency:.2f}s, {response.total_tokens} tokens)")
 
 
 if __name__ == "__main__":
@@ -8,32 +8,205 @@ This module provides seamless integration between:
 Enables Python to call PowerShell agents and PowerShell to use Python AI providers.
 """
 
+import asyncio
+import contextlib
+import contextvars
+import functools
+import hashlib
+import shutil
 import subprocess
 import json
 import os
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 import logging
 
+DISCOVERY_CACHE_VERSION = 1
+
+POWERSHELL_CANDIDATES = [
+    "pwsh",  # PowerShell 7+ on Linux/macOS
+    "pwsh.exe",  # PowerShell 7+ in PATH
+    "powershell.exe",  # Windows PowerShell fallback
+    r"C:\Program Files\PowerShell\7\pwsh.exe",
+    r"C:\Program Files (x86)\PowerShell\7\pwsh.exe"
+]
+
+
+def _tracing():
+    """ai_powerhouse.tracing, or None while the package is not importable"""
+    try:
+        from ai_powerhouse import tracing
+    except ImportError:
+        return None
+    return tracing
+
+
+def _trace_span(name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None):
+    tracing = _tracing()
+    return tracing.span(name, kind, attributes) if tracing else contextlib.nullcontext(None)
+
+
+def _traced(method: Callable) -> Callable:
+    """Run a bridge method inside a span named after it"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with _trace_span(method.__qualname__):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def _run_traced(name: str, cmd: List[str], attributes: Dict[str, Any], **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run in a client span; the child continues the trace through TRACEPARENT"""
+    tracing = _tracing()
+    with _trace_span(name, "client", attributes) as span:
+        result = subprocess.run(cmd, env=tracing.child_env() if tracing else None, **kwargs)
+        if span is not None:
+            span.set_attribute("process.exit.code", result.returncode)
+            if result.returncode != 0:
+                span.set_error((result.stderr or "").strip()[-500:], "ProcessError")
+        return result
+
+
+def discovery_cache_path() -> Path:
+    """Location of the persistent PowerShell discovery cache"""
+    base = os.getenv("XDG_CACHE_HOME") or os.getenv("LOCALAPPDATA") or str(Path.home() / ".cache")
+    return Path(base) / "ai-powerhouse" / "powershell-discovery.json"
+
+
+def _claude_agents_module_dirs() -> List[Path]:
+    """Directories where a ClaudeAgents module could be installed"""
+    roots = [p for p in os.getenv("PSModulePath", "").split(os.pathsep) if p]
+    home = Path.home()
+    roots += [
+        str(home / "Documents" / "PowerShell" / "Modules"),
+        str(home / "Documents" / "WindowsPowerShell" / "Modules"),
+        str(home / ".local" / "share" / "powershell" / "Modules"),
+        "/usr/local/share/powershell/Modules",
+    ]
+    return [Path(root) / "ClaudeAgents" for root in dict.fromkeys(roots)]
+
+
+def discovery_fingerprint() -> str:
+    """
+    Fingerprint of everything PowerShell discovery depends on
+    
+    Covers PATH, PSModulePath, where each PowerShell candidate resolves to
+    (with its size and mtime) and the name, size and mtime of every file in
+    any installed ClaudeAgents module. Installing, upgrading or removing
+    PowerShell - even in a directory already on PATH - changing PATH or
+    updating the module invalidates the cache. Only PATH lookups and stat
+    calls are made.
+    """
+    state = {
+        "path": os.getenv("PATH", ""),
+        "psmodulepath": os.getenv("PSModulePath", ""),
+        "powershell": {},
+        "modules": {}
+    }
+    for candidate in POWERSHELL_CANDIDATES:
+        resolved = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        try:
+            stat = os.stat(resolved) if resolved else None
+        except OSError:
+            stat = None
+        state["powershell"][candidate] = [resolved, stat.st_size, stat.st_mtime_ns] if stat else None
+    for module_dir in _claude_agents_module_dirs():
+        if not module_dir.is_dir():
+            continue
+        files = []
+        for file_path in sorted(module_dir.rglob("*")):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            files.append([str(file_path.relative_to(module_dir)), stat.st_size, stat.st_mtime_ns])
+        state["modules"][str(module_dir)] = files
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()
+
+
 class PowerShellAgentBridge:
     """Bridge to execute PowerShell Claude Agents from Python"""
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.logger = logging.getLogger(__name__)
-        self.powershell_path = self._find_powershell()
-        self.agents_available = self._check_agents_available()
+        self.use_cache = use_cache
+        self._agents: Optional[List[str]] = None
+        self._fingerprint = discovery_fingerprint() if use_cache else None
+        
+        cached = self._load_cache() if use_cache else None
+        if cached is not None:
+            self.powershell_path = cached["powershell_path"]
+            self.agents_available = cached["agents_available"]
+            self._agents = cached.get("agents")
+        else:
+            self._discover()
+        
+        if not self.powershell_path:
+            raise RuntimeError("PowerShell not found. Please install PowerShell 7+")
+    
+    def _load_cache(self) -> Optional[Dict[str, Any]]:
+        """Return cached discovery results if they are still valid"""
+        try:
+            with open(discovery_cache_path(), 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("version") != DISCOVERY_CACHE_VERSION or cached.get("fingerprint") != self._fingerprint:
+            return None
+        return cached
+    
+    def _save_cache(self):
+        if not self.use_cache:
+            return
+        cache_path = discovery_cache_path()
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "version": DISCOVERY_CACHE_VERSION,
+                    "fingerprint": self._fingerprint,
+                    "powershell_path": self.powershell_path,
+                    "agents_available": self.agents_available,
+                    "agents": self._agents
+                }, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self.logger.debug(f"Could not write discovery cache: {e}")
+    
+    def _discover(self):
+        """Probe for PowerShell and the ClaudeAgents module; the result is cached even if negative"""
+        try:
+            self.powershell_path = self._find_powershell()
+        except RuntimeError:
+            self.powershell_path = None
+        self.agents_available = bool(self.powershell_path) and self._check_agents_available()
+        self._save_cache()
+    
+    def refresh(self):
+        """Discard cached discovery results and probe PowerShell again
         
+        Like the constructor, this records the result and then raises
+        RuntimeError if PowerShell is no longer found.
+        """
+        self._fingerprint = discovery_fingerprint() if self.use_cache else None
+        self._agents = None
+        self._discover()
+        if not self.powershell_path:
+            raise RuntimeError("PowerShell not found. Please install PowerShell 7+")
+    
     def _find_powershell(self) -> str:
         """Find PowerShell 7+ executable"""
+        # Resolve through PATH first so missing candidates cost no process start
         possible_paths = [
-            "pwsh.exe",  # PowerShell 7+ in PATH
-            "powershell.exe",  # Windows PowerShell fallback
-            r"C:\Program Files\PowerShell\7\pwsh.exe",
-            r"C:\Program Files (x86)\PowerShell\7\pwsh.exe"
+            resolved for resolved in (shutil.which(path) or (path if os.path.isfile(path) else None)
+                                      for path in POWERSHELL_CANDIDATES)
+            if resolved
         ]
         
-        for path in possible_paths:
+        for path in dict.fromkeys(possible_paths):
             try:
                 result = subprocess.run([path, "-Version"], 
                                       capture_output=True, text=True, timeout=5)
@@ -41,7 +214,7 @@ class PowerShellAgentBridge:
                     return path
             except (subprocess.TimeoutExpired, FileNotFoundError):
                 continue
-                
+        
         raise RuntimeError("PowerShell not found. Please install PowerShell 7+")
     
     def _check_agents_available(self) -> bool:
@@ -61,7 +234,9 @@ class PowerShellAgentBridge:
         """Get list of available Claude Agents"""
         if not self.agents_available:
             return []
-            
+        if self._agents is not None:
+            return list(self._agents)
+        
         try:
             cmd = [
                 self.powershell_path,
@@ -77,7 +252,9 @@ class PowerShellAgentBridge:
                     if 'Expert' in line and '→' in line:
                         agent_name = line.split('→')[0].strip()
                         agents.append(agent_name)
-                return agents
+                self._agents = agents
+                self._save_cache()
+                return list(agents)
             return []
         except Exception as e:
             self.logger.error(f"Failed to list agents: {e}")
@@ -91,7 +268,7 @@ class PowerShellAgentBridge:
             agent_command: The agent command (e.g., 'security-review', 'electronics-design')
             prompt: The prompt/question for the agent
             file_path: Optional file path for file-based analysis
-            
+        
         Returns:
             Dict with 'success', 'output', 'error' keys
         """
@@ -111,8 +288,10 @@ class PowerShellAgentBridge:
             
             cmd = [self.powershell_path, "-Command", ps_command]
             
-            result = subprocess.run(
-                cmd, 
+            result = _run_traced(
+                f"powershell {agent_command}",
+                cmd,
+                {"agent.name": agent_command, "code.filepath": file_path},
                 capture_output=True, 
                 text=True, 
                 timeout=120,  # 2 minutes timeout for AI responses
@@ -125,7 +304,7 @@ class PowerShellAgentBridge:
                 'output': result.stdout,
                 'error': result.stderr if result.returncode != 0 else ''
             }
-            
+        
         except subprocess.TimeoutExpired:
             return {
                 'success': False,
@@ -180,7 +359,10 @@ class PowerShellAgentBridge:
         cmd = [self.powershell_path, "-Command", ps_command]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)  # 5 minutes for pipeline
+            result = _run_traced(
+                "powershell agent-pipeline", cmd, {"pipeline.nodes": agents, "code.filepath": file_path},
+                capture_output=True, text=True, timeout=300  # 5 minutes for pipeline
+            )
             return result.stdout if result.returncode == 0 else f"Error: {result.stderr}"
         except subprocess.TimeoutExpired:
             return "Error: Pipeline execution timed out (5 minutes)"
@@ -216,13 +398,50 @@ class PythonAIBridge:
         # Add to Python path
         if str(self.ai_path) not in sys.path:
             sys.path.insert(0, str(self.ai_path))
+        
+        self._ai = None
+        self._loop = None
+        self._loop_lock = threading.Lock()
+    
+    @property
+    def ai(self):
+        """Shared AIPowerhouse instance, created on first use"""
+        if self._ai is None:
+            from ai_powerhouse.core import AIPowerhouse
+            self._ai = AIPowerhouse()
+        return self._ai
+    
+    def _run(self, coro):
+        """Run a coroutine to completion on the bridge's event loop
+        
+        The providers' async SDK clients stay bound to the loop that first
+        used them, so every call goes through one long-lived loop in a
+        background thread instead of a fresh asyncio.run() loop. The caller's
+        context (its trace span) is carried over to the task.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="ai-bridge-loop", daemon=True).start()
+            loop = self._loop
+        context = contextvars.copy_context()
+        
+        async def in_context():
+            return await context.run(asyncio.ensure_future, coro)
+        
+        return asyncio.run_coroutine_threadsafe(in_context(), loop).result()
+    
+    def close(self):
+        """Stop the bridge's event loop"""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
     
     def get_available_providers(self) -> List[str]:
         """Get list of available AI providers"""
         try:
-            from ai_powerhouse.core import AIPowerhouse
-            ai = AIPowerhouse()
-            return ai.get_available_providers()
+            return self.ai.get_available_providers()
         except Exception as e:
             self.logger.error(f"Failed to get providers: {e}")
             return []
@@ -230,57 +449,213 @@ class PythonAIBridge:
     def ask_claude(self, prompt: str) -> str:
         """Ask Claude AI"""
         try:
-            from ai_powerhouse.core import AIPowerhouse
-            ai = AIPowerhouse()
-            return ai.ask_claude(prompt)
+            return str(self._run(self.ai.ask_claude(prompt)))
         except Exception as e:
             return f"Error calling Claude: {str(e)}"
     
     def ask_gemini(self, prompt: str) -> str:
         """Ask Google Gemini"""
         try:
-            from ai_powerhouse.core import AIPowerhouse
-            ai = AIPowerhouse()
-            return ai.ask_gemini(prompt)
+            return str(self._run(self.ai.ask_gemini(prompt)))
         except Exception as e:
             return f"Error calling Gemini: {str(e)}"
     
     def ask_openai(self, prompt: str) -> str:
         """Ask OpenAI"""
         try:
-            from ai_powerhouse.core import AIPowerhouse
-            ai = AIPowerhouse()
-            return ai.ask_openai(prompt)
+            return str(self._run(self.ai.ask_openai(prompt)))
         except Exception as e:
             return f"Error calling OpenAI: {str(e)}"
     
-    def ask_all(self, prompt: str) -> Dict[str, str]:
-        """Ask all available providers"""
+    def ask_all(self, prompt: str, timeout: Optional[float] = None,
+                on_result: Optional[Callable[[str, str], None]] = None) -> Dict[str, str]:
+        """
+        Ask all available providers
+        
+        Args:
+            prompt: The prompt to send to every provider
+            timeout: Optional overall deadline in seconds
+            on_result: Optional callback invoked with (provider, response) as
+                soon as each provider finishes
+        """
         try:
-            from ai_powerhouse.core import AIPowerhouse
-            ai = AIPowerhouse()
-            return ai.ask_all(prompt)
+            ai = self.ai
+            
+            async def collect() -> Dict[str, str]:
+                results = {}
+                async for provider, response in ai.ask_as_completed(prompt, timeout=timeout):
+                    results[provider] = str(response)
+                    if on_result:
+                        on_result(provider, results[provider])
+                return results
+            
+            return self._run(collect())
         except Exception as e:
             return {"error": f"Error calling providers: {str(e)}"}
+    
+    def list_agents(self) -> List[str]:
+        """Get list of agents available to the Python runtime"""
+        try:
+            from ai_powerhouse.agents import get_registry
+            return get_registry().names()
+        except Exception as e:
+            self.logger.error(f"Failed to load agent prompts: {e}")
+            return []
+    
+    def has_agent(self, agent_command: str) -> bool:
+        """Whether an agent can run natively through the Python providers"""
+        try:
+            from ai_powerhouse.agents import get_registry
+            return agent_command in get_registry() and bool(self.get_available_providers())
+        except Exception:
+            return False
+    
+    def run_agent(self, agent_command: str, prompt: str = "", file_path: Optional[str] = None,
+                  provider: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run a Claude Agent directly through the Python providers
+        
+        Returns:
+            Dict with 'success', 'output', 'error' keys, like execute_agent
+        """
+        try:
+            from ai_powerhouse.agents import get_registry
+            agent = get_registry().get(agent_command)
+            if file_path and not os.path.exists(file_path):
+                file_path = None
+            response = self._run(agent.run(self.ai, prompt, file_path, provider=provider))
+            return {
+                'success': response.ok,
+                'output': response.text,
+                'error': '' if response.ok else response.error
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'output': '',
+                'error': f'Agent execution failed: {str(e)}'
+            }
+    
+    def run_pipeline(self, agents: List[str], prompt: str = "", file_path: Optional[str] = None,
+                     provider: Optional[str] = None) -> Dict[str, str]:
+        """Run an agent pipeline as a parallel dependency graph"""
+        try:
+            from ai_powerhouse.pipeline import AgentPipeline
+            pipeline = AgentPipeline.default(agents, provider=provider, ai=self.ai)
+            if file_path and not os.path.exists(file_path):
+                file_path = None
+            result = self._run(pipeline.run(file_path, prompt or None))
+            return {name: str(response) for name, response in result.responses.items()}
+        except Exception as e:
+            return {"error": f"Pipeline failed: {str(e)}"}
+    
+    def analyze_repository(self, root: str, concurrency: int = 4,
+                           providers: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Analyse a whole directory tree, reusing results for unchanged files"""
+        try:
+            from ai_powerhouse.repo_analysis import RepositoryAnalyzer
+            analyzer = RepositoryAnalyzer(self.ai, providers=providers, concurrency=concurrency)
+            return self._run(analyzer.analyze(root)).to_dict()
+        except Exception as e:
+            return {"error": f"Repository analysis failed: {str(e)}"}
+    
+    def review_diff(self, base: Optional[str] = None, staged: bool = False,
+                    providers: Optional[List[str]] = None,
+                    agents: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Review only the code regions touched by a git diff"""
+        try:
+            from ai_powerhouse.diff_review import DiffReviewer
+            reviewer = DiffReviewer(self.ai, providers=providers, agents=agents)
+            report = self._run(reviewer.review_git(base=base, staged=staged))
+            return {
+                'regions': {path: [(r.start, r.end, r.symbol) for r in regions]
+                            for path, regions in report.regions.items()},
+                'responses': {path: {name: str(r) for name, r in responses.items()}
+                              for path, responses in report.responses.items()},
+                'findings': [f.to_dict() for f in report.findings],
+                'reduction': report.reduction
+            }
+        except Exception as e:
+            return {"error": f"Diff review failed: {str(e)}"}
 
 
 class UnifiedAI:
-    """Unified interface combining Python AI and PowerShell Agents"""
+    """Unified interface combining Python AI and PowerShell Agents
+    
+    Agents run natively through the Python providers whenever their prompt is
+    available; the PowerShell bridge is only started when an agent has to fall
+    back to it or when it is requested explicitly.
+    """
     
     def __init__(self):
-        self.ps_bridge = PowerShellAgentBridge()
         self.py_bridge = PythonAIBridge()
         self.logger = logging.getLogger(__name__)
+        self._ps_bridge = None
+        self._ps_bridge_error = None
+    
+    @property
+    def ps_bridge(self) -> Optional[PowerShellAgentBridge]:
+        """PowerShell bridge, started on first use; None if PowerShell is missing"""
+        if self._ps_bridge is None and self._ps_bridge_error is None:
+            try:
+                self._ps_bridge = PowerShellAgentBridge()
+            except RuntimeError as e:
+                self._ps_bridge_error = str(e)
+        return self._ps_bridge
+    
+    @_traced
+    def run_agent(self, agent_command: str, prompt: str = "", file_path: Optional[str] = None,
+                  backend: str = "auto") -> Dict[str, Any]:
+        """
+        Run an agent, natively in Python when possible
+        
+        Args:
+            agent_command: Agent name or PowerShell command (e.g. 'security-review')
+            prompt: The prompt/question for the agent
+            file_path: Optional file path for file-based analysis
+            backend: 'python', 'powershell' or 'auto' (Python first)
+        """
+        if backend != "powershell" and (backend == "python" or self.py_bridge.has_agent(agent_command)):
+            return self.py_bridge.run_agent(agent_command, prompt, file_path)
+        
+        if self.ps_bridge is None:
+            return {'success': False, 'output': '', 'error': self._ps_bridge_error}
+        return self.ps_bridge.execute_agent(agent_command, prompt, file_path)
+    
+    @_traced
+    def agent_pipeline(self, agents: List[str], prompt: str = "", file_path: Optional[str] = None,
+                       backend: str = "auto") -> Dict[str, str]:
+        """
+        Run several agents on the same input
         
+        The Python runtime executes independent agents concurrently and feeds
+        review findings to the testing and docs agents; the PowerShell backend
+        runs them one after another.
+        """
+        names = [agent for agent in agents if agent != 'all'] or ['security', 'review', 'docs']
+        if backend != "powershell" and all(self.py_bridge.has_agent(name) for name in names):
+            return self.py_bridge.run_pipeline(agents, prompt, file_path)
+        
+        if self.ps_bridge is None:
+            return {"error": self._ps_bridge_error}
+        return {"pipeline": self.ps_bridge.agent_pipeline(agents, prompt, file_path)}
+    
+    def _agent_text(self, agent_command: str, prompt: str, file_path: Optional[str] = None) -> str:
+        result = self.run_agent(agent_command, prompt, file_path)
+        return result['output'] if result['success'] else f"Error: {result['error']}"
+    
     def get_capabilities(self) -> Dict[str, Any]:
         """Get all available capabilities"""
+        ps_bridge = self.ps_bridge
         return {
-            'powershell_agents': self.ps_bridge.list_agents(),
+            'python_agents': self.py_bridge.list_agents(),
+            'powershell_agents': ps_bridge.list_agents() if ps_bridge else [],
             'python_providers': self.py_bridge.get_available_providers(),
-            'agents_available': self.ps_bridge.agents_available,
+            'agents_available': bool(ps_bridge and ps_bridge.agents_available),
             'integration_ready': True
         }
     
+    @_traced
     def analyze_with_multiple_agents(self, prompt: str, file_path: Optional[str] = None) -> Dict[str, str]:
         """
         Analyze with multiple agents and AI providers for comprehensive analysis
@@ -293,16 +668,16 @@ class UnifiedAI:
         except Exception as e:
             results['claude_ai'] = f"Error: {str(e)}"
         
-        # Get specialized agent analysis (PowerShell)
-        if self.ps_bridge.agents_available:
-            try:
-                results['security_agent'] = self.ps_bridge.security_review(prompt, file_path)
-                results['code_review_agent'] = self.ps_bridge.code_review(prompt, file_path)
-            except Exception as e:
-                results['agent_error'] = f"Error: {str(e)}"
+        # Get specialized agent analysis
+        try:
+            results['security_agent'] = self._agent_text('security-review', prompt, file_path)
+            results['code_review_agent'] = self._agent_text('code-review', prompt, file_path)
+        except Exception as e:
+            results['agent_error'] = f"Error: {str(e)}"
         
         return results
     
+    @_traced
     def comprehensive_code_analysis(self, file_path: str) -> Dict[str, str]:
         """
         Perform comprehensive code analysis using both systems
@@ -310,32 +685,32 @@ class UnifiedAI:
         if not os.path.exists(file_path):
             return {"error": "File not found"}
         
-        # Read file content for AI analysis
+        # Read file content for AI analysis, minified to cut prompt tokens
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            from ai_powerhouse.minify import minify_file
+            context = minify_file(file_path)
         except Exception as e:
             return {"error": f"Failed to read file: {str(e)}"}
         
-        prompt = f"Analyze this code for issues, improvements, and best practices:\n\n{content}"
+        prompt = f"Analyze this code for issues, improvements, and best practices:\n\nFile: {file_path}\n\n{context.text}"
         
-        results = {}
+        results = {'context': context.summary()}
         
         # Python AI providers
         try:
-            results['claude_analysis'] = self.py_bridge.ask_claude(prompt)
-            results['gemini_analysis'] = self.py_bridge.ask_gemini(prompt)
+            # Line numbers in the answers refer to the minified text; map them back
+            results['claude_analysis'] = context.remap(self.py_bridge.ask_claude(prompt))
+            results['gemini_analysis'] = context.remap(self.py_bridge.ask_gemini(prompt))
         except Exception as e:
             results['ai_error'] = f"AI analysis failed: {str(e)}"
         
-        # PowerShell agents with file context
-        if self.ps_bridge.agents_available:
-            try:
-                results['security_review'] = self.ps_bridge.security_review("Comprehensive security analysis", file_path)
-                results['code_review'] = self.ps_bridge.code_review("Detailed code review", file_path)
-                results['performance_analysis'] = self.ps_bridge.execute_agent('analyze-performance', "Performance optimization suggestions", file_path)['output']
-            except Exception as e:
-                results['agents_error'] = f"Agent analysis failed: {str(e)}"
+        # Specialised agents with file context
+        try:
+            results['security_review'] = self._agent_text('security-review', "Comprehensive security analysis", file_path)
+            results['code_review'] = self._agent_text('code-review', "Detailed code review", file_path)
+            results['performance_analysis'] = self._agent_text('analyze-performance', "Performance optimization suggestions", file_path)
+        except Exception as e:
+            results['agents_error'] = f"Agent analysis failed: {str(e)}"
         
         return results
 
@@ -346,14 +721,29 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='AI Powerhouse Framework - Unified AI Interface')
-    parser.add_argument('command', choices=['capabilities', 'analyze', 'agent', 'ai', 'comprehensive'])
+    parser.add_argument('command', choices=['capabilities', 'analyze', 'agent', 'ai', 'comprehensive', 'repository', 'review-diff', 'pipeline'])
     parser.add_argument('--prompt', '-p', help='Prompt for AI/Agent')
     parser.add_argument('--file', '-f', help='File path for analysis')
+    parser.add_argument('--dir', '-d', help='Directory for repository analysis')
+    parser.add_argument('--concurrency', type=int, default=4, help='Files analysed in parallel')
+    parser.add_argument('--base', help='Revision to diff against for review-diff')
+    parser.add_argument('--staged', action='store_true', help='Review staged changes for review-diff')
     parser.add_argument('--agent', '-a', help='Specific agent to use')
+    parser.add_argument('--agents', default='all', help='Comma-separated agents for pipeline')
+    parser.add_argument('--backend', choices=['auto', 'python', 'powershell'], default='auto',
+                        help='Agent runtime (default: Python providers, PowerShell as fallback)')
     parser.add_argument('--provider', help='AI provider (claude, gemini, openai, all)')
+    parser.add_argument('--timeout', type=float, help='Overall deadline in seconds for --provider all')
+    parser.add_argument('--refresh', action='store_true', help='Ignore the cached PowerShell discovery results')
     
     args = parser.parse_args()
     
+    if args.refresh:
+        try:
+            os.remove(discovery_cache_path())
+        except OSError:
+            pass
+    
     unified = UnifiedAI()
     
     if args.command == 'capabilities':
@@ -366,8 +756,8 @@ def main():
             print(f"\n=== {source.upper()} ===")
             print(result)
     
-    elif args.command == 'agent' and args.prompt and args.agent:
-        result = unified.ps_bridge.execute_agent(args.agent, args.prompt, args.file)
+    elif args.command == 'agent' and args.agent and (args.prompt or args.file):
+        result = unified.run_agent(args.agent, args.prompt or "", args.file, backend=args.backend)
         print(result['output'] if result['success'] else f"Error: {result['error']}")
     
     elif args.command == 'ai' and args.prompt:
@@ -379,10 +769,13 @@ def main():
         elif provider == 'openai':
             print(unified.py_bridge.ask_openai(args.prompt))
         elif provider == 'all':
-            results = unified.py_bridge.ask_all(args.prompt)
-            for prov, result in results.items():
+            def show(prov: str, result: str) -> None:
                 print(f"\n=== {prov.upper()} ===")
                 print(result)
+            
+            results = unified.py_bridge.ask_all(args.prompt, timeout=args.timeout, on_result=show)
+            if 'error' in results:
+                show('error', results['error'])
     
     elif args.command == 'comprehensive' and args.file:
         results = unified.comprehensive_code_analysis(args.file)
@@ -390,6 +783,21 @@ def main():
             print(f"\n=== {analysis.upper()} ===")
             print(result)
     
+    elif args.command == 'repository' and args.dir:
+        report = unified.py_bridge.analyze_repository(args.dir, concurrency=args.concurrency)
+        print(json.dumps(report, indent=2))
+    
+    elif args.command == 'pipeline' and (args.file or args.prompt):
+        agents = [a.strip() for a in args.agents.split(',') if a.strip()]
+        results = unified.agent_pipeline(agents, args.prompt or "", args.file, backend=args.backend)
+        for agent, result in results.items():
+            print(f"\n=== {agent.upper()} ===")
+            print(result)
+    
+    elif args.command == 'review-diff':
+        result = unified.py_bridge.review_diff(base=args.base, staged=args.staged)
+        print(json.dumps(result, indent=2))
+    
     else:
         parser.print_help()
 
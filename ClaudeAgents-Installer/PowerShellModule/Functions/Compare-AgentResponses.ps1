@@ -33,6 +33,12 @@ function Compare-AgentResponses {
     Write-Host "Question: $Prompt" -ForegroundColor Gray
     Write-Host ""
     
+    # Read the file once for all agents
+    $fileContent = $null
+    if ($FilePath -and (Test-Path $FilePath)) {
+        $fileContent = Get-AgentFileContent $FilePath
+    }
+    
     foreach ($agent in $Agents) {
         Write-Host ("="*60) -ForegroundColor DarkGray
         Write-Host "Agent: $agent" -ForegroundColor White -BackgroundColor DarkGray
@@ -43,13 +49,12 @@ function Compare-AgentResponses {
         if ($agentPrompt) {
             $fullPrompt = $agentPrompt + "`n`n" + $Prompt
             
-            if ($FilePath -and (Test-Path $FilePath)) {
-                $fileContent = Get-Content $FilePath -Raw
+            if ($fileContent) {
                 $fullPrompt += "`n`nFile Context:`n$fileContent"
             }
             
             try {
-                $response = claude $fullPrompt
+                $response = Invoke-AgentClaude -AgentName $agent $fullPrompt
                 Write-Host $response
                 Write-Host ""
             }
@@ -40,33 +40,45 @@ function Invoke-AgentPipeline {
     }
     
     $results = @()
+    $pipelineSpan = Start-AgentSpan -Name "agent-pipeline" -Attributes @{ "code.filepath" = $FilePath }
     
-    foreach ($agent in $agentList) {
-        Write-Host ("="*60) -ForegroundColor DarkGray
-        
-        switch ($agent) {
-            'security' {
-                Invoke-SecurityAgent -FilePath $FilePath
-            }
-            'testing' {
-                Invoke-TestingAgent -FilePath $FilePath
-            }
-            'docs' {
-                Invoke-DocsAgent -FilePath $FilePath
-            }
-            'performance' {
-                Invoke-PerformanceAgent -FilePath $FilePath
-            }
-            'review' {
-                Invoke-CodeReviewAgent -FilePath $FilePath
-            }
-            'electronics' {
-                Invoke-ElectronicsAgent -Task review -FilePath $FilePath
+    $failure = $null
+    try {
+        foreach ($agent in $agentList) {
+            Write-Host ("="*60) -ForegroundColor DarkGray
+            
+            switch ($agent) {
+                'security' {
+                    Invoke-SecurityAgent -FilePath $FilePath
+                }
+                'testing' {
+                    Invoke-TestingAgent -FilePath $FilePath
+                }
+                'docs' {
+                    Invoke-DocsAgent -FilePath $FilePath
+                }
+                'performance' {
+                    Invoke-PerformanceAgent -FilePath $FilePath
+                }
+                'review' {
+                    Invoke-CodeReviewAgent -FilePath $FilePath
+                }
+                'electronics' {
+                    Invoke-ElectronicsAgent -Task review -FilePath $FilePath
+                }
             }
+            
+            Write-Host ""
+            Start-Sleep -Seconds 1  # Brief pause between agents
         }
-        
-        Write-Host ""
-        Start-Sleep -Seconds 1  # Brief pause between agents
+    }
+    catch {
+        $failure = "$_"
+        throw
+    }
+    finally {
+        # Ends the span on errors and Ctrl-C too, like Invoke-AgentClaude
+        Complete-AgentSpan -Span $pipelineSpan -ErrorMessage $failure
     }
     
     Write-Host ("="*60) -ForegroundColor DarkGray
@@ -32,7 +32,7 @@ function Invoke-ArchitectureAgent {
     }
     
     try {
-        $response = claude $fullPrompt
+        $response = Invoke-AgentClaude -AgentName "Architecture" $fullPrompt
         Write-Host $response
         
         Write-AgentLog -AgentName "Architecture" -FilePath "" -Prompt $Prompt -Response $response
@@ -42,7 +42,7 @@ function Invoke-DebugAgent {
     
     if ($FilePath) {
         if (Test-Path $FilePath) {
-            $fileContent = Get-Content $FilePath -Raw
+            $fileContent = Get-AgentFileContent $FilePath
             $fullPrompt += "`n`nCode with bug:`n`nFile: $FilePath`n`n$fileContent"
         } else {
             Write-Error "File not found: $FilePath"
@@ -55,7 +55,7 @@ function Invoke-DebugAgent {
     }
     
     try {
-        $response = claude $fullPrompt
+        $response = Invoke-AgentClaude -AgentName "Debug" $fullPrompt
         Write-Host $response
         
         Write-AgentLog -AgentName "Debug" -FilePath $FilePath -Prompt $Prompt -Response $response
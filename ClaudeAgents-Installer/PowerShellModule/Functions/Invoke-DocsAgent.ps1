@@ -40,7 +40,7 @@ function Invoke-DocsAgent {
     
     if ($FilePath) {
         if (Test-Path $FilePath) {
-            $fileContent = Get-Content $FilePath -Raw
+            $fileContent = Get-AgentFileContent $FilePath
             $fullPrompt += "`n`nGenerate documentation for:`n`nFile: $FilePath`n`n$fileContent"
         } else {
             Write-Error "File not found: $FilePath"
@@ -53,7 +53,7 @@ function Invoke-DocsAgent {
     }
     
     try {
-        $response = claude $fullPrompt
+        $response = Invoke-AgentClaude -AgentName "Documentation" $fullPrompt
         Write-Host $response
         
         Write-AgentLog -AgentName "Documentation" -FilePath $FilePath -Prompt $Prompt -Response $response
@@ -131,7 +131,7 @@ function Invoke-ElectronicsAgent {
     # Add file content if provided
     if ($FilePath) {
         if (Test-Path $FilePath) {
-            $fileContent = Get-Content $FilePath -Raw
+            $fileContent = Get-AgentFileContent $FilePath
             $fullPrompt += "`n`nFile Content:`nFile: $FilePath`n`n$fileContent"
         } else {
             Write-Error "File not found: $FilePath"
@@ -159,7 +159,7 @@ function Invoke-ElectronicsAgent {
     }
     
     try {
-        $response = claude $fullPrompt
+        $response = Invoke-AgentClaude -AgentName "Electronics" $fullPrompt
         Write-Host $response
         
         # Log interaction
@@ -32,7 +32,7 @@ function Invoke-PerformanceAgent {
     
     if ($FilePath) {
         if (Test-Path $FilePath) {
-            $fileContent = Get-Content $FilePath -Raw
+            $fileContent = Get-AgentFileContent $FilePath
             $fullPrompt += "`n`nAnalyze performance of:`n`nFile: $FilePath`n`n$fileContent"
         } else {
             Write-Error "File not found: $FilePath"
@@ -45,7 +45,7 @@ function Invoke-PerformanceAgent {
     }
     
     try {
-        $response = claude $fullPrompt
+        $response = Invoke-AgentClaude -AgentName "Performance" $fullPrompt
         Write-Host $response
         
         Write-AgentLog -AgentName "Performance" -FilePath $FilePath -Prompt $Prompt -Response $response
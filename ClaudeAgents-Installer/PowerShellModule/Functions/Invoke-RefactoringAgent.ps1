@@ -32,7 +32,7 @@ function Invoke-RefactoringAgent {
     
     if ($FilePath) {
         if (Test-Path $FilePath) {
-            $fileContent = Get-Content $FilePath -Raw
+            $fileContent = Get-AgentFileContent $FilePath
             $fullPrompt += "`n`nAnalyze and suggest refactorings for:`n`nFile: $FilePath`n`n$fileContent"
         } else {
             Write-Error "File not found: $FilePath"
@@ -45,7 +45,7 @@ function Invoke-RefactoringAgent {
     }
     
     try {
-        $response = claude $fullPrompt
+        $response = Invoke-AgentClaude -AgentName "Refactoring" $fullPrompt
         Write-Host $response
         
         Write-AgentLog -AgentName "Refactoring" -FilePath $FilePath -Prompt $Prompt -Response $response
@@ -64,7 +64,7 @@ Please provide a comprehensive research analysis following your established fram
         Write-Host ""
         
         # Execute Claude with the agent prompt
-        $Response = claude $AgentPrompt $FullQuery
+        $Response = Invoke-AgentClaude -AgentName "Research" $AgentPrompt $FullQuery
         
         Write-Host "Research Agent Response:" -ForegroundColor Green
         Write-Host $Response
@@ -3,8 +3,16 @@ AI Powerhouse - A unified interface for multiple AI providers
 """
 
 from .core import AIPowerhouse
-from .providers import ClaudeProvider, GeminiProvider, OpenAIProvider
 from .config import Config
+from .response import AIResponse
 
 __version__ = "1.0.0"
-__all__ = ["AIPowerhouse", "ClaudeProvider", "GeminiProvider", "OpenAIProvider", "Config"]
+__all__ = ["AIPowerhouse", "ClaudeProvider", "GeminiProvider", "OpenAIProvider", "Config", "AIResponse"]
+
+
+def __getattr__(name: str):
+    # Provider classes import their SDKs, so only load them when asked for
+    if name in ("ClaudeProvider", "GeminiProvider", "OpenAIProvider"):
+        from . import providers
+        return getattr(providers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
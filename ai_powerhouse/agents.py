@@ -0,0 +1,209 @@
+"""
+Python-native runtime for the specialised Claude Agents
+
+Agent prompts are loaded once from the AgentPrompts directory and run directly
+through AIPowerhouse providers, so no PowerShell or claude CLI process is
+needed on the hot path.
+"""
+
+import functools
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from . import tracing
+from .core import AIPowerhouse
+from .minify import MinifiedSource, minify_file
+from .response import AIResponse
+
+
+# PowerShell command aliases and pipeline short names -> prompt file stem
+AGENT_ALIASES = {
+    "security-review": "security",
+    "generate-tests": "testing",
+    "generate-docs": "documentation",
+    "docs": "documentation",
+    "analyze-performance": "performance",
+    "review": "code-review",
+    "debug-issue": "debugging",
+    "debug": "debugging",
+    "design-architecture": "architecture",
+    "refactor-code": "refactoring",
+    "electronics-design": "electronics",
+    "pcb-layout": "electronics",
+    "component-pricing": "electronics",
+    "database-optimize": "database",
+    "db-help": "database",
+    "sql-optimize": "database",
+    "research-topic": "research",
+    "fact-check": "research",
+    "market-research": "research",
+    "n8n-workflow": "n8n",
+    "n8n-help": "n8n",
+    "workflow-design": "n8n",
+}
+
+# Headings used by the PowerShell functions when attaching a file and a prompt
+FILE_HEADINGS = {
+    "code-review": "Review this code:",
+    "debugging": "Code with bug:",
+    "documentation": "Generate documentation for:",
+    "performance": "Analyze performance of:",
+    "refactoring": "Analyze and suggest refactorings for:",
+    "testing": "Generate tests for this code:",
+    "electronics": "File Content:",
+}
+
+PROMPT_HEADINGS = {
+    "code-review": "Focus on: ",
+    "performance": "Focus on: ",
+    "refactoring": "Focus on: ",
+    "documentation": "Additional Requirements: ",
+    "testing": "Additional Requirements: ",
+    "architecture": "Architectural Challenge:\n",
+}
+
+# Providers tried in order when an agent call does not name one
+DEFAULT_BACKENDS = ["claude", "openai", "gemini"]
+
+
+def default_prompts_dir() -> Path:
+    """Locate the AgentPrompts directory
+    
+    Checks CLAUDE_AGENTS_PROMPTS, the installed ~/.claude-agents/agents
+    directory, then the prompt folders shipped alongside this package.
+    """
+    override = os.getenv("CLAUDE_AGENTS_PROMPTS")
+    if override:
+        return Path(override)
+    
+    package_dir = Path(__file__).resolve().parent
+    candidates = [
+        Path.home() / ".claude-agents" / "agents",
+        package_dir.parent / "ClaudeAgents-Installer" / "AgentPrompts",
+        package_dir.parent.parent / "ClaudeAgents" / "AgentPrompts",
+    ]
+    for candidate in candidates:
+        if candidate.is_dir() and any(candidate.glob("*-agent.txt")):
+            return candidate
+    return candidates[1]
+
+
+class Agent:
+    """A specialised agent defined by its system prompt"""
+    
+    __slots__ = ("name", "instructions")
+    
+    def __init__(self, name: str, instructions: str):
+        self.name = name
+        self.instructions = instructions
+    
+    def build_prompt(self, prompt: Optional[str] = None, file_path: Optional[str] = None,
+                     content: Optional[str] = None, minify: bool = True) -> str:
+        """Build the user message the same way the PowerShell agent functions do
+        
+        A file read from file_path is minified (see ai_powerhouse.minify) unless
+        minify is False; content passed in is used as given.
+        """
+        parts = []
+        if file_path is not None:
+            if content is None:
+                if minify:
+                    content = minify_file(file_path).text
+                else:
+                    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                        content = f.read()
+            heading = FILE_HEADINGS.get(self.name)
+            file_block = f"File: {file_path}\n\n{content}"
+            parts.append(f"{heading}\n\n{file_block}" if heading else file_block)
+        if prompt:
+            parts.append(PROMPT_HEADINGS.get(self.name, "Additional Context: ") + prompt)
+        return "\n\n".join(parts) or "Introduce yourself and describe how you can help."
+    
+    async def ask(self, ai: AIPowerhouse, message: str, provider: Optional[str] = None,
+                  **options) -> AIResponse:
+        """Send a ready-made user message with this agent's instructions"""
+        backend = provider or next(
+            (name for name in DEFAULT_BACKENDS if name in ai.providers),
+            next(iter(ai.get_available_providers()), None)
+        )
+        if backend is None:
+            return AIResponse.failure(
+                "No AI providers configured", provider=provider, error_type="ProviderUnavailable"
+            )
+        attributes = {"agent.name": self.name, "gen_ai.system": backend}
+        with tracing.span(f"agent {self.name}", attributes=attributes) as span:
+            response = await ai.ask_provider(backend, message, system=self.instructions, **options)
+            tracing.record_response(span, response)
+        return response
+    
+    async def run(self, ai: AIPowerhouse, prompt: Optional[str] = None,
+                  file_path: Optional[str] = None, content: Optional[str] = None,
+                  provider: Optional[str] = None, minify: bool = True,
+                  context: Optional[MinifiedSource] = None, **options) -> AIResponse:
+        """Run the agent on any AIPowerhouse provider
+        
+        The file is sent minified unless minify is False or content is given;
+        context passes in an already minified file. Line numbers in the
+        answer are mapped back to the original file.
+        """
+        if context is None and content is None and file_path is not None and minify:
+            context = minify_file(file_path)
+        if context is not None:
+            content = context.text
+        message = self.build_prompt(prompt, file_path, content, minify)
+        response = await self.ask(ai, message, provider, **options)
+        return context.remap_response(response) if context is not None else response
+
+
+class AgentRegistry:
+    """Agents loaded from ``*-agent.txt`` prompt files"""
+    
+    def __init__(self, prompts_dir: Optional[str] = None):
+        self.prompts_dir = Path(prompts_dir) if prompts_dir else default_prompts_dir()
+        self._agents: Optional[Dict[str, Agent]] = None
+    
+    @property
+    def agents(self) -> Dict[str, Agent]:
+        if self._agents is None:
+            agents = {}
+            for prompt_file in sorted(self.prompts_dir.glob("*-agent.txt")):
+                name = prompt_file.name[:-len("-agent.txt")]
+                agents[name] = Agent(name, prompt_file.read_text(encoding="utf-8"))
+            self._agents = agents
+        return self._agents
+    
+    def names(self) -> List[str]:
+        return list(self.agents)
+    
+    def resolve(self, name: str) -> str:
+        """Map a PowerShell command or short name to an agent name"""
+        name = name.lower()
+        if name.endswith("-agent"):
+            name = name[:-len("-agent")]
+        return AGENT_ALIASES.get(name, name)
+    
+    def get(self, name: str) -> Agent:
+        agent = self.agents.get(self.resolve(name))
+        if agent is None:
+            raise KeyError(
+                f"Unknown agent '{name}'. Available agents: {', '.join(self.names()) or 'none'}"
+            )
+        return agent
+    
+    def __contains__(self, name: str) -> bool:
+        return self.resolve(name) in self.agents
+
+
+@functools.lru_cache(maxsize=None)
+def get_registry(prompts_dir: Optional[str] = None) -> AgentRegistry:
+    """Process-wide registry so prompt files are read only once"""
+    return AgentRegistry(prompts_dir)
+
+
+async def run_agent(name: str, ai: Optional[AIPowerhouse] = None, prompt: Optional[str] = None,
+                    file_path: Optional[str] = None, provider: Optional[str] = None,
+                    **options) -> AIResponse:
+    """Run a named agent through AIPowerhouse"""
+    agent = get_registry().get(name)
+    return await agent.run(ai or AIPowerhouse(), prompt, file_path, provider=provider, **options)
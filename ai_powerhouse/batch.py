@@ -0,0 +1,311 @@
+"""
+Asynchronous batch-endpoint submission for offline workloads
+
+The OpenAI and Anthropic batch APIs process large jobs at a lower price and
+under a separate quota, at the cost of latency (up to 24 hours). Results are
+returned as AIResponse objects in the order the prompts were submitted, so
+callers can treat them like synchronous answers.
+"""
+
+import asyncio
+import json
+import time
+import urllib.error
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from .response import AIResponse
+
+
+class BatchJob:
+    """A submitted batch and the custom ids of its requests, in prompt order"""
+    
+    __slots__ = ("id", "provider", "custom_ids", "status", "created_at", "info")
+    
+    def __init__(self, id: str, provider: str, custom_ids: List[str], status: str = "submitted",
+                 created_at: Optional[float] = None, info: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.provider = provider
+        self.custom_ids = custom_ids
+        self.status = status
+        self.created_at = created_at if created_at is not None else time.time()
+        self.info = info or {}
+    
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class BatchClient(ABC):
+    """Shared submit/poll/download logic for provider batch APIs"""
+    
+    provider_name = "batch"
+    default_base_url = ""
+    
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None,
+                 poll_interval: float = 5.0, max_poll_interval: float = 300.0,
+                 request_timeout: float = 60.0):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = (base_url or self.default_base_url).rstrip("/")
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.request_timeout = request_timeout
+    
+    @abstractmethod
+    def _headers(self) -> Dict[str, str]:
+        """Authentication headers for every request"""
+        pass
+    
+    def _http(self, method: str, url: str, body: Optional[bytes] = None,
+              content_type: Optional[str] = "application/json") -> bytes:
+        """Perform a blocking HTTP request and return the raw body"""
+        if not url.startswith(("http://", "https://")):
+            url = self.base_url + url
+        headers = self._headers()
+        if body is not None and content_type:
+            headers["Content-Type"] = content_type
+        request = urllib.request.Request(url, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.request_timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", errors="replace")
+            raise RuntimeError(f"{self.provider_name} batch API error {e.code}: {detail}") from e
+    
+    async def _json(self, method: str, url: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        raw = await asyncio.to_thread(self._http, method, url, body)
+        return json.loads(raw.decode("utf-8"))
+    
+    @staticmethod
+    def _custom_ids(count: int) -> List[str]:
+        prefix = uuid.uuid4().hex[:8]
+        return [f"{prefix}-{i}" for i in range(count)]
+    
+    @abstractmethod
+    async def submit(self, prompts: List[str], **options) -> BatchJob:
+        """Submit one request per prompt and return the created job"""
+        pass
+    
+    @abstractmethod
+    async def refresh(self, job: BatchJob) -> bool:
+        """Update the job status and return True once it has finished"""
+        pass
+    
+    @abstractmethod
+    async def fetch_results(self, job: BatchJob) -> List[AIResponse]:
+        """Download a finished job's results as AIResponses in prompt order"""
+        pass
+    
+    async def wait(self, job: BatchJob, timeout: Optional[float] = None) -> BatchJob:
+        """Poll with exponential backoff until the batch finishes
+        
+        With a timeout, the last poll happens when it expires; TimeoutError is
+        raised only if the batch is still running then.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        interval = self.poll_interval
+        while not await self.refresh(job):
+            delay = interval
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"Batch {job.id} still {job.status} after {timeout}s")
+                delay = min(interval, remaining)
+            await asyncio.sleep(delay)
+            interval = min(interval * 2, self.max_poll_interval)
+        return job
+    
+    async def run(self, prompts: List[str], timeout: Optional[float] = None,
+                  **options) -> List[AIResponse]:
+        """Submit prompts, wait for the batch and return responses in prompt order"""
+        job = await self.submit(prompts, **options)
+        await self.wait(job, timeout)
+        return await self.fetch_results(job)
+    
+    def _match(self, job: BatchJob, by_id: Dict[str, AIResponse]) -> List[AIResponse]:
+        """Order results by custom id; requests missing from the output become failures"""
+        return [
+            by_id.get(custom_id) or AIResponse.failure(
+                f"No result for request {custom_id} (batch {job.status})",
+                provider=self.provider_name,
+                model=self.model,
+                error_type="BatchMissingResult"
+            )
+            for custom_id in job.custom_ids
+        ]
+
+
+class OpenAIBatchClient(BatchClient):
+    """OpenAI Batch API: JSONL file upload, /batches job, output file download"""
+    
+    provider_name = "OpenAI"
+    default_base_url = "https://api.openai.com/v1"
+    terminal_statuses = {"completed", "failed", "expired", "cancelled"}
+    
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
+    
+    def build_lines(self, prompts: List[str], custom_ids: List[str], **options) -> List[Dict[str, Any]]:
+        lines = []
+        for custom_id, prompt in zip(custom_ids, prompts):
+            messages = [{"role": "user", "content": prompt}]
+            if options.get("system"):
+                messages.insert(0, {"role": "system", "content": options["system"]})
+            lines.append({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "max_tokens": options.get("max_tokens", 4000),
+                    "temperature": options.get("temperature", 0.7),
+                    "messages": messages,
+                },
+            })
+        return lines
+    
+    def _upload(self, jsonl: bytes) -> Dict[str, Any]:
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"purpose\"\r\n\r\nbatch\r\n"
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"batch.jsonl\"\r\n"
+            f"Content-Type: application/jsonl\r\n\r\n"
+        ).encode("utf-8") + jsonl + f"\r\n--{boundary}--\r\n".encode("utf-8")
+        raw = self._http("POST", "/files", body, f"multipart/form-data; boundary={boundary}")
+        return json.loads(raw.decode("utf-8"))
+    
+    async def submit(self, prompts: List[str], **options) -> BatchJob:
+        custom_ids = self._custom_ids(len(prompts))
+        lines = self.build_lines(prompts, custom_ids, **options)
+        jsonl = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+        uploaded = await asyncio.to_thread(self._upload, jsonl)
+        batch = await self._json("POST", "/batches", {
+            "input_file_id": uploaded["id"],
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h",
+        })
+        return BatchJob(batch["id"], self.provider_name, custom_ids, batch.get("status", "validating"),
+                        info=batch)
+    
+    async def refresh(self, job: BatchJob) -> bool:
+        job.info = await self._json("GET", f"/batches/{job.id}")
+        job.status = job.info.get("status", job.status)
+        return job.status in self.terminal_statuses
+    
+    def _parse_line(self, item: Dict[str, Any], started_at: float) -> AIResponse:
+        response = item.get("response") or {}
+        body = response.get("body") or {}
+        error = item.get("error") or body.get("error")
+        if error or response.get("status_code", 200) >= 400:
+            message = error.get("message") if isinstance(error, dict) else error
+            return AIResponse.failure(
+                message or f"HTTP {response.get('status_code')}",
+                provider=self.provider_name,
+                model=body.get("model", self.model),
+                error_type=(error.get("code") if isinstance(error, dict) else None) or "BatchRequestError",
+                started_at=started_at
+            )
+        choice = body["choices"][0]
+        usage = body.get("usage") or {}
+        return AIResponse(
+            text=choice["message"]["content"] or "",
+            provider=self.provider_name,
+            model=body.get("model", self.model),
+            input_tokens=usage.get("prompt_tokens"),
+            output_tokens=usage.get("completion_tokens"),
+            finish_reason=choice.get("finish_reason"),
+            started_at=started_at,
+            latency=time.time() - started_at
+        )
+    
+    async def fetch_results(self, job: BatchJob) -> List[AIResponse]:
+        by_id: Dict[str, AIResponse] = {}
+        for key in ("output_file_id", "error_file_id"):
+            file_id = job.info.get(key)
+            if not file_id:
+                continue
+            raw = await asyncio.to_thread(self._http, "GET", f"/files/{file_id}/content")
+            for line in raw.decode("utf-8").splitlines():
+                if line.strip():
+                    item = json.loads(line)
+                    by_id[item["custom_id"]] = self._parse_line(item, job.created_at)
+        return self._match(job, by_id)
+
+
+class AnthropicBatchClient(BatchClient):
+    """Anthropic Message Batches API"""
+    
+    provider_name = "Claude"
+    default_base_url = "https://api.anthropic.com/v1"
+    api_version = "2023-06-01"
+    
+    def _headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.api_key, "anthropic-version": self.api_version}
+    
+    def build_requests(self, prompts: List[str], custom_ids: List[str], **options) -> List[Dict[str, Any]]:
+        requests = []
+        for custom_id, prompt in zip(custom_ids, prompts):
+            params = {
+                "model": self.model,
+                "max_tokens": options.get("max_tokens", 4000),
+                "temperature": options.get("temperature", 0.7),
+                "messages": [{"role": "user", "content": prompt}],
+            }
+            if options.get("system"):
+                params["system"] = options["system"]
+            requests.append({"custom_id": custom_id, "params": params})
+        return requests
+    
+    async def submit(self, prompts: List[str], **options) -> BatchJob:
+        custom_ids = self._custom_ids(len(prompts))
+        batch = await self._json("POST", "/messages/batches", {
+            "requests": self.build_requests(prompts, custom_ids, **options)
+        })
+        return BatchJob(batch["id"], self.provider_name, custom_ids,
+                        batch.get("processing_status", "in_progress"), info=batch)
+    
+    async def refresh(self, job: BatchJob) -> bool:
+        job.info = await self._json("GET", f"/messages/batches/{job.id}")
+        job.status = job.info.get("processing_status", job.status)
+        return job.status == "ended"
+    
+    def _parse_line(self, item: Dict[str, Any], started_at: float) -> AIResponse:
+        result = item.get("result") or {}
+        if result.get("type") != "succeeded":
+            error = (result.get("error") or {}).get("error") or result.get("error") or {}
+            return AIResponse.failure(
+                error.get("message") or f"Batch request {result.get('type', 'failed')}",
+                provider=self.provider_name,
+                model=self.model,
+                error_type=error.get("type") or result.get("type") or "BatchRequestError",
+                started_at=started_at
+            )
+        message = result["message"]
+        usage = message.get("usage") or {}
+        text = "".join(block.get("text", "") for block in message.get("content", [])
+                       if block.get("type") == "text")
+        return AIResponse(
+            text=text,
+            provider=self.provider_name,
+            model=message.get("model", self.model),
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens"),
+            finish_reason=message.get("stop_reason"),
+            started_at=started_at,
+            latency=time.time() - started_at
+        )
+    
+    async def fetch_results(self, job: BatchJob) -> List[AIResponse]:
+        by_id: Dict[str, AIResponse] = {}
+        results_url = job.info.get("results_url")
+        if results_url:
+            raw = await asyncio.to_thread(self._http, "GET", results_url)
+            for line in raw.decode("utf-8").splitlines():
+                if line.strip():
+                    item = json.loads(line)
+                    by_id[item["custom_id"]] = self._parse_line(item, job.created_at)
+        return self._match(job, by_id)
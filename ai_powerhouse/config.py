@@ -2,10 +2,44 @@
 Configuration management for AI Powerhouse
 """
 
+import json
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 from pydantic import BaseModel
+from .profiling import profiled, stage
+
+
+def _split_env(name: str) -> List[str]:
+    """Read a comma-separated list from the environment"""
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+
+class EndpointConfig(BaseModel):
+    """A named OpenAI-compatible inference server (vLLM, llama.cpp, Ollama, ...)"""
+    
+    base_url: str
+    model: str
+    api_key: Optional[str] = None
+    headers: Dict[str, str] = {}
+    timeout: Optional[float] = None
+    
+    @classmethod
+    def load_from_env(cls, name: str) -> "EndpointConfig":
+        """Load AI_ENDPOINT_<NAME>_{BASE_URL,MODEL,API_KEY,HEADERS,TIMEOUT}"""
+        prefix = f"AI_ENDPOINT_{name.upper().replace('-', '_')}_"
+        base_url = os.getenv(prefix + "BASE_URL")
+        model = os.getenv(prefix + "MODEL")
+        if not base_url or not model:
+            raise ValueError(f"Endpoint '{name}' needs {prefix}BASE_URL and {prefix}MODEL")
+        timeout = os.getenv(prefix + "TIMEOUT")
+        return cls(
+            base_url=base_url,
+            model=model,
+            api_key=os.getenv(prefix + "API_KEY"),
+            headers=json.loads(os.getenv(prefix + "HEADERS") or "{}"),
+            timeout=float(timeout) if timeout else None
+        )
 
 
 class Config(BaseModel):
@@ -16,35 +50,139 @@ class Config(BaseModel):
     google_api_key: Optional[str] = None
     openai_api_key: Optional[str] = None
     
+    # Extra keys per provider; requests are spread over all keys of a provider
+    anthropic_api_keys: List[str] = []
+    google_api_keys: List[str] = []
+    openai_api_keys: List[str] = []
+    rpm_per_key: Dict[str, int] = {}
+    
     # Model settings
     claude_model: str = "claude-3-sonnet-20240229"
     gemini_model: str = "gemini-pro"
     openai_model: str = "gpt-4"
     
+    # Fast, cheap models tried first in cascade mode
+    claude_fast_model: str = "claude-3-haiku-20240307"
+    gemini_fast_model: str = "gemini-1.5-flash"
+    openai_fast_model: str = "gpt-4o-mini"
+    
     # Generation settings
     max_tokens: int = 4000
     temperature: float = 0.7
     
+    # Prompt packing (opt-in micro-batching of short prompts)
+    pack_window: float = 0.02
+    pack_max_batch: int = 16
+    pack_max_prompt_chars: int = 500
+    
+    # Chat sessions: history sent per turn, turns folded into the summary at once,
+    # and recent turns always kept verbatim
+    session_token_budget: int = 4000
+    session_compact_turns: int = 4
+    session_keep_turns: int = 2
+    
+    # Shadow traffic: primary provider -> candidate "provider[:model]" mirrored in the background
+    shadow_targets: Dict[str, str] = {}
+    shadow_sample_rate: float = 0.1
+    shadow_max_concurrency: int = 2
+    
+    # Near-duplicate prompt cache (opt-in per call via ask(cache_similarity=...))
+    prompt_cache_size: int = 100_000
+    
+    # Interaction log: JSONL file of every provider call plus a searchable SQLite index
+    interaction_log: Optional[str] = None
+    interaction_log_max_bytes: int = 10_000_000
+    
+    # Tracing: OTLP/JSON span file, shared with PowerShell and other child processes
+    trace_file: Optional[str] = None
+    
+    # Request scheduler per provider (0 = off): requests in flight, slots kept for
+    # interactive requests, queue depth per priority class and per tenant, tenant shares
+    scheduler_concurrency: int = 0
+    scheduler_reserved: int = 1
+    scheduler_max_queue: int = 256
+    scheduler_max_queue_per_tenant: Optional[int] = None
+    tenant_weights: Dict[str, float] = {}
+    
+    # Batch endpoints (offline workloads)
+    anthropic_base_url: Optional[str] = None
+    openai_base_url: Optional[str] = None
+    batch_poll_interval: float = 30.0
+    
+    # Named OpenAI-compatible endpoints, usable as providers by name
+    endpoints: Dict[str, EndpointConfig] = {}
+    
+    # Providers used when a call does not name any (default: all configured)
+    default_providers: Optional[List[str]] = None
+    
     @classmethod
+    @profiled("config.load")
     def load_from_env(cls) -> "Config":
         """Load configuration from environment variables"""
-        load_dotenv()
+        with stage("dotenv"):
+            load_dotenv()
+        
+        endpoint_names = _split_env("AI_ENDPOINTS")
+        shadow_targets = dict(
+            item.split("=", 1) for item in _split_env("SHADOW_TARGETS") if "=" in item
+        )
+        default_providers = _split_env("DEFAULT_PROVIDERS")
+        tenant_weights = dict(
+            item.split("=", 1) for item in _split_env("TENANT_WEIGHTS") if "=" in item
+        )
+        max_queue_per_tenant = os.getenv("SCHEDULER_MAX_QUEUE_PER_TENANT")
+        rpm_per_key = {
+            name: int(os.environ[f"{name.upper()}_RPM_PER_KEY"])
+            for name in ("claude", "gemini", "openai") if os.getenv(f"{name.upper()}_RPM_PER_KEY")
+        }
         
         return cls(
             anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
             google_api_key=os.getenv("GOOGLE_API_KEY"),
             openai_api_key=os.getenv("OPENAI_API_KEY"),
+            anthropic_api_keys=_split_env("ANTHROPIC_API_KEYS"),
+            google_api_keys=_split_env("GOOGLE_API_KEYS"),
+            openai_api_keys=_split_env("OPENAI_API_KEYS"),
+            rpm_per_key=rpm_per_key,
             claude_model=os.getenv("CLAUDE_MODEL", "claude-3-sonnet-20240229"),
             gemini_model=os.getenv("GEMINI_MODEL", "gemini-pro"),
             openai_model=os.getenv("OPENAI_MODEL", "gpt-4"),
+            claude_fast_model=os.getenv("CLAUDE_FAST_MODEL", "claude-3-haiku-20240307"),
+            gemini_fast_model=os.getenv("GEMINI_FAST_MODEL", "gemini-1.5-flash"),
+            openai_fast_model=os.getenv("OPENAI_FAST_MODEL", "gpt-4o-mini"),
             max_tokens=int(os.getenv("MAX_TOKENS", "4000")),
-            temperature=float(os.getenv("TEMPERATURE", "0.7"))
+            temperature=float(os.getenv("TEMPERATURE", "0.7")),
+            pack_window=float(os.getenv("PACK_WINDOW", "0.02")),
+            pack_max_batch=int(os.getenv("PACK_MAX_BATCH", "16")),
+            pack_max_prompt_chars=int(os.getenv("PACK_MAX_PROMPT_CHARS", "500")),
+            session_token_budget=int(os.getenv("SESSION_TOKEN_BUDGET", "4000")),
+            session_compact_turns=int(os.getenv("SESSION_COMPACT_TURNS", "4")),
+            session_keep_turns=int(os.getenv("SESSION_KEEP_TURNS", "2")),
+            shadow_targets={name.strip(): target.strip() for name, target in shadow_targets.items()},
+            shadow_sample_rate=float(os.getenv("SHADOW_SAMPLE_RATE", "0.1")),
+            shadow_max_concurrency=int(os.getenv("SHADOW_MAX_CONCURRENCY", "2")),
+            prompt_cache_size=int(os.getenv("PROMPT_CACHE_SIZE", "100000")),
+            interaction_log=os.getenv("AI_INTERACTION_LOG"),
+            interaction_log_max_bytes=int(os.getenv("AI_INTERACTION_LOG_MAX_BYTES", "10000000")),
+            trace_file=os.getenv("AI_TRACE_FILE"),
+            scheduler_concurrency=int(os.getenv("SCHEDULER_CONCURRENCY", "0")),
+            scheduler_reserved=int(os.getenv("SCHEDULER_RESERVED", "1")),
+            scheduler_max_queue=int(os.getenv("SCHEDULER_MAX_QUEUE", "256")),
+            scheduler_max_queue_per_tenant=int(max_queue_per_tenant) if max_queue_per_tenant else None,
+            tenant_weights={name.strip(): float(weight) for name, weight in tenant_weights.items()},
+            anthropic_base_url=os.getenv("ANTHROPIC_BASE_URL"),
+            openai_base_url=os.getenv("OPENAI_BASE_URL"),
+            batch_poll_interval=float(os.getenv("BATCH_POLL_INTERVAL", "30")),
+            endpoints={name: EndpointConfig.load_from_env(name) for name in endpoint_names},
+            default_providers=default_providers or None
         )
     
     def validate_keys(self) -> dict:
         """Validate which API keys are available"""
         available = {}
-        available["claude"] = self.anthropic_api_key is not None
-        available["gemini"] = self.google_api_key is not None
-        available["openai"] = self.openai_api_key is not None
+        available["claude"] = self.anthropic_api_key is not None or bool(self.anthropic_api_keys)
+        available["gemini"] = self.google_api_key is not None or bool(self.google_api_keys)
+        available["openai"] = self.openai_api_key is not None or bool(self.openai_api_keys)
+        for name in self.endpoints:
+            available[name] = True
         return available
@@ -3,108 +3,516 @@ Core AI Powerhouse class that orchestrates multiple AI providers
 """
 
 import asyncio
-from typing import Dict, List, Optional, Any
-from .config import Config
-from .providers import ClaudeProvider, GeminiProvider, OpenAIProvider
+import functools
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from .config import Config, EndpointConfig
+from . import tracing
+from .deadline import Deadline
+from .profiling import profiled, stage
+from .response import AIResponse
+from .scheduler import Scheduler, SchedulerFull, current_request_class
+from .providers.registry import ProviderMap, provider_specs
 
 
 class AIPowerhouse:
     """Main class that coordinates multiple AI providers"""
     
+    @profiled("core.init")
     def __init__(self, config: Optional[Config] = None):
         self.config = config or Config.load_from_env()
-        self.providers = {}
+        self.providers = ProviderMap()
+        self._packers = {}
+        self._cascades = {}
+        self._shadows = {}
+        self._schedulers = {}
+        self.interaction_log = None
+        self._prompt_cache = None
+        if self.config.interaction_log:
+            from .interaction_log import InteractionLog
+            self.interaction_log = InteractionLog(
+                self.config.interaction_log, max_bytes=self.config.interaction_log_max_bytes
+            )
+        if self.config.trace_file:
+            tracing.configure(self.config.trace_file)
         self._initialize_providers()
+        for primary, target in self.config.shadow_targets.items():
+            self.enable_shadow(primary, target)
     
     def _initialize_providers(self):
-        """Initialize available AI providers based on configuration"""
-        available_keys = self.config.validate_keys()
-        
-        if available_keys["claude"] and self.config.anthropic_api_key:
-            self.providers["claude"] = ClaudeProvider(
-                api_key=self.config.anthropic_api_key,
-                model=self.config.claude_model
-            )
+        """Register configured providers; each is created on first use"""
+        for name, spec in provider_specs().items():
+            if spec.is_configured(self.config):
+                self.providers.register(name, functools.partial(spec.create, self.config))
         
-        if available_keys["gemini"] and self.config.google_api_key:
-            self.providers["gemini"] = GeminiProvider(
-                api_key=self.config.google_api_key,
-                model=self.config.gemini_model
-            )
+        for name, endpoint in self.config.endpoints.items():
+            self.providers.register(name, functools.partial(self._create_endpoint, name, endpoint))
+    
+    @staticmethod
+    def _create_endpoint(name: str, endpoint: EndpointConfig):
+        from .providers.openai_compatible import OpenAICompatibleProvider
+        return OpenAICompatibleProvider(
+            name,
+            base_url=endpoint.base_url,
+            model=endpoint.model,
+            api_key=endpoint.api_key,
+            headers=endpoint.headers,
+            timeout=endpoint.timeout
+        )
+    
+    def _generation_kwargs(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge per-call generation options over the configured defaults"""
+        kwargs = {
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature
+        }
+        kwargs.update(options)
+        return kwargs
+    
+    def generation_options(self, **options) -> Dict[str, Any]:
+        """The options a call with these overrides would be sent with"""
+        return self._generation_kwargs(options)
+    
+    async def _generate(self, provider_name: str, prompt: str, kwargs: Dict[str, Any],
+                        on_text: Optional[Callable[[str], None]] = None) -> AIResponse:
+        """Call one provider, mirroring the request to its shadow candidate if any
         
-        if available_keys["openai"] and self.config.openai_api_key:
-            self.providers["openai"] = OpenAIProvider(
-                api_key=self.config.openai_api_key,
-                model=self.config.openai_model
-            )
+        With on_text the response is streamed, each piece of text being passed
+        to on_text as it arrives.
+        """
+        shadow = self._shadows.get(provider_name)
+        mirror = shadow.mirror(prompt, kwargs) if shadow else None
+        response = None
+        attributes = {
+            "gen_ai.operation.name": "chat",
+            "gen_ai.system": provider_name,
+            "gen_ai.request.model": kwargs.get("model"),
+            "gen_ai.request.max_tokens": kwargs.get("max_tokens"),
+        }
+        try:
+            with stage("generate", provider_name), \
+                    tracing.span(f"chat {provider_name}", "client", attributes) as span:
+                response = await self._call_provider(provider_name, prompt, kwargs, on_text)
+                tracing.record_response(span, response)
+        finally:
+            if mirror is not None:
+                shadow.pair(mirror, response)
+        if self.interaction_log is not None:
+            self.interaction_log.record(provider_name, prompt, response, kwargs.get("system"))
+        return response
+    
+    async def _call_provider(self, provider_name: str, prompt: str, kwargs: Dict[str, Any],
+                             on_text: Optional[Callable[[str], None]]) -> AIResponse:
+        """Send the request once the provider's scheduler (if any) admits it"""
+        provider = self.providers[provider_name]
+        scheduler = self.scheduler(provider_name)
+        ticket = None
+        if scheduler is not None:
+            priority, tenant = current_request_class()
+            try:
+                with stage("queue"):
+                    # n candidates may be n concurrent requests (see _generate_concurrently)
+                    ticket = await scheduler.acquire(kwargs.get("priority") or priority,
+                                                     kwargs.get("tenant") or tenant,
+                                                     cost=kwargs.get("n", 1))
+            except SchedulerFull as e:
+                return AIResponse.failure(str(e), provider=provider_name, error_type="SchedulerFull")
+        try:
+            if on_text is None:
+                return await provider.generate_response(prompt, **kwargs)
+            return await provider.generate_stream(prompt, on_text, **kwargs)
+        finally:
+            if ticket is not None:
+                scheduler.release(ticket)
     
-    async def ask(self, prompt: str, providers: Optional[List[str]] = None) -> Dict[str, str]:
-        """Ask a question to multiple AI providers"""
+    def _select_providers(self, providers: Optional[List[str]] = None) -> List[str]:
+        """Resolve the requested provider names to configured providers
+        
+        Without an explicit list, config.default_providers is used when set (for
+        example to keep hot-path traffic on a local endpoint), else every provider.
+        """
         if providers is None:
-            providers = list(self.providers.keys())
-        
-        tasks = []
-        provider_names = []
-        
-        for provider_name in providers:
-            if provider_name in self.providers:
-                provider = self.providers[provider_name]
-                task = provider.generate_response(
-                    prompt,
-                    max_tokens=self.config.max_tokens,
-                    temperature=self.config.temperature
+            providers = self.config.default_providers or list(self.providers.keys())
+        return [name for name in providers if name in self.providers]
+    
+    async def ask_as_completed(
+        self,
+        prompt: str,
+        providers: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        **options
+    ) -> AsyncIterator[Tuple[str, AIResponse]]:
+        """Yield (provider, response) pairs as soon as each provider finishes
+        
+        If timeout is given it is an overall deadline in seconds: providers that
+        have not answered by then are cancelled (which aborts their HTTP
+        requests) and are simply not yielded. The deadline is also passed to
+        the providers as their request timeout; a deadline option from an
+        enclosing call is honoured if it expires sooner. Extra options (such
+        as system) are passed through to the providers.
+        """
+        deadline = Deadline.within(timeout, options.pop("deadline", None))
+        kwargs = self._generation_kwargs(options)
+        if deadline is not None:
+            kwargs["deadline"] = deadline
+        tasks = {}
+        for provider_name in self._select_providers(providers):
+            task = asyncio.ensure_future(self._generate(provider_name, prompt, kwargs))
+            tasks[task] = provider_name
+        
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline.remaining()
+                    if remaining <= 0:
+                        break
+                
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
                 )
-                tasks.append(task)
-                provider_names.append(provider_name)
+                for task in done:
+                    provider_name = tasks[task]
+                    if task.exception() is not None:
+                        yield provider_name, AIResponse.failure(
+                            task.exception(), provider=provider_name
+                        )
+                    else:
+                        yield provider_name, task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def ask(
+        self,
+        prompt: str,
+        providers: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        n: int = 1,
+        cache_similarity: Optional[float] = None,
+        **options
+    ) -> Dict[str, AIResponse]:
+        """Ask a question to multiple AI providers
+        
+        With n > 1 each provider samples n candidates, natively where the API
+        supports it; all of them are in the response's candidates list.
         
-        if not tasks:
+        timeout is an overall deadline in seconds, propagated to every
+        provider call; see ask_as_completed.
+        
+        cache_similarity opts this call into the near-duplicate prompt cache:
+        a provider that answered a prompt at least this similar (0-1, with
+        the same generation options) is not asked again; see prompt_cache.
+        
+        priority and tenant options place the calls in a scheduler class and
+        fair-share group when a scheduler is configured; see scheduler().
+        """
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        if n > 1:
+            options["n"] = n
+        deadline = Deadline.within(timeout, options.pop("deadline", None))
+        provider_names = self._select_providers(providers)
+        if not provider_names:
             return {"error": "No valid providers available"}
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        finished = {}
+        scopes = {}
+        if cache_similarity is not None:
+            from .prompt_cache import cached_copy
+            
+            kwargs = self._generation_kwargs(options)
+            for provider_name in provider_names:
+                scopes[provider_name] = self.prompt_cache.scope(provider_name, kwargs)
+                cached = self.prompt_cache.get(prompt, scopes[provider_name], cache_similarity)
+                if cached is not None:
+                    finished[provider_name] = cached_copy(cached)
+        
+        to_ask = [name for name in provider_names if name not in finished]
+        async for provider_name, response in self.ask_as_completed(
+            prompt, to_ask, deadline=deadline, **options
+        ):
+            finished[provider_name] = response
+            if provider_name in scopes and response.ok:
+                self.prompt_cache.put(prompt, response, scopes[provider_name])
         
         responses = {}
-        for i, result in enumerate(results):
-            provider_name = provider_names[i]
-            if isinstance(result, Exception):
-                responses[provider_name] = f"Error: {str(result)}"
-            else:
-                responses[provider_name] = result
+        for provider_name in provider_names:
+            if provider_name not in finished:
+                finished[provider_name] = AIResponse.failure(
+                    f"No response within {deadline.timeout}s",
+                    provider=provider_name,
+                    error_type="Timeout"
+                )
+            responses[provider_name] = finished[provider_name]
         
         return responses
     
-    async def ask_claude(self, prompt: str) -> str:
-        """Ask Claude specifically"""
-        if "claude" not in self.providers:
-            return "Claude provider not available"
+    async def ask_consensus(
+        self,
+        prompt: str,
+        providers: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        **options
+    ):
+        """Ask several providers and pick the answer that agrees most with the others
         
-        return await self.providers["claude"].generate_response(
-            prompt,
-            max_tokens=self.config.max_tokens,
-            temperature=self.config.temperature
-        )
+        Comparison is local (shingle similarity plus code-aware matching), so
+        no extra model call is made. Returns a ConsensusResult.
+        """
+        from .consensus import compare_responses
+        
+        responses = await self.ask(prompt, providers, timeout, **options)
+        if "error" in responses and not isinstance(responses["error"], AIResponse):
+            responses = {}
+        return compare_responses(responses)
     
-    async def ask_gemini(self, prompt: str) -> str:
-        """Ask Gemini specifically"""
-        if "gemini" not in self.providers:
-            return "Gemini provider not available"
+    async def ask_provider(self, provider_name: str, prompt: str, timeout: Optional[float] = None,
+                           on_text: Optional[Callable[[str], None]] = None, **options) -> AIResponse:
+        """Ask a single named provider
         
-        return await self.providers["gemini"].generate_response(
-            prompt,
-            max_tokens=self.config.max_tokens,
-            temperature=self.config.temperature
+        timeout (or a deadline option carried over from an enclosing call)
+        bounds the call end to end: it is the provider's request timeout, and
+        a call still running when it expires is cancelled and reported as a
+        Timeout failure. on_text streams the answer: it is called with each
+        piece of text as the provider produces it.
+        """
+        if provider_name not in self.providers:
+            spec = provider_specs().get(provider_name)
+            return AIResponse.failure(
+                f"{spec.display_name if spec else provider_name} provider not available",
+                provider=provider_name,
+                error_type="ProviderUnavailable"
+            )
+        
+        deadline = Deadline.within(timeout, options.pop("deadline", None))
+        kwargs = self._generation_kwargs(options)
+        if deadline is None:
+            return await self._generate(provider_name, prompt, kwargs, on_text)
+        kwargs["deadline"] = deadline
+        try:
+            return await deadline.wait(self._generate(provider_name, prompt, kwargs, on_text))
+        except asyncio.TimeoutError:
+            return AIResponse.failure(
+                f"No response within {deadline.timeout}s",
+                provider=provider_name,
+                error_type="Timeout"
+            )
+    
+    async def ask_packed(self, prompt: str, provider_name: Optional[str] = None) -> AIResponse:
+        """Ask a single provider, packing short prompts with concurrent ones
+        
+        Short prompts submitted within config.pack_window seconds of each other
+        are sent as one request and the reply is split back per prompt, which
+        raises throughput for many tiny classification-style prompts.
+        """
+        provider_name = provider_name or next(iter(self._select_providers()), None)
+        if provider_name not in self.providers:
+            return AIResponse.failure(
+                f"{provider_name} provider not available",
+                provider=provider_name,
+                error_type="ProviderUnavailable"
+            )
+        
+        packer = self._packers.get(provider_name)
+        if packer is None:
+            from .packing import PromptPacker
+            packer = self._packers[provider_name] = PromptPacker(
+                self,
+                provider_name,
+                window=self.config.pack_window,
+                max_batch=self.config.pack_max_batch,
+                max_prompt_chars=self.config.pack_max_prompt_chars
+            )
+        return await packer.submit(prompt)
+    
+    def enable_shadow(
+        self,
+        primary: str,
+        target: str,
+        sample_rate: Optional[float] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        """Mirror a sample of requests for primary to a "provider[:model]" candidate
+        
+        Shadow calls run in the background under their own concurrency cap,
+        at batch priority when the candidate has a scheduler, and never delay
+        the primary response; see shadow_report() for the results.
+        """
+        from .shadow import ShadowMode, parse_target
+        
+        candidate, model = parse_target(target)
+        shadow = ShadowMode(
+            self,
+            primary,
+            candidate or primary,
+            model,
+            sample_rate=self.config.shadow_sample_rate if sample_rate is None else sample_rate,
+            max_concurrency=max_concurrency or self.config.shadow_max_concurrency
         )
+        self._shadows[primary] = shadow
+        return shadow
     
-    async def ask_openai(self, prompt: str) -> str:
-        """Ask OpenAI specifically"""
-        if "openai" not in self.providers:
-            return "OpenAI provider not available"
+    def disable_shadow(self, primary: str):
+        self._shadows.pop(primary, None)
+    
+    def shadow_report(self) -> Dict[str, Dict[str, Any]]:
+        """Side-by-side primary/candidate statistics per shadowed provider"""
+        return {primary: shadow.report() for primary, shadow in self._shadows.items()}
+    
+    async def drain_shadow(self):
+        """Wait for in-flight shadow calls to finish"""
+        await asyncio.gather(*(shadow.drain() for shadow in self._shadows.values()))
+    
+    def scheduler(self, provider_name: str) -> Optional[Scheduler]:
+        """The request scheduler in front of a provider, or None unless config.scheduler_concurrency is set
+        
+        Calls choose their class and tenant with the priority ("interactive",
+        "normal" or "batch") and tenant options, or with a
+        scheduler.request_class() block around them. A call for n candidates
+        holds n slots. A call refused by admission control returns a
+        SchedulerFull failure.
+        """
+        if self.config.scheduler_concurrency < 1:
+            return None
+        scheduler = self._schedulers.get(provider_name)
+        if scheduler is None:
+            scheduler = self._schedulers[provider_name] = Scheduler(
+                self.config.scheduler_concurrency,
+                reserved=min(self.config.scheduler_reserved, self.config.scheduler_concurrency - 1),
+                max_queue=self.config.scheduler_max_queue,
+                max_queue_per_tenant=self.config.scheduler_max_queue_per_tenant,
+                weights=self.config.tenant_weights
+            )
+        return scheduler
+    
+    def scheduler_report(self) -> Dict[str, Dict[str, Any]]:
+        """Queue and wait statistics per scheduled provider"""
+        return {name: scheduler.report() for name, scheduler in self._schedulers.items()}
+    
+    @property
+    def prompt_cache(self):
+        """Near-duplicate response cache used by ask(cache_similarity=...)"""
+        if self._prompt_cache is None:
+            from .prompt_cache import PromptCache
+            self._prompt_cache = PromptCache(max_entries=self.config.prompt_cache_size)
+        return self._prompt_cache
+    
+    def search_history(self, query: str, limit: int = 10,
+                       provider_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Full-text search over logged prompts and responses (needs config.interaction_log)"""
+        if self.interaction_log is None:
+            raise RuntimeError("Interaction log not enabled. Set AI_INTERACTION_LOG to a file path")
+        return self.interaction_log.search(query, limit, provider_name)
+    
+    def recall(self, prompt: str, provider_name: Optional[str] = None,
+               system: Optional[str] = None) -> Optional[AIResponse]:
+        """A logged successful answer to exactly this prompt, to reuse instead of asking again"""
+        if self.interaction_log is None:
+            return None
+        return self.interaction_log.lookup(prompt, provider_name, system)
+    
+    def session(self, provider_name: Optional[str] = None, system: Optional[str] = None,
+                token_budget: Optional[int] = None):
+        """Start a multi-turn chat session with one provider
         
-        return await self.providers["openai"].generate_response(
-            prompt,
-            max_tokens=self.config.max_tokens,
-            temperature=self.config.temperature
+        The session sends recent turns verbatim and a summary of older ones,
+        keeping each request within token_budget (config.session_token_budget).
+        """
+        from .session import ChatSession
+        
+        return ChatSession(
+            self,
+            provider_name or next(iter(self._select_providers()), None),
+            system=system,
+            token_budget=token_budget or self.config.session_token_budget,
+            compact_turns=self.config.session_compact_turns,
+            keep_turns=self.config.session_keep_turns
         )
     
+    def cascade(self, provider_name: Optional[str] = None):
+        """The fast-model-first cascade for a provider, kept so its stats accumulate"""
+        from .cascade import Cascade, CascadeStep
+        
+        provider_name = provider_name or next(iter(self._select_providers()), None)
+        if provider_name not in self._cascades:
+            spec = provider_specs().get(provider_name)
+            fast_model = spec.fast_model(self.config) if spec else None
+            steps = [CascadeStep(provider_name)]
+            if fast_model and fast_model != spec.model(self.config):
+                steps.insert(0, CascadeStep(provider_name, fast_model))
+            self._cascades[provider_name] = Cascade(self, steps)
+        return self._cascades[provider_name]
+    
+    async def ask_cascade(
+        self,
+        prompt: str,
+        provider_name: Optional[str] = None,
+        validators: Optional[List[Any]] = None,
+        **options
+    ) -> AIResponse:
+        """Ask the provider's fast model first, escalating to the configured model
+        
+        The fast answer is kept unless a validator rejects it (by default: empty,
+        truncated or refusing answers); see ai_powerhouse.cascade for more.
+        """
+        return await self.cascade(provider_name).run(prompt, validators, **options)
+    
+    def batch_client(self, provider_name: str):
+        """Create a batch-endpoint client for claude or openai
+        
+        A batch job can only be polled and downloaded with the key that
+        submitted it, so batches run on a single key: the provider's primary
+        key, or the first of its *_API_KEYS pool. The pool's rotation and
+        per-key budgets do not apply.
+        """
+        from .batch import AnthropicBatchClient, OpenAIBatchClient
+        
+        spec = provider_specs().get(provider_name)
+        keys = spec.api_keys(self.config) if spec else []
+        if provider_name == "claude" and keys:
+            return AnthropicBatchClient(
+                keys[0],
+                self.config.claude_model,
+                base_url=self.config.anthropic_base_url,
+                poll_interval=self.config.batch_poll_interval
+            )
+        if provider_name == "openai" and keys:
+            return OpenAIBatchClient(
+                keys[0],
+                self.config.openai_model,
+                base_url=self.config.openai_base_url,
+                poll_interval=self.config.batch_poll_interval
+            )
+        raise ValueError(f"Batch submission is not available for provider '{provider_name}'")
+    
+    async def ask_batch(
+        self,
+        prompts: List[str],
+        provider_name: str = "openai",
+        timeout: Optional[float] = None,
+        **options
+    ) -> List[AIResponse]:
+        """Run prompts through a provider's asynchronous batch endpoint
+        
+        Much cheaper than per-prompt calls but may take hours; responses are
+        returned in prompt order, with failed requests as failed AIResponses.
+        """
+        client = self.batch_client(provider_name)
+        return await client.run(prompts, timeout=timeout, **self._generation_kwargs(options))
+    
+    async def ask_claude(self, prompt: str) -> AIResponse:
+        """Ask Claude specifically"""
+        return await self.ask_provider("claude", prompt)
+    
+    async def ask_gemini(self, prompt: str) -> AIResponse:
+        """Ask Gemini specifically"""
+        return await self.ask_provider("gemini", prompt)
+    
+    async def ask_openai(self, prompt: str) -> AIResponse:
+        """Ask OpenAI specifically"""
+        return await self.ask_provider("openai", prompt)
+    
     def get_available_providers(self) -> List[str]:
         """Get list of available providers"""
         return list(self.providers.keys())
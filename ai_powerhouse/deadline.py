@@ -0,0 +1,60 @@
+"""
+Per-request deadlines that travel with a call down to the transport
+
+A Deadline is created once, where the caller states how long it is willing
+to wait, and passed to providers as the "deadline" option. Providers hand
+the remaining time to their SDK as the request timeout, and the awaiting
+side cancels the provider task when it expires. Provider calls use the SDKs'
+async clients, so cancelling the task closes the HTTP request instead of
+leaving a worker thread and a connection busy until the server answers.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """A point in time (on the monotonic clock) by which a request must finish"""
+    
+    __slots__ = ("timeout", "expires_at")
+    
+    def __init__(self, timeout: float):
+        if timeout < 0:
+            raise ValueError("timeout must not be negative")
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+    
+    @classmethod
+    def within(cls, timeout: Optional[float] = None,
+               deadline: Optional["Deadline"] = None) -> Optional["Deadline"]:
+        """The earlier of an existing deadline and a new timeout, or None if neither is set"""
+        if timeout is None:
+            return deadline
+        new = cls(timeout)
+        if deadline is not None and deadline.expires_at <= new.expires_at:
+            return deadline
+        return new
+    
+    def remaining(self) -> float:
+        """Seconds left, never negative"""
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+    
+    async def wait(self, awaitable: Awaitable[T]) -> T:
+        """Await within the deadline; on expiry the awaitable is cancelled and TimeoutError raised"""
+        return await asyncio.wait_for(awaitable, self.remaining())
+    
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+
+def request_timeout(kwargs: Dict[str, Any]) -> Optional[float]:
+    """Seconds left on the "deadline" option, for use as an SDK request timeout"""
+    deadline = kwargs.get("deadline")
+    return None if deadline is None else deadline.remaining()
@@ -0,0 +1,354 @@
+"""
+Diff-aware code review that sends only changed regions to providers
+"""
+
+import ast
+import asyncio
+import re
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .core import AIPowerhouse
+from .response import AIResponse
+
+
+REVIEW_INSTRUCTION = (
+    "Review the following changed code regions for bugs, security issues and "
+    "maintainability problems. Lines are prefixed with their line number in the "
+    "file, and changed lines are marked with '+'. Only comment on the changed "
+    "lines and their direct impact. Report every finding on its own line as "
+    "'<path>:<line>: <severity>: <description>'."
+)
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+FINDING_PATTERN = re.compile(r"([\w./\\-]+\.\w+):(\d+)(?::\d+)?[:\s-]+(.+)")
+
+# Lines that open a function/class in common non-Python languages
+DEFINITION_PATTERN = re.compile(
+    r"^\s*(?!(?:if|for|foreach|while|switch|catch|else|return|do|try|using|lock)\b)"
+    r"(?:export\s+)?(?:(?:public|private|protected|internal|static|async|override|abstract)\s+)*"
+    r"(?:function\b|class\b|interface\b|struct\b|impl\b|fn\b|func\b|def\b|sub\b|"
+    r"[\w<>\[\],]+\s+\w+\s*\([^;]*\)\s*\{?\s*$|"
+    r"(?:const|let|var)?\s*\w+\s*[:=]\s*(?:async\s*)?\([^)]*\)\s*=>)"
+)
+
+
+class ReviewRegion:
+    """A contiguous block of a file selected for review"""
+    
+    __slots__ = ("path", "start", "end", "changed", "symbol")
+    
+    def __init__(self, path: str, start: int, end: int, changed: List[int],
+                 symbol: Optional[str] = None):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.changed = changed
+        self.symbol = symbol
+    
+    def __repr__(self) -> str:
+        return f"ReviewRegion({self.path}:{self.start}-{self.end}, symbol={self.symbol!r})"
+
+
+class ReviewFinding:
+    """A review comment mapped back to a file location"""
+    
+    __slots__ = ("path", "line", "message", "provider", "symbol")
+    
+    def __init__(self, path: str, line: int, message: str, provider: str,
+                 symbol: Optional[str] = None):
+        self.path = path
+        self.line = line
+        self.message = message
+        self.provider = provider
+        self.symbol = symbol
+    
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def git_diff(base: Optional[str] = None, staged: bool = False,
+             paths: Optional[List[str]] = None, cwd: Optional[str] = None) -> str:
+    """Return a zero-context unified diff from git, with paths relative to cwd"""
+    cmd = ["git", "diff", "-U0", "--no-color", "--no-ext-diff", "--relative"]
+    if staged:
+        cmd.append("--cached")
+    if base:
+        cmd.append(base)
+    if paths:
+        cmd.append("--")
+        cmd.extend(paths)
+    result = subprocess.run(cmd, capture_output=True, text=True, cwd=cwd,
+                            encoding="utf-8", errors="replace")
+    if result.returncode != 0:
+        raise RuntimeError(f"git diff failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def git_index_file(path: str, cwd: Optional[str] = None) -> Optional[str]:
+    """The staged content of a file (path relative to cwd), or None if it is not in the index"""
+    result = subprocess.run(["git", "show", f":./{path}"], capture_output=True, text=True, cwd=cwd,
+                            encoding="utf-8", errors="replace")
+    return result.stdout if result.returncode == 0 else None
+
+
+def parse_unified_diff(diff_text: str) -> Dict[str, List[int]]:
+    """Map each changed file to the new-side line numbers touched by the diff
+    
+    Pure deletions are recorded against the line that now follows them so the
+    surrounding code still gets reviewed. Deleted files are ignored.
+    """
+    changes: Dict[str, List[int]] = {}
+    current: Optional[str] = None
+    # Lines of the current hunk still to come on each side; while any are
+    # left, a line is hunk content even if it looks like a header ("+++ x"
+    # is an added line starting with "++ ")
+    old_left = new_left = 0
+    for line in diff_text.splitlines():
+        if old_left > 0 or new_left > 0:
+            if line.startswith("-"):
+                old_left -= 1
+            elif line.startswith("+"):
+                new_left -= 1
+            elif not line.startswith("\\"):
+                old_left -= 1
+                new_left -= 1
+            continue
+        if line.startswith("+++ "):
+            target = line[4:].strip()
+            if target == "/dev/null":
+                current = None
+            else:
+                current = target[2:] if target.startswith("b/") else target
+                changes.setdefault(current, [])
+            continue
+        match = HUNK_HEADER.match(line)
+        if match is None:
+            continue
+        old_left = int(match.group(1)) if match.group(1) is not None else 1
+        new_left = int(match.group(3)) if match.group(3) is not None else 1
+        if current is None:
+            continue
+        start = int(match.group(2))
+        if new_left == 0:
+            changes[current].append(max(start, 1))
+        else:
+            changes[current].extend(range(start, start + new_left))
+    return {path: sorted(set(lines)) for path, lines in changes.items() if lines}
+
+
+def _python_blocks(source: str) -> List[Tuple[int, int, str]]:
+    """Return (start, end, name) for every function and class in Python source"""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+    blocks = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            blocks.append((start, node.end_lineno or node.lineno, node.name))
+    return blocks
+
+
+def _heuristic_block(lines: List[str], line_no: int) -> Optional[Tuple[int, int, str]]:
+    """Find the enclosing definition of a line in brace or indent based languages"""
+    for start in range(line_no, 0, -1):
+        text = lines[start - 1]
+        if text.lstrip().startswith("}") or not DEFINITION_PATTERN.match(text):
+            continue
+        
+        indent = len(text) - len(text.lstrip())
+        depth = 0
+        opened = False
+        end = len(lines)
+        for current in range(start, len(lines) + 1):
+            body = lines[current - 1]
+            depth += body.count("{") - body.count("}")
+            opened = opened or "{" in body
+            if opened and depth <= 0:
+                end = current
+                break
+            stripped = body.strip()
+            if not opened and current > start and stripped and not stripped.startswith("{"):
+                # No braces yet: treat the block as indentation based
+                if len(body) - len(body.lstrip()) <= indent:
+                    end = current - 1
+                    break
+        
+        if end < line_no:
+            # This definition ends before the change; keep looking outwards
+            continue
+        name = re.findall(r"\w+", text.split("(")[0].split("=")[0])
+        return start, end, name[-1] if name else None
+    return None
+
+
+def find_regions(path: str, source: str, changed: List[int], context: int = 3,
+                 max_region_lines: int = 200) -> List[ReviewRegion]:
+    """Expand changed lines to their enclosing function or class
+    
+    Changes outside any definition, or inside one larger than max_region_lines,
+    are reviewed with a small window of surrounding context instead.
+    """
+    lines = source.splitlines()
+    total = len(lines)
+    blocks = _python_blocks(source) if path.endswith(".py") else []
+    
+    spans: List[Tuple[int, int, Optional[str]]] = []
+    for line_no in changed:
+        line_no = min(max(line_no, 1), max(total, 1))
+        if path.endswith(".py"):
+            candidates = [b for b in blocks if b[0] <= line_no <= b[1]]
+            candidates = [b for b in candidates if b[1] - b[0] < max_region_lines]
+            block = min(candidates, key=lambda b: b[1] - b[0]) if candidates else None
+        else:
+            block = _heuristic_block(lines, line_no)
+            if block and block[1] - block[0] >= max_region_lines:
+                block = None
+        if block:
+            spans.append(block)
+        else:
+            spans.append((max(1, line_no - context), min(total, line_no + context), None))
+    
+    regions: List[ReviewRegion] = []
+    for start, end, symbol in sorted(spans, key=lambda span: span[:2]):
+        if regions and start <= regions[-1].end + 1:
+            last = regions[-1]
+            last.end = max(last.end, end)
+            last.symbol = last.symbol or symbol
+        else:
+            regions.append(ReviewRegion(path, start, end, [], symbol))
+    for region in regions:
+        region.changed = [n for n in changed if region.start <= n <= region.end]
+    return regions
+
+
+def render_regions(regions: List[ReviewRegion], source: str) -> str:
+    """Render regions with original line numbers and change markers"""
+    lines = source.splitlines()
+    parts = []
+    for region in regions:
+        header = f"### {region.path}:{region.start}-{region.end}"
+        if region.symbol:
+            header += f" ({region.symbol})"
+        parts.append(header)
+        changed = set(region.changed)
+        for line_no in range(region.start, region.end + 1):
+            marker = "+" if line_no in changed else " "
+            parts.append(f"{line_no:>5}{marker}| {lines[line_no - 1] if line_no <= len(lines) else ''}")
+        parts.append("")
+    return "\n".join(parts)
+
+
+def parse_findings(text: str, regions: List[ReviewRegion], provider: str) -> List[ReviewFinding]:
+    """Extract '<path>:<line>: ...' findings and attach them to their regions"""
+    by_path: Dict[str, List[ReviewRegion]] = {}
+    for region in regions:
+        by_path.setdefault(region.path, []).append(region)
+    
+    findings = []
+    for line in text.splitlines():
+        match = FINDING_PATTERN.search(line)
+        if not match:
+            continue
+        path = match.group(1).replace("\\", "/")
+        # Models sometimes shorten or prefix paths; match on suffix
+        known = next((p for p in by_path if p == path or p.endswith("/" + path) or path.endswith("/" + p)), None)
+        if known is None:
+            continue
+        line_no = int(match.group(2))
+        region = next((r for r in by_path[known] if r.start <= line_no <= r.end), None)
+        findings.append(ReviewFinding(
+            known, line_no, match.group(3).strip(), provider, region.symbol if region else None
+        ))
+    return findings
+
+
+class DiffReviewReport:
+    """Outcome of a diff review"""
+    
+    def __init__(self):
+        self.regions: Dict[str, List[ReviewRegion]] = {}
+        self.responses: Dict[str, Dict[str, AIResponse]] = {}
+        self.findings: List[ReviewFinding] = []
+        self.prompt_chars = 0
+        self.full_file_chars = 0
+    
+    @property
+    def reduction(self) -> float:
+        """How many times smaller the prompts were than sending whole files"""
+        if not self.prompt_chars:
+            return 0.0
+        return self.full_file_chars / self.prompt_chars
+
+
+class DiffReviewer:
+    """Review only the code touched by a diff"""
+    
+    def __init__(self, ai: Optional[AIPowerhouse] = None, providers: Optional[List[str]] = None,
+                 instruction: str = REVIEW_INSTRUCTION, context: int = 3,
+                 max_region_lines: int = 200, agents: Optional[List[str]] = None):
+        self.ai = ai or AIPowerhouse()
+        self.providers = providers
+        self.agents = agents
+        self.instruction = instruction
+        self.context = context
+        self.max_region_lines = max_region_lines
+    
+    def build_prompt(self, regions: List[ReviewRegion], source: str) -> str:
+        return f"{self.instruction}\n\n{render_regions(regions, source)}"
+    
+    async def review(self, diff_text: str, root: str = ".", staged: bool = False) -> DiffReviewReport:
+        """Review every file in a unified diff, one request per file
+        
+        Context comes from the files under root, or from the git index when
+        staged is set, so that it matches the line numbers of a --cached diff.
+        """
+        report = DiffReviewReport()
+        jobs = []
+        for path, changed in parse_unified_diff(diff_text).items():
+            if staged:
+                source = await asyncio.to_thread(git_index_file, path, root)
+            else:
+                file_path = Path(root) / path
+                source = file_path.read_text(encoding="utf-8", errors="replace") if file_path.is_file() else None
+            if source is None:
+                continue
+            regions = find_regions(path, source, changed, self.context, self.max_region_lines)
+            if not regions:
+                continue
+            prompt = self.build_prompt(regions, source)
+            report.regions[path] = regions
+            report.prompt_chars += len(prompt)
+            report.full_file_chars += len(self.instruction) + len(source)
+            jobs.append((path, prompt))
+        
+        results = await asyncio.gather(*(self._dispatch(prompt) for _, prompt in jobs))
+        for (path, _), responses in zip(jobs, results):
+            report.responses[path] = responses
+            for provider, response in responses.items():
+                if isinstance(response, AIResponse) and response.ok:
+                    report.findings.extend(parse_findings(response.text, report.regions[path], provider))
+        return report
+    
+    async def _dispatch(self, prompt: str) -> Dict[str, AIResponse]:
+        """Send a review prompt to the configured agents, or else to the providers"""
+        if not self.agents:
+            return await self.ai.ask(prompt, self.providers)
+        
+        from .agents import get_registry
+        registry = get_registry()
+        provider = self.providers[0] if self.providers else None
+        names = [registry.resolve(name) for name in self.agents]
+        responses = await asyncio.gather(*(
+            registry.get(name).ask(self.ai, prompt, provider) for name in names
+        ))
+        return dict(zip(names, responses))
+    
+    async def review_git(self, base: Optional[str] = None, staged: bool = False,
+                         paths: Optional[List[str]] = None, root: str = ".") -> DiffReviewReport:
+        """Review the working tree, index or a revision range straight from git"""
+        diff_text = await asyncio.to_thread(git_diff, base, staged, paths, root)
+        return await self.review(diff_text, root, staged=staged)
@@ -0,0 +1,274 @@
+"""
+Structured interaction log with a background writer and a full-text index
+
+Every provider call can be recorded as one JSON line. record() only puts the
+entry on a queue; a writer thread batches entries into the JSONL file
+(rotating it by size) and into a SQLite index, with FTS5 full-text search
+where the SQLite build supports it and LIKE matching otherwise. The index
+lets earlier answers be searched and reused instead of generated again.
+"""
+
+import atexit
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .response import AIResponse
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY,
+    ts REAL,
+    provider TEXT,
+    model TEXT,
+    prompt_hash TEXT,
+    prompt TEXT,
+    response TEXT,
+    ok INTEGER,
+    latency REAL,
+    input_tokens INTEGER,
+    output_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS interactions_prompt ON interactions (prompt_hash, provider);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS interactions_fts USING fts5(
+    prompt, response, content='interactions', content_rowid='id'
+);
+"""
+
+COLUMNS = ("ts", "provider", "model", "prompt_hash", "prompt", "response", "ok",
+           "latency", "input_tokens", "output_tokens")
+
+
+def prompt_hash(prompt: str, system: Optional[str] = None) -> str:
+    """Key identifying a prompt (and its system prompt) for reuse lookups"""
+    return hashlib.sha256(f"{system or ''}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class InteractionLog:
+    """Append-only JSONL log of prompts and responses, indexed for search
+    
+    At most max_pending entries wait for the writer; beyond that new entries
+    are dropped (and counted) rather than slowing callers down. The log file
+    is rotated to path.1 ... path.<backups> once it exceeds max_bytes.
+    search() and lookup() wait at most flush_timeout seconds for queued
+    entries to be written, so a slow disk cannot stall their callers.
+    """
+    
+    def __init__(self, path: str, max_bytes: int = 10_000_000, backups: int = 3,
+                 index_path: Optional[str] = None, index: bool = True,
+                 batch_size: int = 100, flush_interval: float = 1.0, max_pending: int = 10_000,
+                 flush_timeout: float = 2.0):
+        self.path = Path(path).expanduser()
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.index_path = Path(index_path) if index_path else self.path.with_suffix(".sqlite")
+        self.index = index
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.flush_timeout = flush_timeout
+        self.dropped = 0
+        self.errors = 0
+        self.fts = False
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if index:
+            self._init_index()
+    
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(str(self.index_path), timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+    
+    def _init_index(self):
+        with contextlib.closing(self._connect()) as connection:
+            connection.executescript(SCHEMA)
+            try:
+                connection.executescript(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: search falls back to LIKE
+                self.fts = False
+    
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="interaction-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+    
+    def record(self, provider: str, prompt: str, response: AIResponse, system: Optional[str] = None):
+        """Queue an interaction for writing; never blocks on I/O"""
+        if self._closed:
+            return
+        if self._queue.qsize() >= self.max_pending:
+            self.dropped += 1
+            return
+        entry = {
+            "ts": response.started_at or time.time(),
+            "provider": provider,
+            "model": response.model,
+            "prompt_hash": prompt_hash(prompt, system),
+            "prompt": prompt,
+            "system": system,
+            "response": response.text,
+            "ok": response.ok,
+            "error": response.error,
+            "latency": response.latency,
+            "input_tokens": response.input_tokens,
+            "output_tokens": response.output_tokens,
+            "finish_reason": response.finish_reason,
+        }
+        self._start()
+        self._queue.put(entry)
+    
+    def _run(self):
+        connection = None
+        if self.index:
+            try:
+                connection = self._connect()
+            except sqlite3.Error:
+                logger.exception("Could not open the interaction index %s; writing the JSONL log only", self.index_path)
+        try:
+            while True:
+                try:
+                    first = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                batch = [first]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                entries = [entry for entry in batch if entry is not None]
+                try:
+                    if entries:
+                        self._write(entries, connection)
+                except Exception:
+                    # A full disk, locked index or bad entry must not stop the writer
+                    self.errors += len(entries)
+                    logger.exception("Could not write %d interaction log entries", len(entries))
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if None in batch:
+                    return
+        finally:
+            if connection is not None:
+                connection.close()
+    
+    def _write(self, entries: List[Dict[str, Any]], connection: Optional[sqlite3.Connection]):
+        data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+        if self.path.stat().st_size > self.max_bytes:
+            self._rotate()
+        if connection is None:
+            return
+        with connection:
+            for entry in entries:
+                cursor = connection.execute(
+                    f"INSERT INTO interactions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    [entry[column] for column in COLUMNS]
+                )
+                if self.fts:
+                    connection.execute(
+                        "INSERT INTO interactions_fts (rowid, prompt, response) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, entry["prompt"], entry["response"])
+                    )
+    
+    def _rotate(self):
+        for number in range(self.backups, 0, -1):
+            source = self.path if number == 1 else self.path.with_name(f"{self.path.name}.{number - 1}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{number}"))
+        if self.backups == 0:
+            self.path.unlink()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued entry has been written; False if timeout expired first"""
+        if self._thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = self._queue.all_tasks_done
+        with done:
+            while self._queue.unfinished_tasks and self._thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                done.wait(remaining)
+        return not self._queue.unfinished_tasks
+    
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+    
+    def search(self, query: str, limit: int = 10, provider: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Logged interactions whose prompt or response matches query, best matches first"""
+        if not self.index:
+            raise RuntimeError("The interaction log was created without an index")
+        if not query.split():
+            # An empty FTS MATCH is a syntax error, and LIKE '%%' would match everything
+            return []
+        self.flush(self.flush_timeout)
+        columns = ", ".join(f"i.{column}" for column in COLUMNS)
+        where = " AND i.provider = ?" if provider else ""
+        params: List[Any] = []
+        with contextlib.closing(self._connect()) as connection:
+            connection.row_factory = sqlite3.Row
+            if self.fts:
+                # Quote each word so user input cannot form FTS syntax
+                terms = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+                sql = (f"SELECT {columns} FROM interactions_fts f JOIN interactions i ON i.id = f.rowid "
+                       f"WHERE interactions_fts MATCH ?{where} ORDER BY bm25(interactions_fts) LIMIT ?")
+                params.append(terms)
+            else:
+                sql = (f"SELECT {columns} FROM interactions i WHERE (i.prompt LIKE ? OR i.response LIKE ?)"
+                       f"{where} ORDER BY i.ts DESC LIMIT ?")
+                params.extend([f"%{query}%"] * 2)
+            if provider:
+                params.append(provider)
+            params.append(limit)
+            return [dict(row) for row in connection.execute(sql, params)]
+    
+    def lookup(self, prompt: str, provider: Optional[str] = None,
+               system: Optional[str] = None) -> Optional[AIResponse]:
+        """The latest successful logged answer to exactly this prompt, if any"""
+        if not self.index:
+            return None
+        self.flush(self.flush_timeout)
+        sql = "SELECT provider, model, response, input_tokens, output_tokens FROM interactions WHERE prompt_hash = ? AND ok = 1"
+        params: List[Any] = [prompt_hash(prompt, system)]
+        if provider:
+            sql += " AND provider = ?"
+            params.append(provider)
+        with contextlib.closing(self._connect()) as connection:
+            row = connection.execute(sql + " ORDER BY ts DESC LIMIT 1", params).fetchone()
+        if row is None:
+            return None
+        return AIResponse(
+            text=row[2], provider=row[0], model=row[1], input_tokens=row[3],
+            output_tokens=row[4], finish_reason="logged", latency=0.0
+        )
@@ -0,0 +1,160 @@
+"""
+API key pools that spread traffic over several keys of one provider
+"""
+
+import asyncio
+import collections
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from .deadline import request_timeout
+from .providers.base import BaseProvider
+from .response import AIResponse
+
+
+AUTH_ERRORS = {"AuthenticationError", "PermissionDeniedError", "Unauthenticated", "PermissionDenied"}
+QUOTA_ERRORS = {"RateLimitError", "ResourceExhausted", "TooManyRequests"}
+
+
+def classify_error(response: AIResponse) -> Optional[str]:
+    """Return 'auth' or 'quota' for failures that are specific to the key used"""
+    if response.ok:
+        return None
+    error_type = response.error_type or ""
+    message = (response.error or "").lower()
+    if error_type in AUTH_ERRORS or "invalid api key" in message or "error code: 401" in message:
+        return "auth"
+    if (error_type in QUOTA_ERRORS or "error code: 429" in message
+            or "quota" in message or "rate limit" in message):
+        return "quota"
+    return None
+
+
+class KeySlot:
+    """One API key with its own client and usage counters"""
+    
+    __slots__ = ("provider", "in_flight", "recent", "cooldown_until", "requests", "failures", "tokens")
+    
+    def __init__(self, provider: BaseProvider):
+        self.provider = provider
+        self.in_flight = 0
+        self.recent: Deque[float] = collections.deque()
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.tokens = 0
+    
+    def prune(self, now: float):
+        while self.recent and now - self.recent[0] >= 60:
+            self.recent.popleft()
+    
+    def available_at(self, now: float, rpm: Optional[int]) -> float:
+        """Earliest time this key may take another request"""
+        ready = self.cooldown_until
+        if rpm and len(self.recent) >= rpm:
+            ready = max(ready, self.recent[len(self.recent) - rpm] + 60)
+        return max(ready, now)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "requests_last_minute": len(self.recent),
+            "cooling_down": self.cooldown_until > time.monotonic(),
+            "requests": self.requests,
+            "failures": self.failures,
+            "tokens": self.tokens,
+        }
+
+
+class PooledProvider(BaseProvider):
+    """Send each request through the least-loaded key of a provider
+    
+    Every key has its own provider instance (and therefore client), optional
+    requests-per-minute budget and in-flight count. Keys that fail with auth
+    or quota errors are taken out of rotation for a cooldown period and the
+    request is retried on another key, so throughput scales with key count.
+    """
+    
+    def __init__(self, providers: List[BaseProvider], rpm_per_key: Optional[int] = None,
+                 auth_cooldown: float = 300.0, quota_cooldown: float = 60.0,
+                 max_wait: float = 60.0):
+        if not providers:
+            raise ValueError("A key pool needs at least one provider")
+        super().__init__(providers[0].api_key, providers[0].model)
+        self.slots = [KeySlot(provider) for provider in providers]
+        self.rpm_per_key = rpm_per_key
+        self.auth_cooldown = auth_cooldown
+        self.quota_cooldown = quota_cooldown
+        self.max_wait = max_wait
+    
+    @property
+    def provider_name(self) -> str:
+        return self.slots[0].provider.provider_name
+    
+    async def _acquire(self, exclude: List[KeySlot], max_wait: Optional[float] = None) -> Optional[KeySlot]:
+        """Pick the least-loaded usable key, waiting if all are cooling down or at budget"""
+        max_wait = self.max_wait if max_wait is None else min(max_wait, self.max_wait)
+        while True:
+            now = time.monotonic()
+            candidates = [slot for slot in self.slots if slot not in exclude]
+            if not candidates:
+                return None
+            for slot in candidates:
+                slot.prune(now)
+            ready = [slot for slot in candidates if slot.available_at(now, self.rpm_per_key) <= now]
+            if ready:
+                slot = min(ready, key=lambda s: (s.in_flight, len(s.recent)))
+                slot.in_flight += 1
+                slot.recent.append(now)
+                slot.requests += 1
+                return slot
+            wake = min(slot.available_at(now, self.rpm_per_key) for slot in candidates)
+            if wake - now > max_wait:
+                return None
+            await asyncio.sleep(wake - now)
+    
+    async def generate_response(self, prompt: str, **kwargs) -> AIResponse:
+        """Generate a response on the best available key, failing over on key errors"""
+        return await self._call(lambda provider: provider.generate_response(prompt, **kwargs), kwargs)
+    
+    async def generate_stream(self, prompt: str, on_text: Callable[[str], None], **kwargs) -> AIResponse:
+        """Stream a response on the best available key, failing over on key errors"""
+        return await self._call(lambda provider: provider.generate_stream(prompt, on_text, **kwargs), kwargs)
+    
+    async def _call(self, call: Callable[[BaseProvider], Awaitable[AIResponse]],
+                    kwargs: Dict[str, Any]) -> AIResponse:
+        tried: List[KeySlot] = []
+        response = None
+        while True:
+            # Do not wait for a key past the request's deadline
+            slot = await self._acquire(tried, request_timeout(kwargs))
+            if slot is None:
+                if response is not None:
+                    return response
+                return AIResponse.failure(
+                    f"All {len(self.slots)} API keys are cooling down or over budget",
+                    provider=self.provider_name,
+                    model=self.model,
+                    error_type="KeyPoolExhausted"
+                )
+            tried.append(slot)
+            try:
+                response = await call(slot.provider)
+            finally:
+                slot.in_flight -= 1
+            slot.tokens += response.total_tokens or 0
+            
+            problem = classify_error(response)
+            if problem is None:
+                return response
+            slot.failures += 1
+            cooldown = self.auth_cooldown if problem == "auth" else self.quota_cooldown
+            slot.cooldown_until = time.monotonic() + cooldown
+    
+    def validate_connection(self) -> bool:
+        return any(slot.provider.validate_connection() for slot in self.slots)
+    
+    def get_provider_info(self) -> Dict[str, Any]:
+        info = super().get_provider_info()
+        info["keys"] = [slot.to_dict() for slot in self.slots]
+        return info
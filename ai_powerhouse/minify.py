@@ -0,0 +1,301 @@
+"""
+Compress code context before it is sent to a provider
+
+Source files pasted into prompts carry a lot that does not help a review:
+license headers, long comment blocks, runs of blank lines, large data
+literals, lockfiles and vendored code. minify_source() strips or elides those
+regions per language and keeps a map from every output line to its line in
+the original file, so line numbers in findings can be translated back.
+Elided regions are replaced by a one-line marker naming the original lines.
+"""
+
+import io
+import logging
+import re
+import sys
+import tokenize
+from pathlib import PurePath
+from typing import Any, Dict, List, Optional, Tuple
+
+from .response import AIResponse
+from .session import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+# Line comment prefix and block comment delimiters per file extension
+C_STYLE = ("//", ("/*", "*/"))
+LANGUAGES: Dict[str, Tuple[Optional[str], Optional[Tuple[str, str]]]] = {
+    ".py": ("#", None),
+    ".rb": ("#", ("=begin", "=end")),
+    ".sh": ("#", None),
+    ".ps1": ("#", ("<#", "#>")),
+    ".psm1": ("#", ("<#", "#>")),
+    ".sql": ("--", ("/*", "*/")),
+    ".yaml": ("#", None),
+    ".yml": ("#", None),
+    ".toml": ("#", None),
+}
+LANGUAGES.update(dict.fromkeys(
+    (".js", ".jsx", ".ts", ".tsx", ".go", ".rs", ".java", ".cs", ".c", ".h",
+     ".cpp", ".hpp", ".kt", ".swift", ".php", ".scala", ".dart"),
+    C_STYLE
+))
+
+LOCKFILES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock", "Pipfile.lock",
+    "Cargo.lock", "composer.lock", "Gemfile.lock", "go.sum", "uv.lock", "packages.lock.json",
+}
+VENDORED_DIRS = {"vendor", "vendored", "third_party", "thirdparty", "node_modules", "bower_components"}
+GENERATED_SUFFIXES = (".min.js", ".min.css", ".map", ".pb.go", "_pb2.py")
+
+LICENSE_PATTERN = re.compile(
+    r"copyright|licen[cs]e|spdx-license-identifier|permission is hereby granted|all rights reserved",
+    re.IGNORECASE
+)
+DATA_LINE = re.compile(
+    r"""^\s*[\[{(]*\s*(?:(?:"[^"]*"|'[^']*'|-?\d[\w.+-]*|true|false|null|None|True|False|nil)"""
+    r"""\s*[,:]?\s*)+[\]})]*[,;]?\s*$"""
+)
+# "line 12", "lines 3-5", "#L12-L14" or "path/to/file.py:12"; a bare "L2" is
+# left alone since it is as likely to be prose ("L2 cache") as a line number
+LINE_REFERENCE = re.compile(
+    r"(?:\b([Ll]ines?\s+)|(#L)|(?<![\w.\\/-])([\w.\\/-]*\w\.[A-Za-z]\w*:))"
+    r"(\d+)(?:(\s*[-–]\s*L?|\s+to\s+)(\d+))?\b"
+)
+
+
+class MinifiedSource:
+    """Minified text with a map back to original line numbers
+    
+    line_map[i] is the 1-based original line of output line i + 1; marker
+    lines map to the first line they stand for.
+    """
+    
+    __slots__ = ("path", "text", "line_map", "original_tokens", "tokens", "elided")
+    
+    def __init__(self, path: Optional[str], text: str, line_map: List[int],
+                 original_tokens: int, elided: List[Tuple[int, int, str]]):
+        self.path = path
+        self.text = text
+        self.line_map = line_map
+        self.original_tokens = original_tokens
+        self.tokens = estimate_tokens(text)
+        self.elided = elided
+    
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.tokens
+    
+    @property
+    def ratio(self) -> float:
+        """Share of the original tokens removed"""
+        return self.tokens_saved / self.original_tokens if self.original_tokens else 0.0
+    
+    def original_line(self, line: int) -> int:
+        """Translate a 1-based line of the minified text to the original file"""
+        if not self.line_map:
+            return line
+        return self.line_map[min(max(line, 1), len(self.line_map)) - 1]
+    
+    def _is_this_file(self, path: str) -> bool:
+        if self.path is None:
+            return False
+        return PurePath(path.replace("\\", "/")).name == PurePath(self.path.replace("\\", "/")).name
+    
+    def remap(self, text: str) -> str:
+        """Rewrite "line N" / "lines N-M" / "#LN" / "file:N" references from minified to original lines
+        
+        file:N references are only rewritten when they name this file.
+        """
+        def replace(match):
+            line, anchor, path, start, separator, end = match.groups()
+            if path and not self._is_this_file(path[:-1]):
+                return match.group(0)
+            result = f"{line or anchor or path}{self.original_line(int(start))}"
+            if end:
+                result += f"{separator}{self.original_line(int(end))}"
+            return result
+        return LINE_REFERENCE.sub(replace, text)
+    
+    def remap_response(self, response: AIResponse) -> AIResponse:
+        """A copy of a response to this text whose line references point at the original file"""
+        if not response.ok:
+            return response
+        data = response.to_dict()
+        data["text"] = self.remap(response.text)
+        if response.candidates:
+            data["candidates"] = [self.remap(candidate) for candidate in response.candidates]
+        return AIResponse(**data)
+    
+    def summary(self) -> str:
+        name = self.path or "context"
+        return (f"{name}: ~{self.original_tokens} -> ~{self.tokens} tokens "
+                f"({self.ratio:.0%} saved)")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "original_tokens": self.original_tokens,
+            "tokens": self.tokens,
+            "tokens_saved": self.tokens_saved,
+            "elided": [list(region) for region in self.elided],
+        }
+
+
+def skip_reason(path: Optional[str]) -> Optional[str]:
+    """Why a whole file is not worth sending (lockfile, generated or vendored code), or None"""
+    if not path:
+        return None
+    parts = PurePath(path).parts
+    name = parts[-1] if parts else ""
+    if name in LOCKFILES:
+        return "lockfile"
+    if name.endswith(GENERATED_SUFFIXES):
+        return "generated file"
+    if any(part in VENDORED_DIRS for part in parts[:-1]):
+        return "vendored file"
+    return None
+
+
+def _python_comment_lines(lines: List[str]) -> Optional[List[bool]]:
+    """Lines holding only a comment, found with the tokenizer so strings are not misread"""
+    flags = [False] * len(lines)
+    try:
+        for token in tokenize.generate_tokens(io.StringIO("".join(lines)).readline):
+            row, col = token.start
+            if token.type == tokenize.COMMENT and not lines[row - 1][:col].strip():
+                flags[row - 1] = True
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return None
+    return flags
+
+
+def _comment_lines(lines: List[str], line_comment: Optional[str],
+                   block: Optional[Tuple[str, str]]) -> List[bool]:
+    """Lines holding only comments, tracking block comments line by line"""
+    flags = []
+    in_block = False
+    for line in lines:
+        stripped = line.strip()
+        if in_block:
+            in_block = block[1] not in stripped
+            flags.append(in_block or not stripped.split(block[1], 1)[1].strip())
+            continue
+        if block and stripped.startswith(block[0]):
+            rest = stripped[len(block[0]):]
+            in_block = block[1] not in rest
+            flags.append(in_block or not rest.split(block[1], 1)[1].strip())
+            continue
+        flags.append(bool(line_comment and stripped.startswith(line_comment)))
+    return flags
+
+
+def _license_header(lines: List[str], comments: List[bool]) -> Optional[Tuple[int, int]]:
+    """Bounds of a leading comment block that looks like a license header"""
+    start = 1 if lines and lines[0].startswith("#!") else 0
+    end = start
+    while end < len(lines) and (comments[end] or not lines[end].strip()):
+        end += 1
+    if end > start and LICENSE_PATTERN.search("".join(lines[start:end])):
+        return start, end
+    return None
+
+
+def minify_source(text: str, path: Optional[str] = None, max_comment_lines: int = 3,
+                  max_data_lines: int = 20) -> MinifiedSource:
+    """Strip and elide regions of a source file that do not help the model
+    
+    Comment runs longer than max_comment_lines and data-literal runs longer
+    than max_data_lines are elided (data runs keep their first and last
+    lines); blank runs collapse to one blank line and trailing whitespace is
+    dropped. Unknown file types only get the whitespace treatment.
+    """
+    original_tokens = estimate_tokens(text)
+    lines = text.splitlines(keepends=True)
+    suffix = PurePath(path).suffix.lower() if path else ""
+    line_comment, block = LANGUAGES.get(suffix, (None, None))
+    marker_prefix = line_comment or (block[0] if block else "")
+    
+    whole = skip_reason(path)
+    if whole:
+        marker = f"{marker_prefix} [{whole} elided: {len(lines)} lines]".strip()
+        return MinifiedSource(path, marker, [1], original_tokens, [(1, len(lines), whole)])
+    
+    comments = None
+    if suffix == ".py":
+        comments = _python_comment_lines(lines)
+    if comments is None:
+        comments = _comment_lines(lines, line_comment, block)
+    
+    # Regions to drop entirely, as (start, end, reason) with 0-based end-exclusive bounds
+    regions: List[Tuple[int, int, str]] = []
+    header = _license_header(lines, comments) if line_comment or block else None
+    if header:
+        regions.append((*header, "license header"))
+    
+    index = header[1] if header else 0
+    while index < len(lines):
+        end = index
+        if comments[index]:
+            while end < len(lines) and comments[end]:
+                end += 1
+            if end - index > max_comment_lines:
+                regions.append((index, end, "comments"))
+            index = end
+        elif DATA_LINE.match(lines[index]):
+            while end < len(lines) and DATA_LINE.match(lines[end]):
+                end += 1
+            if end - index > max_data_lines:
+                regions.append((index + 2, end - 1, "data"))
+            index = end
+        else:
+            index += 1
+    
+    output: List[str] = []
+    line_map: List[int] = []
+    elided: List[Tuple[int, int, str]] = []
+    starts = {start: (end, reason) for start, end, reason in regions}
+    index = 0
+    while index < len(lines):
+        if index in starts:
+            end, reason = starts[index]
+            output.append(f"{marker_prefix} [lines {index + 1}-{end} elided: {reason}]".strip())
+            line_map.append(index + 1)
+            elided.append((index + 1, end, reason))
+            index = end
+            continue
+        line = lines[index].rstrip()
+        if line or (output and output[-1]):
+            output.append(line)
+            line_map.append(index + 1)
+        index += 1
+    while output and not output[-1]:
+        output.pop()
+        line_map.pop()
+    
+    result = MinifiedSource(path, "\n".join(output), line_map, original_tokens, elided)
+    logger.info("Minified %s", result.summary())
+    return result
+
+
+def minify_file(path: str, **options) -> MinifiedSource:
+    """Read and minify a file"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return minify_source(f.read(), path, **options)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print a minified file; the token savings go to stderr"""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
+        print("usage: python -m ai_powerhouse.minify FILE", file=sys.stderr)
+        return 2
+    result = minify_file(args[0])
+    sys.stdout.write(result.text + "\n")
+    print(result.summary(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Per-stage timing for the hot path, off unless explicitly enabled
+
+Code marks its stages with ``with stage("name"):``. While no profiler is
+enabled, stage() returns one shared no-op context manager, so the
+instrumentation costs a function call and a global lookup. Once enable()
+has been called, every stage records its wall time under the path of
+stages it is nested in. The path is tracked per task with a ContextVar, so
+concurrent provider calls each nest correctly. A cProfile run can be added
+for function-level detail.
+"""
+
+import contextlib
+import contextvars
+import cProfile
+import functools
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+Path = Tuple[str, ...]
+
+_active: Optional["Profiler"] = None
+_path: "contextvars.ContextVar[Path]" = contextvars.ContextVar("profiling_stage", default=())
+_DISABLED = contextlib.nullcontext()
+
+
+class StageStats:
+    """Calls and total seconds for one stage path"""
+    
+    __slots__ = ("order", "calls", "total")
+    
+    def __init__(self, order: int):
+        self.order = order
+        self.calls = 0
+        self.total = 0.0
+
+
+class Profiler:
+    """Collects stage timings, and optionally a cProfile run, until disabled
+    
+    Stages that run concurrently (e.g. one request per provider) overlap,
+    so their totals can add up to more than the wall time.
+    """
+    
+    def __init__(self, cprofile: bool = False, started: Optional[float] = None):
+        self.started = time.perf_counter() if started is None else started
+        self.stopped: Optional[float] = None
+        self.stages: Dict[Path, StageStats] = {}
+        self.cprofile = cProfile.Profile() if cprofile else None
+    
+    def _stats(self, path: Path) -> StageStats:
+        stats = self.stages.get(path)
+        if stats is None:
+            stats = self.stages[path] = StageStats(len(self.stages))
+        return stats
+    
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        path = _path.get() + (name,)
+        # Registered on entry so parents are listed before their children
+        stats = self._stats(path)
+        token = _path.set(path)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.calls += 1
+            stats.total += time.perf_counter() - start
+            _path.reset(token)
+    
+    def add(self, name: str, seconds: float):
+        """Record a top-level stage measured elsewhere (e.g. imports before enable())"""
+        stats = self._stats((name,))
+        stats.calls += 1
+        stats.total += seconds
+    
+    @property
+    def wall(self) -> float:
+        return (self.stopped or time.perf_counter()) - self.started
+    
+    def report(self) -> List[Dict[str, Any]]:
+        """One row per stage path, depth-first, with total and self (exclusive) seconds"""
+        def sort_key(path: Path) -> Tuple[int, ...]:
+            return tuple(self.stages[path[:depth]].order for depth in range(1, len(path) + 1))
+        
+        children: Dict[Path, float] = {}
+        for path, stats in self.stages.items():
+            if len(path) > 1:
+                children[path[:-1]] = children.get(path[:-1], 0.0) + stats.total
+        
+        return [
+            {
+                "stage": path[-1],
+                "path": list(path),
+                "depth": len(path) - 1,
+                "calls": self.stages[path].calls,
+                "total": self.stages[path].total,
+                "self": max(0.0, self.stages[path].total - children.get(path, 0.0)),
+            }
+            for path in sorted(self.stages, key=sort_key)
+        ]
+    
+    def collapsed(self) -> str:
+        """Stage paths in collapsed-stack format ("a;b;c <microseconds>") for flame graphs"""
+        return "".join(
+            f"{';'.join(row['path'])} {round(row['self'] * 1e6)}\n"
+            for row in self.report() if row["self"] > 0
+        )
+    
+    def dump(self, path: str):
+        """Write the cProfile stats (.prof/.pstats) or the collapsed stage stacks (any other name)"""
+        if path.endswith((".prof", ".pstats")):
+            if self.cprofile is None:
+                raise RuntimeError("cProfile was not enabled for this profiler")
+            self.cprofile.dump_stats(path)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+
+
+def stage(name: str, label: Optional[str] = None):
+    """Time a block as a named stage; a free no-op while profiling is disabled"""
+    if _active is None:
+        return _DISABLED
+    return _active.stage(f"{name}:{label}" if label else name)
+
+
+def profiled(name: str) -> Callable:
+    """Decorator timing every call of a (synchronous) function as a stage"""
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable(cprofile: bool = False, started: Optional[float] = None) -> Profiler:
+    """Start collecting stage timings (and a cProfile run if asked); returns the profiler
+    
+    started (a time.perf_counter() value) backdates the wall clock, e.g. to
+    include imports that ran before profiling could be switched on.
+    """
+    global _active
+    disable()
+    _active = Profiler(cprofile, started)
+    if _active.cprofile is not None:
+        _active.cprofile.enable()
+    return _active
+
+
+def disable() -> Optional[Profiler]:
+    """Stop profiling and return the profiler that was active, if any"""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.stopped = time.perf_counter()
+        if profiler.cprofile is not None:
+            profiler.cprofile.disable()
+    return profiler
+
+
+def active() -> Optional[Profiler]:
+    return _active
@@ -0,0 +1,198 @@
+"""
+Approximate-match response cache for prompts that are near duplicates
+
+The exact lookup ignores case and whitespace only. Other near duplicates,
+including prompts that differ only in timestamps, dates and UUIDs (masked
+before hashing), are found with MinHash signatures (one-permutation hashing, so
+a signature costs one hash per shingle) in a banded LSH index: a lookup
+only inspects the few entries sharing a band bucket, so its cost does not
+grow with the number of cached prompts.
+"""
+
+import array
+import collections
+import hashlib
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from .response import AIResponse
+from .similarity import MinHasher, OnePermutationHasher, shingles
+
+
+# Options that affect how a request is sent, not what it answers
+CONTROL_OPTIONS = ("deadline", "priority", "tenant")
+
+VOLATILE_PATTERNS = [
+    re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?\b"),
+    re.compile(r"\b\d{4}-\d{2}-\d{2}\b"),
+    re.compile(r"\b\d{1,2}:\d{2}(?::\d{2})?(?:\s?[ap]m)?\b", re.IGNORECASE),
+    re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE),
+]
+
+
+def fold_prompt(prompt: str) -> str:
+    """Lower-case and collapse whitespace"""
+    return " ".join(prompt.lower().split())
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lower-case, collapse whitespace and mask timestamps, dates and UUIDs"""
+    text = prompt
+    for pattern in VOLATILE_PATTERNS:
+        text = pattern.sub("<v>", text)
+    return fold_prompt(text)
+
+
+class CacheEntry:
+    """A cached response and the signature of the prompt that produced it"""
+    
+    __slots__ = ("key", "scope", "signature", "response", "hits")
+    
+    def __init__(self, key: str, scope: str, signature: array.array, response: AIResponse):
+        self.key = key
+        self.scope = scope
+        self.signature = signature
+        self.response = response
+        self.hits = 0
+
+
+class PromptCache:
+    """LRU response cache with exact-normalized and MinHash LSH lookup tiers
+    
+    Signatures have bands * rows slots; two prompts become candidates when
+    all rows of any band agree, which makes prompts above roughly
+    (1 / bands) ** (1 / rows) Jaccard similarity likely to collide (about 0.5
+    with the defaults). Candidates are then checked against the caller's
+    threshold. Each bucket keeps at most bucket_size entries, newest first,
+    so hot buckets cannot make lookups slow.
+    """
+    
+    def __init__(self, max_entries: int = 100_000, bands: int = 16, rows: int = 4,
+                 bucket_size: int = 8, k: int = 3):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = rows
+        self.bucket_size = bucket_size
+        self.hasher = OnePermutationHasher(num_perm=bands * rows, k=k)
+        self.entries: "collections.OrderedDict[str, CacheEntry]" = collections.OrderedDict()
+        self.buckets: Dict[int, List[str]] = {}
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def scope(provider: str, options: Dict[str, Any]) -> str:
+        """Cache partition for a provider and the generation options that change its answer"""
+        options = {key: value for key, value in options.items() if key not in CONTROL_OPTIONS}
+        return json.dumps([provider, options], sort_keys=True, default=str)
+    
+    def _key(self, prompt: str, scope: str) -> str:
+        """Exact-tier key: volatile values are kept, so a changed date is a different prompt"""
+        folded = fold_prompt(prompt)
+        return hashlib.blake2b(f"{scope}\x00{folded}".encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _signature(self, normalized: str) -> array.array:
+        return array.array("I", self.hasher.signature_from_shingles(shingles(normalized, self.hasher.k)))
+    
+    def _bands(self, scope: str, signature: array.array) -> List[int]:
+        """One bucket key per band; a plain int keeps millions of buckets compact"""
+        rows = self.rows
+        return [
+            hash((scope, band, tuple(signature[band * rows:(band + 1) * rows])))
+            for band in range(self.bands)
+        ]
+    
+    def get(self, prompt: str, scope: str = "", threshold: float = 0.9) -> Optional[AIResponse]:
+        """A cached response for this prompt or one at least threshold similar, else None
+        
+        threshold=1.0 only returns a response to the same prompt, up to case
+        and whitespace; below that, prompts differing only in timestamps,
+        dates or UUIDs count as identical.
+        """
+        entry = self.entries.get(self._key(prompt, scope))
+        if entry is not None:
+            self.exact_hits += 1
+        elif threshold < 1.0:
+            signature = self._signature(normalize_prompt(prompt))
+            best, best_score = None, threshold
+            seen = set()
+            for band_key in self._bands(scope, signature):
+                for key in self.buckets.get(band_key, ()):
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    candidate = self.entries[key]
+                    if candidate.scope != scope:
+                        # Bucket keys of different scopes can collide
+                        continue
+                    score = MinHasher.similarity(signature, candidate.signature)
+                    if score >= best_score:
+                        best, best_score = candidate, score
+            entry = best
+            if entry is not None:
+                self.similar_hits += 1
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        entry.hits += 1
+        self.entries.move_to_end(entry.key)
+        return entry.response
+    
+    def put(self, prompt: str, response: AIResponse, scope: str = ""):
+        """Cache a response; the least recently used entries are evicted beyond max_entries"""
+        key = self._key(prompt, scope)
+        if key in self.entries:
+            self.entries[key].response = response
+            self.entries.move_to_end(key)
+            return
+        
+        entry = CacheEntry(key, scope, self._signature(normalize_prompt(prompt)), response)
+        self.entries[key] = entry
+        for band_key in self._bands(scope, entry.signature):
+            bucket = self.buckets.setdefault(band_key, [])
+            bucket.insert(0, key)
+            if len(bucket) > self.bucket_size:
+                # The oldest entry stays reachable through its other bands
+                bucket.pop()
+        while len(self.entries) > self.max_entries:
+            self._evict(next(iter(self.entries)))
+    
+    def _evict(self, key: str):
+        entry = self.entries.pop(key)
+        for band_key in self._bands(entry.scope, entry.signature):
+            bucket = self.buckets.get(band_key)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self.buckets[band_key]
+    
+    def clear(self):
+        self.entries.clear()
+        self.buckets.clear()
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "buckets": len(self.buckets),
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.similar_hits) / lookups if lookups else 0.0,
+        }
+
+
+def cached_copy(response: AIResponse) -> AIResponse:
+    """A copy of a cached response, timed as an instant answer"""
+    copy = AIResponse(**response.to_dict())
+    copy.started_at = time.time()
+    copy.latency = 0.0
+    return copy
@@ -2,8 +2,10 @@
 Base provider interface for AI services
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
+from ..response import AIResponse
 
 
 class BaseProvider(ABC):
@@ -15,10 +17,42 @@ class BaseProvider(ABC):
         self.config = kwargs
     
     @abstractmethod
-    async def generate_response(self, prompt: str, **kwargs) -> str:
-        """Generate a response from the AI provider"""
+    async def generate_response(self, prompt: str, **kwargs) -> AIResponse:
+        """Generate a response from the AI provider
+        
+        Implementations return an AIResponse; API failures are reported through
+        its error fields rather than raised. Recognised options include
+        max_tokens, temperature, system (a system prompt), model (a
+        per-call override of the configured model), n (number of
+        candidates to sample, returned in AIResponse.candidates),
+        history (earlier turns as {"role": "user"|"assistant", "content"}
+        messages, sent before the prompt) and deadline (a
+        ai_powerhouse.deadline.Deadline whose remaining time is used as the
+        request timeout). Calls must stay cancellable: a cancelled task
+        should abort its HTTP request rather than wait for it in a thread.
+        """
         pass
     
+    async def generate_stream(self, prompt: str, on_text: Callable[[str], None], **kwargs) -> AIResponse:
+        """Generate a response, passing its text to on_text as it arrives
+        
+        Takes the same options as generate_response and returns the complete
+        response. Providers with a streaming API override this; the default
+        delivers the whole text in one piece once it is ready.
+        """
+        response = await self.generate_response(prompt, **kwargs)
+        if response.ok and response.text:
+            on_text(response.text)
+        return response
+    
+    async def _generate_concurrently(self, prompt: str, n: int, **kwargs) -> AIResponse:
+        """Sample n candidates with concurrent calls on the shared client
+        
+        Fallback for APIs without native multi-choice generation.
+        """
+        responses = await asyncio.gather(*(self.generate_response(prompt, **kwargs) for _ in range(n)))
+        return AIResponse.combine(responses)
+    
     @abstractmethod
     def validate_connection(self) -> bool:
         """Validate the connection to the AI provider"""
@@ -2,47 +2,199 @@
 Google Gemini AI Provider
 """
 
-import asyncio
-from typing import Optional
+import time
+from typing import Any, Callable, Dict, Optional
 from .base import BaseProvider
+from ..deadline import request_timeout
+from ..profiling import stage
+from ..response import AIResponse
 
 try:
     import google.generativeai as genai
+    from google.ai import generativelanguage as glm
 except ImportError:
     genai = None
+    glm = None
+
+
+# GenerativeModel attributes holding its sync and async service clients.
+# They are private, so own_clients() checks they exist before they are set.
+MODEL_CLIENT_ATTRIBUTES = ("_client", "_async_client")
+
+
+def own_clients(model_client) -> bool:
+    """Whether this google-generativeai version lets a GenerativeModel use a given service client"""
+    return all(hasattr(model_client, name) for name in MODEL_CLIENT_ATTRIBUTES)
 
 
 class GeminiProvider(BaseProvider):
     """Google Gemini AI provider"""
     
+    # Key given to genai.configure() when the SDK's shared client is used
+    shared_key: Optional[str] = None
+    
     def __init__(self, api_key: str, model: str = "gemini-pro", **kwargs):
         super().__init__(api_key, model, **kwargs)
         self.client = None
+        self._service = None
+        self._async_service = None
         if genai:
-            genai.configure(api_key=api_key)
             self.client = genai.GenerativeModel(model)
+            if own_clients(self.client):
+                # genai.configure() is process-wide; give this instance its own
+                # client so several keys can be used side by side
+                self._service = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+                self.client._client = self._service
+            else:
+                # The SDK no longer has the hook: use its shared client, which
+                # can only hold one key for the whole process
+                if GeminiProvider.shared_key not in (None, api_key):
+                    raise RuntimeError(
+                        "This google-generativeai version cannot give each Gemini instance its own "
+                        "client, so only one Gemini key can be used (check GOOGLE_API_KEYS)"
+                    )
+                GeminiProvider.shared_key = api_key
+                genai.configure(api_key=api_key)
+        self._clients = {model: self.client} if self.client else {}
+    
+    def _model_client(self, model: str):
+        """A GenerativeModel for the given model on this instance's service client"""
+        client = genai.GenerativeModel(model)
+        if self._service is not None:
+            client._client = self._service
+            client._async_client = self._async_service
+        return client
+    
+    def _async_model_client(self, model: str):
+        """The model's client with an async transport, created inside the running event loop
+        
+        Requests use the async (grpc.aio) transport so a cancelled call
+        cancels its RPC instead of tying up a thread.
+        """
+        if self._service is not None and self._async_service is None:
+            self._async_service = glm.GenerativeServiceAsyncClient(client_options={"api_key": self.api_key})
+            for client in self._clients.values():
+                client._async_client = self._async_service
+        if model not in self._clients:
+            self._clients[model] = self._model_client(model)
+        return self._clients[model]
     
     @property
     def provider_name(self) -> str:
         return "Gemini"
     
-    async def generate_response(self, prompt: str, **kwargs) -> str:
+    async def generate_response(self, prompt: str, **kwargs) -> AIResponse:
         """Generate response using Gemini"""
         if not self.client:
             raise RuntimeError("Google GenerativeAI client not available. Install with: pip install google-generativeai")
         
+        model = kwargs.get('model') or self.model
+        client = self._async_model_client(model)
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            with stage("request"):
+                response = await client.generate_content_async(
+                    **self._request(prompt, kwargs, candidate_count=kwargs.get('n', 1))
+                )
+            usage = getattr(response, "usage_metadata", None)
+            finish_reason = None
+            if response.candidates:
+                finish_reason = getattr(response.candidates[0].finish_reason, "name", None)
+            # response.text only works for single-candidate responses
+            candidates = [
+                "".join(part.text for part in candidate.content.parts)
+                for candidate in response.candidates
+            ]
+            return AIResponse(
+                text=candidates[0] if candidates else response.text,
+                candidates=candidates,
+                provider=self.provider_name,
+                model=model,
+                input_tokens=usage.prompt_token_count if usage else None,
+                output_tokens=usage.candidates_token_count if usage else None,
+                finish_reason=finish_reason,
+                started_at=started_at,
+                latency=time.perf_counter() - start
+            )
+        except Exception as e:
+            return AIResponse.failure(
+                e,
+                provider=self.provider_name,
+                model=model,
+                started_at=started_at,
+                latency=time.perf_counter() - start
+            )
+    
+    async def generate_stream(self, prompt: str, on_text: Callable[[str], None], **kwargs) -> AIResponse:
+        """Stream a Gemini response, passing text to on_text as it arrives"""
+        if not self.client:
+            raise RuntimeError("Google GenerativeAI client not available. Install with: pip install google-generativeai")
+        
+        model = kwargs.get('model') or self.model
+        client = self._async_model_client(model)
+        started_at = time.time()
+        start = time.perf_counter()
         try:
-            response = await asyncio.to_thread(
-                self.client.generate_content,
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=kwargs.get('max_tokens', 4000),
-                    temperature=kwargs.get('temperature', 0.7)
-                ) if genai else None
+            parts = []
+            usage = None
+            finish_reason = None
+            with stage("request"):
+                response = await client.generate_content_async(stream=True, **self._request(prompt, kwargs))
+                async for chunk in response:
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                    if not chunk.candidates:
+                        continue
+                    text = "".join(part.text for part in chunk.candidates[0].content.parts)
+                    if text:
+                        parts.append(text)
+                        on_text(text)
+                    finish_reason = getattr(chunk.candidates[0].finish_reason, "name", None) or finish_reason
+            return AIResponse(
+                text="".join(parts),
+                provider=self.provider_name,
+                model=model,
+                input_tokens=usage.prompt_token_count if usage else None,
+                output_tokens=usage.candidates_token_count if usage else None,
+                finish_reason=finish_reason,
+                started_at=started_at,
+                latency=time.perf_counter() - start
             )
-            return response.text
         except Exception as e:
-            return f"Error from Gemini: {str(e)}"
+            return AIResponse.failure(
+                e,
+                provider=self.provider_name,
+                model=model,
+                started_at=started_at,
+                latency=time.perf_counter() - start
+            )
+    
+    def _request(self, prompt: str, kwargs: Dict[str, Any], candidate_count: int = 1) -> Dict[str, Any]:
+        """generate_content_async arguments shared by plain and streamed requests"""
+        # Gemini calls the assistant role "model"
+        contents = [
+            {"role": "model" if message["role"] == "assistant" else "user",
+             "parts": [message["content"]]}
+            for message in kwargs.get('history', ())
+        ]
+        contents.append({"role": "user", "parts": [prompt]})
+        if kwargs.get('system'):
+            # The shared GenerativeModel has no per-call system instruction;
+            # lead with it so the start of the request stays the same
+            first = contents[0]["parts"][0]
+            contents[0]["parts"] = [f"{kwargs['system']}\n\n{first}"]
+        request = {
+            "contents": contents,
+            "generation_config": genai.types.GenerationConfig(
+                max_output_tokens=kwargs.get('max_tokens', 4000),
+                temperature=kwargs.get('temperature', 0.7),
+                candidate_count=candidate_count
+            ) if genai else None,
+        }
+        timeout = request_timeout(kwargs)
+        if timeout is not None:
+            request['request_options'] = {"timeout": timeout}
+        return request
     
     def validate_connection(self) -> bool:
         """Validate Gemini API connection"""
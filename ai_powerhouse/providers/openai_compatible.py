@@ -0,0 +1,39 @@
+"""
+OpenAI-compatible provider for local and self-hosted inference servers
+"""
+
+from typing import Any, Dict, Optional
+from .openai_provider import OpenAIProvider
+
+
+class OpenAICompatibleProvider(OpenAIProvider):
+    """Any server speaking the OpenAI chat completions API (vLLM, llama.cpp, Ollama, ...)"""
+    
+    # Not every server accepts stream_options
+    stream_usage = False
+    
+    def __init__(self, name: str, base_url: str, model: str, api_key: Optional[str] = None,
+                 headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None, **kwargs):
+        # Local servers usually ignore the key, but the client requires one
+        super().__init__(api_key or "not-needed", model, base_url=base_url, headers=headers,
+                         timeout=timeout, **kwargs)
+        self.name = name
+    
+    @property
+    def provider_name(self) -> str:
+        return self.name
+    
+    def validate_connection(self) -> bool:
+        """Check that the server is reachable and serves the configured model"""
+        if not self.client:
+            return False
+        
+        try:
+            return any(model.id == self.model for model in self.client.models.list())
+        except Exception:
+            return False
+    
+    def get_provider_info(self) -> Dict[str, Any]:
+        info = super().get_provider_info()
+        info["base_url"] = self.base_url
+        return info
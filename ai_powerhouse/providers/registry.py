@@ -0,0 +1,210 @@
+"""
+Provider registry with entry-point discovery
+
+Providers are described by lightweight ProviderSpec objects. A spec names the
+provider class as a "module:Class" string, so listing providers and checking
+their configuration never imports an SDK; the class is imported, and the
+provider instantiated, only when it is first selected.
+
+Third-party packages register providers by exposing a ProviderSpec under the
+``ai_powerhouse.providers`` entry-point group::
+
+    [project.entry-points."ai_powerhouse.providers"]
+    mistral = "my_package.specs:MISTRAL"
+"""
+
+import functools
+import importlib
+import os
+import warnings
+from importlib import metadata
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, MutableMapping, Optional, Type
+
+from ..profiling import stage
+
+if TYPE_CHECKING:
+    from ..config import Config
+    from .base import BaseProvider
+
+
+ENTRY_POINT_GROUP = "ai_powerhouse.providers"
+
+
+class ProviderSpec:
+    """Metadata describing how to configure and create a provider"""
+    
+    __slots__ = (
+        "name",
+        "target",
+        "display_name",
+        "api_key_field",
+        "api_keys_field",
+        "model_field",
+        "fast_model_field",
+        "api_key_env",
+        "model_env",
+        "default_model",
+        "description",
+    )
+    
+    def __init__(self, name: str, target: str, display_name: Optional[str] = None,
+                 api_key_field: Optional[str] = None, api_keys_field: Optional[str] = None,
+                 model_field: Optional[str] = None, fast_model_field: Optional[str] = None,
+                 api_key_env: Optional[str] = None, model_env: Optional[str] = None,
+                 default_model: Optional[str] = None, description: str = ""):
+        self.name = name
+        self.target = target
+        self.display_name = display_name or name.title()
+        self.api_key_field = api_key_field
+        self.api_keys_field = api_keys_field
+        self.model_field = model_field
+        self.fast_model_field = fast_model_field
+        self.api_key_env = api_key_env
+        self.model_env = model_env
+        self.default_model = default_model
+        self.description = description
+    
+    def api_key(self, config: "Config") -> Optional[str]:
+        """Key from the Config field for built-in providers, else from the environment"""
+        if self.api_key_field:
+            return getattr(config, self.api_key_field, None)
+        return os.getenv(self.api_key_env) if self.api_key_env else None
+    
+    def api_keys(self, config: "Config") -> List[str]:
+        """Every distinct key configured for this provider, primary key first"""
+        keys = [self.api_key(config)]
+        if self.api_keys_field:
+            keys.extend(getattr(config, self.api_keys_field, None) or [])
+        return list(dict.fromkeys(key for key in keys if key))
+    
+    def model(self, config: "Config") -> Optional[str]:
+        if self.model_field:
+            return getattr(config, self.model_field, None) or self.default_model
+        return (os.getenv(self.model_env) if self.model_env else None) or self.default_model
+    
+    def fast_model(self, config: "Config") -> Optional[str]:
+        """Cheaper model to try first in cascade mode, if the provider has one"""
+        return getattr(config, self.fast_model_field, None) if self.fast_model_field else None
+    
+    def is_configured(self, config: "Config") -> bool:
+        return bool(self.api_keys(config))
+    
+    def load(self) -> Type["BaseProvider"]:
+        """Import the provider class (and with it, its SDK)"""
+        module_name, _, attr = self.target.partition(":")
+        return getattr(importlib.import_module(module_name), attr)
+    
+    def create(self, config: "Config") -> "BaseProvider":
+        """Instantiate the provider, as a key pool when several keys are configured"""
+        model = self.model(config)
+        kwargs = {"model": model} if model else {}
+        provider_class = self.load()
+        keys = self.api_keys(config)
+        if len(keys) == 1:
+            return provider_class(api_key=keys[0], **kwargs)
+        
+        from ..keypool import PooledProvider
+        return PooledProvider(
+            [provider_class(api_key=key, **kwargs) for key in keys],
+            rpm_per_key=config.rpm_per_key.get(self.name)
+        )
+    
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+CLAUDE = ProviderSpec(
+    "claude", "ai_powerhouse.providers.claude:ClaudeProvider", "Claude",
+    api_key_field="anthropic_api_key", api_keys_field="anthropic_api_keys", model_field="claude_model",
+    fast_model_field="claude_fast_model",
+    description="Anthropic Claude models"
+)
+
+GEMINI = ProviderSpec(
+    "gemini", "ai_powerhouse.providers.gemini:GeminiProvider", "Gemini",
+    api_key_field="google_api_key", api_keys_field="google_api_keys", model_field="gemini_model",
+    fast_model_field="gemini_fast_model",
+    description="Google Gemini models"
+)
+
+OPENAI = ProviderSpec(
+    "openai", "ai_powerhouse.providers.openai_provider:OpenAIProvider", "OpenAI",
+    api_key_field="openai_api_key", api_keys_field="openai_api_keys", model_field="openai_model",
+    fast_model_field="openai_fast_model",
+    description="OpenAI GPT models"
+)
+
+# Also registered as entry points; listed here so a source checkout works
+BUILTIN_SPECS = [CLAUDE, GEMINI, OPENAI]
+
+
+def _entry_points() -> List[Any]:
+    eps = metadata.entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=ENTRY_POINT_GROUP))
+    return list(eps.get(ENTRY_POINT_GROUP, []))
+
+
+@functools.lru_cache(maxsize=None)
+def provider_specs() -> Dict[str, ProviderSpec]:
+    """All known provider specs: built-ins first, then installed entry points"""
+    specs = {spec.name: spec for spec in BUILTIN_SPECS}
+    for entry_point in _entry_points():
+        try:
+            spec = entry_point.load()
+        except Exception as e:
+            warnings.warn(f"Could not load provider entry point '{entry_point.name}': {e}")
+            continue
+        if not isinstance(spec, ProviderSpec):
+            warnings.warn(f"Provider entry point '{entry_point.name}' is not a ProviderSpec")
+            continue
+        specs.setdefault(spec.name, spec)
+    return specs
+
+
+class ProviderMap(MutableMapping):
+    """Provider name -> instance mapping that creates providers on first access
+    
+    Membership tests and iteration only look at the registered names, so
+    configured but unused providers never import their SDKs.
+    """
+    
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], "BaseProvider"]] = {}
+        self._instances: Dict[str, "BaseProvider"] = {}
+    
+    def register(self, name: str, factory: Callable[[], "BaseProvider"]):
+        self._factories[name] = factory
+        self._instances.pop(name, None)
+    
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+    
+    def __getitem__(self, name: str) -> "BaseProvider":
+        if name not in self._instances:
+            if name not in self._factories:
+                raise KeyError(name)
+            # Includes the first import of the provider's SDK
+            with stage("client.create", name):
+                self._instances[name] = self._factories[name]()
+        return self._instances[name]
+    
+    def __setitem__(self, name: str, provider: "BaseProvider"):
+        self._factories[name] = lambda: provider
+        self._instances[name] = provider
+    
+    def __delitem__(self, name: str):
+        del self._factories[name]
+        self._instances.pop(name, None)
+    
+    def __contains__(self, name: object) -> bool:
+        return name in self._factories
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+    
+    def __len__(self) -> int:
+        return len(self._factories)
+    
+    def __repr__(self) -> str:
+        return f"ProviderMap({list(self._factories)})"
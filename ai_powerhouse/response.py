@@ -0,0 +1,165 @@
+"""
+Structured response records returned by AI providers
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class AIResponse:
+    """Compact result of a single provider call
+    
+    Carries the generated text together with usage, finish reason, model and
+    timing metadata. Failures are represented by ``error``/``error_type``
+    instead of being encoded in the text.
+    
+    For compatibility with the old string API, an AIResponse behaves like its
+    text: ``str()``, ``len()``, slicing, ``in``, ``+`` and equality with plain
+    strings all work, and a failed response renders as ``"Error: <message>"``.
+    """
+    
+    __slots__ = (
+        "text",
+        "provider",
+        "model",
+        "input_tokens",
+        "output_tokens",
+        "finish_reason",
+        "started_at",
+        "latency",
+        "error",
+        "error_type",
+        "candidates",
+    )
+    
+    def __init__(
+        self,
+        text: str = "",
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+        finish_reason: Optional[str] = None,
+        started_at: Optional[float] = None,
+        latency: Optional[float] = None,
+        error: Optional[str] = None,
+        error_type: Optional[str] = None,
+        candidates: Optional[List[str]] = None,
+    ):
+        self.text = text
+        self.provider = provider
+        self.model = model
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.finish_reason = finish_reason
+        self.started_at = started_at
+        self.latency = latency
+        self.error = error
+        self.error_type = error_type
+        # Every sampled answer when n > 1 was requested; text is the first
+        self.candidates = candidates if candidates is not None else ([text] if text else [])
+    
+    @classmethod
+    def failure(
+        cls,
+        error: Any,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        error_type: Optional[str] = None,
+        **kwargs
+    ) -> "AIResponse":
+        """Build a failed response from an exception or message"""
+        if error_type is None:
+            error_type = type(error).__name__ if isinstance(error, BaseException) else "Error"
+        return cls(
+            provider=provider,
+            model=model,
+            error=str(error),
+            error_type=error_type,
+            **kwargs
+        )
+    
+    @classmethod
+    def combine(cls, responses: Sequence["AIResponse"]) -> "AIResponse":
+        """Merge separately sampled responses into one multi-candidate response"""
+        answers = [r for r in responses if r.ok]
+        if not answers:
+            return responses[0]
+        first = answers[0]
+        
+        def usage(name: str) -> Optional[int]:
+            counts = [getattr(r, name) for r in answers]
+            return None if None in counts else sum(counts)
+        
+        return cls(
+            text=first.text,
+            provider=first.provider,
+            model=first.model,
+            input_tokens=usage("input_tokens"),
+            output_tokens=usage("output_tokens"),
+            finish_reason=first.finish_reason,
+            started_at=min((r.started_at for r in answers if r.started_at is not None), default=None),
+            latency=max((r.latency for r in answers if r.latency is not None), default=None),
+            candidates=[text for r in answers for text in r.candidates]
+        )
+    
+    @property
+    def ok(self) -> bool:
+        """Whether the call produced an answer"""
+        return self.error is None
+    
+    @property
+    def total_tokens(self) -> Optional[int]:
+        """Input plus output tokens, when the provider reported usage"""
+        if self.input_tokens is None and self.output_tokens is None:
+            return None
+        return (self.input_tokens or 0) + (self.output_tokens or 0)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a plain dictionary"""
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    # String compatibility shim
+    
+    def __str__(self) -> str:
+        if self.ok:
+            return self.text
+        return f"Error: {self.error}"
+    
+    def __repr__(self) -> str:
+        if self.ok:
+            return f"AIResponse(provider={self.provider!r}, model={self.model!r}, text={self.text[:40]!r})"
+        return f"AIResponse(provider={self.provider!r}, error_type={self.error_type!r}, error={self.error!r})"
+    
+    def __rich__(self) -> str:
+        return str(self)
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, AIResponse):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, str):
+            return str(self) == other
+        return NotImplemented
+    
+    def __hash__(self) -> int:
+        return hash(str(self))
+    
+    def __len__(self) -> int:
+        return len(str(self))
+    
+    def __getitem__(self, key: Any) -> str:
+        return str(self)[key]
+    
+    def __contains__(self, item: str) -> bool:
+        return item in str(self)
+    
+    def __add__(self, other: str) -> str:
+        return str(self) + other
+    
+    def __radd__(self, other: str) -> str:
+        return other + str(self)
+    
+    def __getattr__(self, name: str) -> Any:
+        # Delegate str methods (startswith, split, ...) to the rendered text
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(str(self), name)
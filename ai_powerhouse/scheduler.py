@@ -0,0 +1,243 @@
+"""
+Priority-aware request scheduling with per-tenant fair sharing
+
+A Scheduler sits in front of one provider and caps the requests in flight.
+A request that cannot start at once waits in the queue of its priority
+class: interactive, normal or batch. Classes are served in strict priority
+order, and a few slots are reserved for interactive requests, so a large
+batch can fill the provider without adding latency for interactive users.
+Batch work takes whatever capacity is left.
+
+Within a class, tenants share capacity by weighted fair queuing (start-time
+fair queuing). Each request gets a virtual start tag, and the smallest tag is
+served first. A tenant with weight 2 gets twice the share of a tenant with
+weight 1 while both are waiting. An idle tenant builds up no credit. Queue
+depth is bounded per class and optionally per tenant. A request over the
+limit is rejected with SchedulerFull, so callers can back off instead of
+piling up.
+
+The class and tenant come from the priority and tenant options of a call.
+Otherwise they come from an enclosing request_class() block, which also
+covers calls made by agents, pipelines and analyzers.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import math
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+INTERACTIVE, NORMAL, BATCH = "interactive", "normal", "batch"
+PRIORITIES = (INTERACTIVE, NORMAL, BATCH)
+DEFAULT_TENANT = "default"
+
+_request_class: "contextvars.ContextVar[Tuple[Optional[str], Optional[str]]]" = contextvars.ContextVar(
+    "request_class", default=(None, None)
+)
+
+
+class SchedulerFull(RuntimeError):
+    """A request was refused because its queue is at its depth limit"""
+
+
+@contextlib.contextmanager
+def request_class(priority: Optional[str] = None, tenant: Optional[str] = None) -> Iterator[None]:
+    """Schedule provider calls made inside the block (and tasks it starts) with this priority and tenant"""
+    if priority is not None and priority not in PRIORITIES:
+        raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+    outer_priority, outer_tenant = _request_class.get()
+    token = _request_class.set((priority or outer_priority, tenant or outer_tenant))
+    try:
+        yield
+    finally:
+        _request_class.reset(token)
+
+
+def current_request_class() -> Tuple[Optional[str], Optional[str]]:
+    """The (priority, tenant) set by the innermost request_class() block"""
+    return _request_class.get()
+
+
+class Ticket:
+    """An admitted request; hand it back to Scheduler.release when done"""
+    
+    __slots__ = ("priority", "tenant", "slots", "start", "seq", "future", "enqueued_at", "waited")
+    
+    def __init__(self, priority: str, tenant: str, slots: int, start: float, seq: int, future: "asyncio.Future"):
+        self.priority = priority
+        self.tenant = tenant
+        self.slots = slots
+        self.start = start
+        self.seq = seq
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.waited = 0.0
+    
+    def __lt__(self, other: "Ticket") -> bool:
+        return (self.start, self.seq) < (other.start, other.seq)
+
+
+class ClassStats:
+    """Counters for one priority class"""
+    
+    __slots__ = ("queued", "in_flight", "completed", "rejected", "wait_total", "wait_max")
+    
+    def __init__(self):
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        started = self.completed + self.in_flight
+        return {
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait": self.wait_total / started if started else 0.0,
+            "max_wait": self.wait_max,
+        }
+
+
+class Scheduler:
+    """Admit at most max_concurrency requests at a time, by priority class and fair share
+    
+    reserved slots are only used by interactive requests. max_queue bounds the
+    waiting requests of each class, and max_queue_per_tenant (if set) bounds
+    those of one tenant within a class. weights maps tenant names to their
+    relative share. Unlisted tenants have weight 1.
+    
+    A request's cost (for example the n candidates of a call that a provider
+    samples with n separate requests) counts against both its tenant's share
+    and the concurrency limit: it holds that many slots, capped at its class
+    limit so that it can always start.
+    """
+    
+    def __init__(self, max_concurrency: int, reserved: int = 1, max_queue: int = 256,
+                 max_queue_per_tenant: Optional[int] = None, weights: Optional[Dict[str, float]] = None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if not 0 <= reserved < max_concurrency:
+            raise ValueError("reserved must be at least 0 and below max_concurrency")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        if any(weight <= 0 for weight in (weights or {}).values()):
+            raise ValueError("tenant weights must be positive")
+        self.max_concurrency = max_concurrency
+        self.reserved = reserved
+        self.max_queue = max_queue
+        self.max_queue_per_tenant = max_queue_per_tenant
+        self.weights = dict(weights or {})
+        self.in_flight = 0
+        self.stats = {priority: ClassStats() for priority in PRIORITIES}
+        self._queues: Dict[str, List[Ticket]] = {priority: [] for priority in PRIORITIES}
+        # Virtual time per class, and the finish tag of each tenant's last request
+        self._virtual = {priority: 0.0 for priority in PRIORITIES}
+        self._finish: Dict[Tuple[str, str], float] = {}
+        self._tenant_queued: Dict[Tuple[str, str], int] = {}
+        self._seq = itertools.count()
+    
+    def _limit(self, priority: str) -> int:
+        return self.max_concurrency if priority == INTERACTIVE else self.max_concurrency - self.reserved
+    
+    def _enqueue(self, priority: str, tenant: str, cost: float) -> Ticket:
+        stats = self.stats[priority]
+        key = (priority, tenant)
+        queued = self._tenant_queued.get(key, 0)
+        if stats.queued >= self.max_queue or (
+                self.max_queue_per_tenant is not None and queued >= self.max_queue_per_tenant):
+            stats.rejected += 1
+            raise SchedulerFull(f"The {priority} queue is full ({stats.queued} waiting)")
+        
+        start = max(self._virtual[priority], self._finish.get(key, 0.0))
+        self._finish[key] = start + cost / self.weights.get(tenant, 1.0)
+        slots = min(max(1, math.ceil(cost)), self._limit(priority))
+        ticket = Ticket(priority, tenant, slots, start, next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queues[priority], ticket)
+        stats.queued += 1
+        self._tenant_queued[key] = queued + 1
+        return ticket
+    
+    def _dequeued(self, ticket: Ticket):
+        key = (ticket.priority, ticket.tenant)
+        self.stats[ticket.priority].queued -= 1
+        self._tenant_queued[key] -= 1
+        if not self._tenant_queued[key]:
+            del self._tenant_queued[key]
+            # An idle tenant restarts from the virtual clock, so its old tag is not needed
+            if self._finish.get(key, 0.0) <= self._virtual[ticket.priority]:
+                self._finish.pop(key, None)
+    
+    def _dispatch(self):
+        """Start queued requests, highest priority first, while slots are free"""
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue:
+                if queue[0].future.cancelled():
+                    # Its caller gave up; acquire() takes it off the counts
+                    heapq.heappop(queue)
+                    continue
+                if self.in_flight + queue[0].slots > self._limit(priority):
+                    # Lower classes must not overtake it, and have lower limits anyway
+                    return
+                ticket = heapq.heappop(queue)
+                self._virtual[priority] = ticket.start
+                self._dequeued(ticket)
+                ticket.waited = time.monotonic() - ticket.enqueued_at
+                stats = self.stats[priority]
+                stats.in_flight += 1
+                stats.wait_total += ticket.waited
+                stats.wait_max = max(stats.wait_max, ticket.waited)
+                self.in_flight += ticket.slots
+                ticket.future.set_result(None)
+    
+    async def acquire(self, priority: Optional[str] = None, tenant: Optional[str] = None,
+                      cost: float = 1.0) -> Ticket:
+        """Wait for cost slots; raises SchedulerFull if the request's queue is at its limit"""
+        priority = priority or NORMAL
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+        ticket = self._enqueue(priority, tenant or DEFAULT_TENANT, cost)
+        self._dispatch()
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.cancelled():
+                # Still queued: _dispatch drops it when it reaches the head
+                self._dequeued(ticket)
+            else:
+                # Granted a slot just as the caller gave up
+                self.release(ticket)
+            raise
+        return ticket
+    
+    def release(self, ticket: Ticket):
+        """Free the ticket's slots and start the next queued request"""
+        self.in_flight -= ticket.slots
+        stats = self.stats[ticket.priority]
+        stats.in_flight -= 1
+        stats.completed += 1
+        self._dispatch()
+    
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: Optional[str] = None, tenant: Optional[str] = None, cost: float = 1.0):
+        """Hold cost slots for the duration of the block"""
+        ticket = await self.acquire(priority, tenant, cost)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+    
+    def report(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "reserved": self.reserved,
+            "in_flight": self.in_flight,
+            "classes": {priority: stats.to_dict() for priority, stats in self.stats.items()},
+        }
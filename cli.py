@@ -2,54 +2,300 @@
 Command Line Interface for AI Powerhouse
 """
 
-import asyncio
-import click
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from ai_powerhouse import AIPowerhouse
+import time
+# Taken before the other imports so that --profile can report their cost;
+# hence the noqa: E402 on the imports below
+STARTED = time.perf_counter()
 
+import asyncio  # noqa: E402
+import functools  # noqa: E402
+import json  # noqa: E402
+import signal  # noqa: E402
+import click  # noqa: E402
+from rich.console import Console  # noqa: E402
+from rich.table import Table  # noqa: E402
+from rich.panel import Panel  # noqa: E402
+from ai_powerhouse import AIPowerhouse, AIResponse, profiling  # noqa: E402
+from ai_powerhouse.scheduler import BATCH, INTERACTIVE, request_class  # noqa: E402
+
+# Taken before profiling can be enabled, so --profile can still report it
+IMPORT_TIME = time.perf_counter() - STARTED
 
 console = Console()
 
 
+def response_panel(title: str, response: AIResponse, color: str) -> Panel:
+    """Render a provider response, with its metadata as the panel subtitle"""
+    if not isinstance(response, AIResponse):
+        response = AIResponse(text=str(response))
+    
+    details = []
+    if response.model:
+        details.append(response.model)
+    if response.latency is not None:
+        details.append(f"{response.latency:.2f}s")
+    if response.total_tokens is not None:
+        details.append(f"{response.total_tokens} tokens")
+    if not response.ok:
+        color = "red"
+        details.append(response.error_type or "Error")
+    
+    return Panel(
+        str(response),
+        title=f"[bold {color}]{title}[/bold {color}]",
+        subtitle=" · ".join(details) or None,
+        border_style=color
+    )
+
+
+def print_profile(show: bool, output: str):
+    """Stop profiling and report the per-stage breakdown and/or write the dump"""
+    profiler = profiling.disable()
+    if profiler is None:
+        return
+    errors = Console(stderr=True)
+    if output:
+        profiler.dump(output)
+        errors.print(f"[dim]Profile written to {output}[/dim]")
+    if not show:
+        return
+    
+    table = Table(title=f"Profile ({profiler.wall * 1000:.0f} ms wall)")
+    table.add_column("Stage")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total ms", justify="right")
+    table.add_column("Self ms", justify="right")
+    table.add_column("% wall", justify="right")
+    for row in profiler.report():
+        table.add_row(
+            "  " * row["depth"] + row["stage"],
+            str(row["calls"]),
+            f"{row['total'] * 1000:.1f}",
+            f"{row['self'] * 1000:.1f}",
+            f"{row['total'] / profiler.wall:.0%}" if profiler.wall else "-"
+        )
+    errors.print(table)
+
+
 @click.group()
-def cli():
+@click.option('--profile', is_flag=True, help='Print a per-stage timing breakdown to stderr when done')
+@click.option('--profile-output', type=click.Path(dir_okay=False), default=None,
+              help='Write a cProfile dump (.prof/.pstats) or collapsed stage stacks (any other name)')
+@click.pass_context
+def cli(ctx, profile, profile_output):
     """AI Powerhouse - Unified interface for multiple AI providers"""
-    pass
+    if not (profile or profile_output):
+        return
+    use_cprofile = bool(profile_output) and profile_output.endswith((".prof", ".pstats"))
+    profiler = profiling.enable(cprofile=use_cprofile, started=STARTED)
+    profiler.add("imports", IMPORT_TIME)
+    # Resources close in reverse order: the command stage ends before the report
+    ctx.call_on_close(functools.partial(print_profile, profile, profile_output))
+    ctx.with_resource(profiling.stage("command", ctx.invoked_subcommand))
 
 
 @cli.command()
 @click.argument('prompt')
-@click.option('--claude', 'providers', flag_value=['claude'], help='Use Claude only')
-@click.option('--gemini', 'providers', flag_value=['gemini'], help='Use Gemini only')
-@click.option('--openai', 'providers', flag_value=['openai'], help='Use OpenAI only')
+@click.option('--claude', 'providers', flag_value='claude', help='Use Claude only')
+@click.option('--gemini', 'providers', flag_value='gemini', help='Use Gemini only')
+@click.option('--openai', 'providers', flag_value='openai', help='Use OpenAI only')
 @click.option('--all', 'providers', flag_value=None, help='Use all available providers')
-def ask(prompt, providers):
+@click.option('--provider', 'named', multiple=True,
+              help='Use a provider or configured endpoint by name (repeatable)')
+@click.option('--timeout', type=float, default=None,
+              help='Overall deadline in seconds; show whatever has finished by then')
+@click.option('--reuse', is_flag=True, help='Show logged answers to the same prompt instead of asking again')
+def ask(prompt, providers, named, timeout, reuse):
     """Ask a question to AI providers"""
+    if named:
+        providers = list(named)
+    elif providers is not None:
+        providers = [providers]
+    
     async def run_ask():
         ai = AIPowerhouse()
         
-        if providers is None:
-            # Use all providers
-            responses = await ai.ask(prompt)
-        else:
-            # Use specific provider
-            responses = await ai.ask(prompt, providers)
+        selected = (ai.config.default_providers or ai.get_available_providers()) if providers is None else providers
+        unknown = [name for name in selected if name not in ai.providers]
+        if unknown:
+            console.print(f"[yellow]Not configured: {', '.join(unknown)}[/yellow]")
+        selected = [name for name in selected if name in ai.providers]
+        if not selected:
+            raise click.ClickException("No valid providers available")
+        answered = set()
         
-        # Display responses
-        for provider, response in responses.items():
-            panel = Panel(
-                response,
-                title=f"[bold blue]{provider.title()}[/bold blue]",
-                border_style="blue"
+        to_ask = selected
+        if reuse:
+            for provider in selected:
+                # The lookup may wait for the log writer; keep it off the event loop
+                logged = await asyncio.to_thread(ai.recall, prompt, provider)
+                if logged is not None:
+                    answered.add(provider)
+                    console.print(response_panel(f"{provider.title()} (from history)", logged, "blue"))
+                    console.print()
+            if answered:
+                to_ask = [name for name in selected if name not in answered]
+                if not to_ask:
+                    return
+        
+        # Display each response as soon as its provider answers
+        async for provider, response in ai.ask_as_completed(prompt, to_ask, timeout, priority=INTERACTIVE):
+            answered.add(provider)
+            with profiling.stage("render"):
+                console.print(response_panel(provider.title(), response, "blue"))
+                console.print()
+        
+        missing = [name for name in selected if name not in answered]
+        if missing:
+            console.print(
+                f"[yellow]No response within {timeout}s from: "
+                f"{', '.join(name.title() for name in missing)}[/yellow]"
             )
-            console.print(panel)
-            console.print()
     
     asyncio.run(run_ask())
 
 
+REPL_HELP = """Commands:
+  /provider [name]  Show the providers, or switch to another one (the conversation is kept)
+  /reset            Start a new conversation
+  /help             Show this help
+  /exit             Leave (Ctrl-D also works)
+Ctrl-C cancels the answer being generated; the session stays open."""
+
+
+@cli.command()
+@click.option('--provider', help='Provider or configured endpoint to start with (default: first configured)')
+@click.option('--system', default=None, help='System prompt for the conversation')
+@click.option('--no-stream', is_flag=True, help='Show each answer when it is complete instead of as it arrives')
+def repl(provider, system, no_stream):
+    """Chat interactively with one warm AIPowerhouse instance"""
+    from ai_powerhouse.session import ChatSession
+    try:
+        import readline  # noqa: F401 - line editing and history for input()
+    except ImportError:
+        pass
+    
+    # One event loop for the whole session: the async clients keep their
+    # connection pools on the loop that first used them
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    ai = AIPowerhouse()
+    names = ai.get_available_providers()
+    if not names:
+        raise click.ClickException("No providers configured")
+    provider = provider or next(iter(ai.config.default_providers or names))
+    if provider not in ai.providers:
+        raise click.BadParameter(f"choose from: {', '.join(names)}", param_hint='--provider')
+    # Create the client now rather than on the first question
+    ai.providers[provider]
+    session = ChatSession(ai, provider, system=system)
+    
+    def switch(name):
+        if not name:
+            for item in names:
+                marker = "*" if item == session.provider_name else " "
+                console.print(f"{marker} {item}")
+        elif name not in ai.providers:
+            console.print(f"[red]Unknown provider {name}; choose from: {', '.join(names)}[/red]")
+        else:
+            session.provider_name = name
+            ai.providers[name]
+            console.print(f"[dim]Now asking {name}[/dim]")
+    
+    def on_text(text):
+        click.echo(text, nl=False)
+    
+    def answer(prompt):
+        task = loop.create_task(session.ask(prompt, on_text=None if no_stream else on_text,
+                                            priority=INTERACTIVE))
+        # Ctrl-C cancels the request in flight (closing its HTTP stream), not the session
+        previous = signal.signal(signal.SIGINT, lambda signum, frame: loop.call_soon_threadsafe(task.cancel))
+        try:
+            response = loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            console.print("\n[yellow]Cancelled[/yellow]")
+            return
+        finally:
+            signal.signal(signal.SIGINT, previous)
+        
+        if no_stream or not response.ok:
+            console.print(response_panel(session.provider_name.title(), response, "blue"))
+            return
+        details = [response.model, f"{response.latency:.2f}s" if response.latency is not None else None,
+                   f"{response.total_tokens} tokens" if response.total_tokens is not None else None]
+        console.print(f"\n[dim]{' · '.join(item for item in details if item)}[/dim]")
+    
+    console.print(f"[dim]Asking {provider}. Type /help for commands.[/dim]")
+    try:
+        while True:
+            try:
+                line = input(f"{session.provider_name}> ").strip()
+            except KeyboardInterrupt:
+                console.print()
+                continue
+            except EOFError:
+                console.print()
+                break
+            if not line:
+                continue
+            if not line.startswith("/"):
+                answer(line)
+                continue
+            command, _, argument = line.partition(" ")
+            if command in ("/exit", "/quit"):
+                break
+            elif command == "/provider":
+                switch(argument.strip())
+            elif command == "/reset":
+                session.reset()
+                console.print("[dim]Conversation cleared[/dim]")
+            elif command == "/help":
+                console.print(REPL_HELP, markup=False)
+            else:
+                console.print(f"[red]Unknown command {command}; type /help[/red]")
+    finally:
+        loop.run_until_complete(ai.drain_shadow())
+        loop.close()
+        asyncio.set_event_loop(None)
+
+
+@cli.command()
+@click.argument('query')
+@click.option('--provider', help='Only show interactions with this provider')
+@click.option('--limit', type=int, default=10, show_default=True, help='Maximum number of matches')
+@click.option('--full', is_flag=True, help='Print whole responses instead of a table')
+def history(query, provider, limit, full):
+    """Search logged prompts and responses (enable with AI_INTERACTION_LOG)"""
+    ai = AIPowerhouse()
+    try:
+        matches = ai.search_history(query, limit, provider)
+    except RuntimeError as e:
+        raise click.UsageError(str(e))
+    if not matches:
+        console.print("[yellow]No matching interactions[/yellow]")
+        return
+    
+    if full:
+        for match in matches:
+            title = f"{match['provider']} · {time.strftime('%Y-%m-%d %H:%M', time.localtime(match['ts']))}"
+            console.print(Panel(f"[bold]{match['prompt']}[/bold]\n\n{match['response']}", title=title))
+        return
+    
+    table = Table(title=f"History matching '{query}'")
+    table.add_column("When", style="dim")
+    table.add_column("Provider", style="cyan")
+    table.add_column("Prompt")
+    table.add_column("Response")
+    for match in matches:
+        table.add_row(
+            time.strftime('%Y-%m-%d %H:%M', time.localtime(match['ts'])),
+            match['provider'],
+            match['prompt'][:60],
+            (match['response'] or "")[:80]
+        )
+    console.print(table)
+
+
 @cli.command()
 def status():
     """Show status of all AI providers"""
@@ -68,6 +314,321 @@ def status():
     console.print(table)
 
 
+@cli.command('analyze-repo')
+@click.argument('path', type=click.Path(exists=True, file_okay=False))
+@click.option('--provider', 'providers', multiple=True, help='Provider to use (repeatable, default: all)')
+@click.option('--concurrency', type=int, default=4, show_default=True, help='Files analysed in parallel')
+@click.option('--manifest', type=click.Path(dir_okay=False), help='Manifest file (default: <path>/.ai-powerhouse-manifest.json)')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write the full JSON report to this file')
+@click.option('--no-minify', is_flag=True, help='Send files verbatim instead of stripping comments and noise')
+def analyze_repo(path, providers, concurrency, manifest, output, no_minify):
+    """Analyse every source file in a repository, reusing results for unchanged files"""
+    from ai_powerhouse.repo_analysis import RepositoryAnalyzer
+    
+    def show(analysis):
+        if analysis.error:
+            console.print(f"[red]✗[/red] {analysis.path}: {analysis.error}")
+        elif analysis.cached:
+            console.print(f"[dim]= {analysis.path} (unchanged)[/dim]")
+        else:
+            console.print(f"[green]✓[/green] {analysis.path}")
+    
+    async def run_analysis():
+        analyzer = RepositoryAnalyzer(
+            providers=list(providers) or None,
+            concurrency=concurrency,
+            manifest_path=manifest,
+            minify=not no_minify
+        )
+        # Bulk work: yields to interactive requests when a scheduler is configured
+        with request_class(BATCH):
+            return await analyzer.analyze(path, on_result=show)
+    
+    report = asyncio.run(run_analysis())
+    
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report.to_dict(), f, indent=2)
+    
+    console.print(
+        f"\n[bold]{len(report.files)} files[/bold]: {report.analyzed} analysed, "
+        f"{report.reused} reused, {report.failed} failed in {report.elapsed:.1f}s"
+    )
+    if report.tokens_saved:
+        console.print(f"[dim]Minification saved ~{report.tokens_saved} prompt tokens[/dim]")
+
+
+@cli.command()
+@click.argument('prompt')
+@click.option('--provider', 'providers', multiple=True, help='Provider to compare (repeatable, default: all)')
+@click.option('--timeout', type=float, default=None, help='Overall deadline in seconds')
+@click.option('--diff', 'show_diff', is_flag=True, help='Show how each answer differs from the consensus')
+def compare(prompt, providers, timeout, show_diff):
+    """Ask several providers and pick the consensus answer locally"""
+    ai = AIPowerhouse()
+    result = asyncio.run(ai.ask_consensus(prompt, list(providers) or None, timeout))
+    if not result.names:
+        console.print("[red]No provider returned an answer[/red]")
+        return
+    
+    table = Table(title=f"Agreement {result.agreement:.0%}")
+    table.add_column("Provider", style="cyan")
+    for name in result.names:
+        table.add_column(name.title(), justify="right")
+    table.add_column("Mean", justify="right", style="bold")
+    for name in result.names:
+        row = [f"{result.similarity(name, other):.2f}" for other in result.names]
+        table.add_row(name.title(), *row, f"{result.scores[name]:.2f}")
+    console.print(table)
+    
+    console.print(response_panel(f"Consensus: {result.winner.title()}", result.consensus, "green"))
+    for name in result.failed:
+        console.print(f"[red]✗ {name.title()} gave no answer[/red]")
+    if show_diff:
+        for name in result.names:
+            if name != result.winner:
+                console.print(Panel(result.diff(name) or "(identical)", title=f"{result.winner} → {name}"))
+
+
+@cli.command()
+@click.argument('prompt')
+@click.option('--provider', help='Provider whose fast and full models to use (default: first configured)')
+@click.option('--json', 'as_json', is_flag=True, help='Also escalate unless the answer is valid JSON')
+@click.option('--consistency', is_flag=True, help='Also escalate if a second fast sample disagrees')
+@click.option('--timeout', type=float, default=None, help='Deadline in seconds for the whole cascade')
+def cascade(prompt, provider, as_json, consistency, timeout):
+    """Answer with a fast model, escalating to the full model only when needed"""
+    from ai_powerhouse import cascade as checks
+    
+    validators = list(checks.DEFAULT_VALIDATORS)
+    if as_json:
+        validators.append(checks.json_format())
+    if consistency:
+        validators.append(checks.self_consistency())
+    
+    ai = AIPowerhouse()
+    response = asyncio.run(ai.ask_cascade(prompt, provider, validators, timeout=timeout))
+    console.print(response_panel(response.provider or "Cascade", response, "blue"))
+    
+    stats = ai.cascade(provider).stats
+    if stats.escalations:
+        console.print(f"[yellow]Escalated: {', '.join(stats.reasons)}[/yellow]")
+    saved = (f"{stats.latency_saved:+.2f}s" if stats.final_latency_mean is not None
+             else "n/a (no full-model call to compare with yet)")
+    console.print(
+        f"[dim]Escalation rate: {stats.escalation_rate:.0%} ({stats.escalations}/{stats.requests}) · "
+        f"estimated latency saved: {saved}[/dim]"
+    )
+
+
+@cli.command()
+@click.argument('prompts_file', type=click.File('r'))
+@click.option('--provider', required=True, help='Primary provider answering the prompts')
+@click.option('--candidate', required=True, help='Shadow candidate as provider[:model], e.g. claude:claude-3-5-sonnet-20240620')
+@click.option('--rate', type=float, default=1.0, show_default=True, help='Share of prompts mirrored to the candidate')
+@click.option('--concurrency', type=int, default=4, show_default=True, help='Primary requests in flight')
+def shadow(prompts_file, provider, candidate, rate, concurrency):
+    """Replay one prompt per line against a provider while shadowing a candidate"""
+    prompts = [line.strip() for line in prompts_file if line.strip()]
+    if not prompts:
+        raise click.UsageError("No prompts found")
+    
+    ai = AIPowerhouse()
+    ai.enable_shadow(provider, candidate, sample_rate=rate, max_concurrency=concurrency)
+    
+    async def replay():
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def one(prompt):
+            async with semaphore:
+                return await ai.ask_provider(provider, prompt)
+        
+        await asyncio.gather(*(one(prompt) for prompt in prompts))
+        await ai.drain_shadow()
+        return ai.shadow_report()[provider]
+    
+    report = asyncio.run(replay())
+    
+    def fmt(value, suffix=""):
+        return "-" if value is None else f"{value:.2f}{suffix}"
+    
+    table = Table(title=f"{provider} vs {report['candidate']} ({report['pairs']} pairs)")
+    table.add_column("Metric", style="cyan")
+    table.add_column(provider, justify="right")
+    table.add_column(report['candidate'], justify="right")
+    for key, label, suffix in [
+        ("latency_p50", "Latency p50", "s"),
+        ("latency_p95", "Latency p95", "s"),
+        ("input_tokens_mean", "Input tokens", ""),
+        ("output_tokens_mean", "Output tokens", ""),
+        ("errors", "Errors", ""),
+    ]:
+        table.add_row(label, fmt(report["primary_stats"][key], suffix), fmt(report["candidate_stats"][key], suffix))
+    console.print(table)
+    console.print(
+        f"Similarity mean {fmt(report['similarity_mean'])}, p5 {fmt(report['similarity_p5'])}; "
+        f"{report['mirrored']} mirrored, {report['dropped']} dropped at the shadow cap"
+    )
+
+
+@cli.command()
+@click.argument('prompts_file', type=click.File('r'))
+@click.option('--provider', type=click.Choice(['openai', 'claude']), default='openai', show_default=True,
+              help='Provider whose batch endpoint to use')
+@click.option('--timeout', type=float, default=None, help='Give up waiting after this many seconds')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write results as JSONL to this file')
+def batch(prompts_file, provider, timeout, output):
+    """Run one prompt per line through a provider's discounted batch endpoint"""
+    prompts = [line.strip() for line in prompts_file if line.strip()]
+    if not prompts:
+        raise click.UsageError("No prompts found")
+    
+    ai = AIPowerhouse()
+    try:
+        client = ai.batch_client(provider)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    
+    async def run_batch():
+        job = await client.submit(prompts, **ai.generation_options())
+        console.print(f"[cyan]Submitted batch {job.id} with {len(prompts)} prompts, waiting...[/cyan]")
+        await client.wait(job, timeout)
+        return await client.fetch_results(job)
+    
+    results = asyncio.run(run_batch())
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            for prompt, response in zip(prompts, results):
+                f.write(json.dumps({"prompt": prompt, **response.to_dict()}) + "\n")
+    else:
+        for prompt, response in zip(prompts, results):
+            console.print(response_panel(prompt[:60], response, "cyan"))
+    
+    failed = sum(1 for response in results if not response.ok)
+    console.print(f"[bold]{len(results) - failed} succeeded, {failed} failed[/bold]")
+
+
+@cli.command('review-diff')
+@click.option('--base', help='Revision to diff against (default: working tree vs index)')
+@click.option('--staged', is_flag=True, help='Review staged changes (pre-commit)')
+@click.option('--diff-file', type=click.File('r'), help='Read a unified diff from a file or - for stdin')
+@click.option('--provider', 'providers', multiple=True, help='Provider to use (repeatable, default: all)')
+@click.option('--agent', 'agents', multiple=True, help='Review with an agent such as security or code-review (repeatable)')
+def review_diff(base, staged, diff_file, providers, agents):
+    """Review only the functions and classes touched by a diff"""
+    from ai_powerhouse.diff_review import DiffReviewer
+    
+    async def run_review():
+        reviewer = DiffReviewer(providers=list(providers) or None, agents=list(agents) or None)
+        if diff_file:
+            return await reviewer.review(diff_file.read())
+        return await reviewer.review_git(base=base, staged=staged)
+    
+    report = asyncio.run(run_review())
+    
+    if not report.regions:
+        console.print("[yellow]No reviewable changes found[/yellow]")
+        return
+    
+    for path, responses in report.responses.items():
+        regions = ", ".join(f"{r.start}-{r.end}" for r in report.regions[path])
+        for provider, response in responses.items():
+            console.print(response_panel(f"{path} [{regions}] · {provider.title()}", response, "blue"))
+    
+    if report.findings:
+        table = Table(title="Findings")
+        table.add_column("Location", style="cyan")
+        table.add_column("Provider", style="magenta")
+        table.add_column("Finding")
+        for finding in report.findings:
+            table.add_row(f"{finding.path}:{finding.line}", finding.provider, finding.message)
+        console.print(table)
+    
+    console.print(
+        f"[dim]Sent {report.prompt_chars} characters instead of {report.full_file_chars} "
+        f"({report.reduction:.1f}x smaller)[/dim]"
+    )
+
+
+@cli.command()
+@click.argument('name')
+@click.argument('prompt', required=False, default='')
+@click.option('--file', 'file_path', type=click.Path(exists=True, dir_okay=False), help='File to analyse')
+@click.option('--provider', help='Provider to run the agent on (default: claude, then openai, then gemini)')
+@click.option('--raw', is_flag=True, help='Send the file verbatim instead of minified')
+@click.option('--timeout', type=float, default=None, help='Deadline in seconds; the request is aborted when it passes')
+def agent(name, prompt, file_path, provider, raw, timeout):
+    """Run a specialised agent (e.g. security-review, generate-tests) natively"""
+    from ai_powerhouse.agents import get_registry
+    
+    registry = get_registry()
+    if name not in registry:
+        raise click.BadParameter(
+            f"unknown agent, choose from: {', '.join(registry.names())}", param_hint='NAME'
+        )
+    
+    context = None
+    if file_path and not raw:
+        from ai_powerhouse.minify import minify_file
+        context = minify_file(file_path)
+        console.print(f"[dim]{context.summary()}[/dim]")
+    
+    async def run_agent():
+        ai = AIPowerhouse()
+        return await registry.get(name).run(ai, prompt, file_path, provider=provider, minify=not raw,
+                                            context=context, timeout=timeout)
+    
+    response = asyncio.run(run_agent())
+    console.print(response_panel(f"{registry.resolve(name).title()} Agent", response, "cyan"))
+
+
+@cli.command()
+@click.argument('file_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--agents', 'agent_names', default='all', show_default=True,
+              help='Comma-separated agents: security,review,performance,testing,electronics,docs')
+@click.option('--prompt', default=None, help='Extra instructions for every agent')
+@click.option('--provider', help='Provider to run the agents on')
+@click.option('--raw', is_flag=True, help='Send the file verbatim instead of minified')
+def pipeline(file_path, agent_names, prompt, provider, raw):
+    """Run an agent pipeline on a file, with independent agents in parallel"""
+    from ai_powerhouse.pipeline import AgentPipeline
+    
+    def show(name, response):
+        console.print(response_panel(f"{name.title()} Agent", response, "cyan"))
+    
+    async def run_pipeline():
+        runner = AgentPipeline.default(
+            [name.strip() for name in agent_names.split(',') if name.strip()],
+            provider=provider,
+            ai=AIPowerhouse(),
+            minify=not raw
+        )
+        return await runner.run(file_path, prompt, on_result=show)
+    
+    try:
+        result = asyncio.run(run_pipeline())
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--agents')
+    
+    console.print(f"[green]✅ Agent pipeline complete in {result.elapsed:.1f}s[/green]")
+
+
+@cli.command()
+def agents():
+    """List the agents available to the Python runtime"""
+    from ai_powerhouse.agents import get_registry
+    
+    registry = get_registry()
+    table = Table(title=f"Agents ({registry.prompts_dir})")
+    table.add_column("Agent", style="cyan")
+    table.add_column("Role", style="white")
+    for name, item in registry.agents.items():
+        role = next((line.strip() for line in item.instructions.splitlines()
+                     if line.strip() and not line.strip().endswith(':')), '')
+        table.add_row(name, role[:90])
+    console.print(table)
+
+
 @cli.command()
 @click.argument('prompt')
 def claude(prompt):
@@ -76,12 +637,7 @@ def claude(prompt):
         ai = AIPowerhouse()
         response = await ai.ask_claude(prompt)
         
-        panel = Panel(
-            response,
-            title="[bold blue]Claude[/bold blue]",
-            border_style="blue"
-        )
-        console.print(panel)
+        console.print(response_panel("Claude", response, "blue"))
     
     asyncio.run(run_claude())
 
@@ -94,12 +650,7 @@ def gemini(prompt):
         ai = AIPowerhouse()
         response = await ai.ask_gemini(prompt)
         
-        panel = Panel(
-            response,
-            title="[bold green]Gemini[/bold green]",
-            border_style="green"
-        )
-        console.print(panel)
+        console.print(response_panel("Gemini", response, "green"))
     
     asyncio.run(run_gemini())
 
@@ -112,12 +663,7 @@ def openai(prompt):
         ai = AIPowerhouse()
         response = await ai.ask_openai(prompt)
         
-        panel = Panel(
-            response,
-            title="[bold red]OpenAI[/bold red]",
-            border_style="red"
-        )
-        console.print(panel)
+        console.print(response_panel("OpenAI", response, "red"))
     
     asyncio.run(run_openai())
 
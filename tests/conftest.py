@@ -0,0 +1,58 @@
+"""
+Shared test fixtures for AI Powerhouse
+"""
+
+import asyncio
+
+import pytest
+
+from ai_powerhouse.config import Config
+from ai_powerhouse.core import AIPowerhouse
+from ai_powerhouse.providers.base import BaseProvider
+from ai_powerhouse.response import AIResponse
+
+
+class FakeProvider(BaseProvider):
+    """In-memory provider that answers after an optional delay"""
+    
+    def __init__(self, name: str = "fake", reply: str = "ok", delay: float = 0.0, **kwargs):
+        super().__init__(api_key="test-key", model=f"{name}-model", **kwargs)
+        self.name = name
+        self.reply = reply
+        self.delay = delay
+        self.prompts = []
+        self.options = []
+    
+    @property
+    def provider_name(self) -> str:
+        return self.name.title()
+    
+    async def generate_response(self, prompt: str, **kwargs) -> AIResponse:
+        self.prompts.append(prompt)
+        self.options.append(kwargs)
+        await asyncio.sleep(self.delay)
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        return AIResponse(
+            text=self.reply,
+            provider=self.provider_name,
+            model=self.model,
+            input_tokens=len(prompt.split()),
+            output_tokens=len(self.reply.split()),
+            finish_reason="stop",
+            latency=self.delay
+        )
+    
+    def validate_connection(self) -> bool:
+        return True
+
+
+@pytest.fixture
+def make_ai():
+    """Build an AIPowerhouse wired to the given fake providers"""
+    def factory(*providers: FakeProvider) -> AIPowerhouse:
+        ai = AIPowerhouse(Config())
+        for provider in providers:
+            ai.providers[provider.name] = provider
+        return ai
+    return factory
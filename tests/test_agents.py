@@ -0,0 +1,41 @@
+"""
+Tests for the Python agent runtime
+"""
+
+import pytest
+
+from ai_powerhouse.agents import AgentRegistry
+from tests.conftest import FakeProvider
+
+
+@pytest.fixture
+def registry(tmp_path):
+    (tmp_path / "security-agent.txt").write_text("You are a security agent.")
+    (tmp_path / "code-review-agent.txt").write_text("You are a reviewer.")
+    return AgentRegistry(str(tmp_path))
+
+
+def test_registry_resolves_powershell_commands(registry):
+    """Test that PowerShell aliases map onto prompt files"""
+    assert registry.names() == ["code-review", "security"]
+    assert registry.get("security-review").name == "security"
+    assert registry.get("review").name == "code-review"
+    assert "generate-tests" not in registry
+    with pytest.raises(KeyError):
+        registry.get("generate-tests")
+
+
+async def test_agent_runs_on_any_provider(make_ai, registry, tmp_path):
+    """Test that the agent prompt is sent as the system prompt with file context"""
+    source = tmp_path / "auth.py"
+    source.write_text("password = 'hunter2'\n")
+    provider = FakeProvider("gemini", reply="hard-coded secret")
+    ai = make_ai(provider)
+    
+    response = await registry.get("security-review").run(ai, "Check secrets", str(source))
+    
+    assert response == "hard-coded secret"
+    assert provider.options[0]["system"] == "You are a security agent."
+    assert provider.prompts[0] == (
+        f"File: {source}\n\npassword = 'hunter2'\n\nAdditional Context: Check secrets"
+    )
@@ -0,0 +1,169 @@
+"""
+Tests for batch-endpoint submission against a local fake batch server
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ai_powerhouse.batch import AnthropicBatchClient, BatchClient, BatchJob, OpenAIBatchClient
+
+
+class FakeBatchHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI and Anthropic batch APIs; every batch needs two polls to finish"""
+    
+    def log_message(self, *args):
+        pass
+    
+    def _send(self, payload, status=200):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+    
+    def do_POST(self):
+        state = self.server.state
+        if self.path == "/v1/files":
+            data = self._body()
+            assert b'name="purpose"\r\n\r\nbatch' in data
+            jsonl = data.split(b"Content-Type: application/jsonl\r\n\r\n", 1)[1].rsplit(b"\r\n--", 1)[0]
+            state["files"]["file-in"] = [json.loads(line) for line in jsonl.splitlines()]
+            self._send({"id": "file-in"})
+        elif self.path == "/v1/batches":
+            assert json.loads(self._body())["input_file_id"] == "file-in"
+            self._send({"id": "batch-oa", "status": "validating"})
+        elif self.path == "/v1/messages/batches":
+            assert self.headers["x-api-key"] == "test-key"
+            state["anthropic"] = json.loads(self._body())["requests"]
+            self._send({"id": "msgbatch-1", "processing_status": "in_progress"})
+        else:
+            self._send({"error": {"message": "not found"}}, 404)
+    
+    def do_GET(self):
+        state = self.server.state
+        state["polls"] = state.get("polls", 0) + 1
+        done = state["polls"] % 2 == 0
+        if self.path == "/v1/batches/batch-oa":
+            self._send({"id": "batch-oa", "status": "completed" if done else "in_progress",
+                        "output_file_id": "file-out"})
+        elif self.path == "/v1/files/file-out/content":
+            lines = []
+            # Results come back out of order, and the last request failed
+            for request in reversed(state["files"]["file-in"]):
+                prompt = request["body"]["messages"][-1]["content"]
+                if prompt == "fail":
+                    lines.append({"custom_id": request["custom_id"], "response": {
+                        "status_code": 400, "body": {"error": {"message": "bad", "code": "invalid"}}}})
+                    continue
+                lines.append({"custom_id": request["custom_id"], "response": {"status_code": 200, "body": {
+                    "model": "gpt-test",
+                    "choices": [{"message": {"content": prompt.upper()}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": 3, "completion_tokens": 2},
+                }}})
+            self._send("".join(json.dumps(line) + "\n" for line in lines).encode("utf-8"))
+        elif self.path == "/v1/messages/batches/msgbatch-1":
+            url = f"http://127.0.0.1:{self.server.server_port}/v1/messages/batches/msgbatch-1/results"
+            self._send({"id": "msgbatch-1", "processing_status": "ended" if done else "in_progress",
+                        "results_url": url if done else None})
+        elif self.path == "/v1/messages/batches/msgbatch-1/results":
+            lines = [
+                {"custom_id": request["custom_id"], "result": {"type": "succeeded", "message": {
+                    "model": "claude-test",
+                    "content": [{"type": "text", "text": request["params"]["messages"][0]["content"][::-1]}],
+                    "stop_reason": "end_turn",
+                    "usage": {"input_tokens": 4, "output_tokens": 5},
+                }}}
+                for request in state["anthropic"][1:]
+            ]
+            self._send("".join(json.dumps(line) + "\n" for line in lines).encode("utf-8"))
+        else:
+            self._send({"error": {"message": "not found"}}, 404)
+
+
+@pytest.fixture
+def batch_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBatchHandler)
+    server.state = {"files": {}}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+async def test_openai_batch_round_trip(batch_server):
+    client = OpenAIBatchClient("test-key", "gpt-test", base_url=batch_server, poll_interval=0.01)
+    results = await client.run(["one", "two", "fail"], system="be brief")
+    
+    assert [str(r) for r in results[:2]] == ["ONE", "TWO"]
+    assert results[0].input_tokens == 3 and results[0].finish_reason == "stop"
+    assert not results[2].ok and results[2].error_type == "invalid"
+
+
+async def test_anthropic_batch_round_trip_marks_missing_results(batch_server):
+    client = AnthropicBatchClient("test-key", "claude-test", base_url=batch_server, poll_interval=0.01)
+    results = await client.run(["lost", "abc", "xyz"])
+    
+    assert not results[0].ok and results[0].error_type == "BatchMissingResult"
+    assert [r.text for r in results[1:]] == ["cba", "zyx"]
+    assert results[1].output_tokens == 5
+
+
+async def test_wait_times_out(batch_server):
+    client = AnthropicBatchClient("test-key", "claude-test", base_url=batch_server, poll_interval=0.5)
+    job = await client.submit(["abc"])
+    with pytest.raises(TimeoutError):
+        await client.wait(job, timeout=0)
+
+
+def test_openai_null_content_becomes_empty_text():
+    """Test that a choice without message content (e.g. a refusal) parses to an empty string"""
+    client = OpenAIBatchClient("test-key", "gpt-test")
+    item = {"custom_id": "a-0", "response": {"status_code": 200, "body": {
+        "choices": [{"message": {"content": None, "refusal": "no"}, "finish_reason": "stop"}],
+    }}}
+    
+    response = client._parse_line(item, 0.0)
+    
+    assert response.ok and response.text == ""
+
+
+def test_batch_client_is_abstract():
+    """Test that the shared base cannot be instantiated without the provider hooks"""
+    with pytest.raises(TypeError):
+        BatchClient("test-key", "model")
+
+
+def test_batch_client_uses_the_first_pooled_key():
+    """Test that a provider configured only with a key pool can still submit batches"""
+    from ai_powerhouse.config import Config
+    from ai_powerhouse.core import AIPowerhouse
+    
+    ai = AIPowerhouse(Config(openai_api_keys=["pool-1", "pool-2"]))
+    
+    assert ai.batch_client("openai").api_key == "pool-1"
+    with pytest.raises(ValueError):
+        ai.batch_client("gemini")
+
+
+async def test_wait_polls_again_at_the_deadline():
+    """Test that a long backoff does not end the wait before the timeout expires"""
+    class SlowBatch(AnthropicBatchClient):
+        polls = 0
+        
+        async def refresh(self, job):
+            self.polls += 1
+            return self.polls == 3
+    
+    client = SlowBatch("test-key", "claude-test", poll_interval=0.05, max_poll_interval=10)
+    job = BatchJob("b", client.provider_name, [])
+    
+    await client.wait(job, timeout=0.12)
+    
+    assert client.polls == 3
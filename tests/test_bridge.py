@@ -0,0 +1,134 @@
+"""
+Tests for the PowerShell discovery cache of the integration bridge
+"""
+
+import asyncio
+import contextvars
+import importlib.util
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import FakeProvider
+
+
+BRIDGE_PATH = Path(__file__).resolve().parents[1] / "AI-Powerhouse-Framework" / "Integration" / "unified_ai_bridge.py"
+
+
+@pytest.fixture
+def bridge(tmp_path, monkeypatch):
+    """The bridge module with an empty PATH, a private cache and a stubbed subprocess.run"""
+    spec = importlib.util.spec_from_file_location("unified_ai_bridge", BRIDGE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    
+    (tmp_path / "bin").mkdir()
+    monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+    monkeypatch.setenv("PSModulePath", "")
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    
+    module.calls = []
+    
+    def run(cmd, **kwargs):
+        module.calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout="ClaudeAgents 1.0", stderr="")
+    
+    monkeypatch.setattr(module.subprocess, "run", run)
+    return module
+
+
+def install_pwsh(tmp_path) -> Path:
+    pwsh = tmp_path / "bin" / "pwsh"
+    pwsh.write_text("#!/bin/sh\n")
+    pwsh.chmod(0o755)
+    return pwsh
+
+
+def test_discovery_is_cached_across_instances(bridge, tmp_path):
+    """Test that a second bridge reuses the cached discovery without starting PowerShell"""
+    pwsh = install_pwsh(tmp_path)
+    
+    first = bridge.PowerShellAgentBridge()
+    probes = len(bridge.calls)
+    second = bridge.PowerShellAgentBridge()
+    
+    assert probes == 2  # -Version, then the module check
+    assert len(bridge.calls) == probes
+    assert first.powershell_path == second.powershell_path == str(pwsh)
+    assert second.agents_available
+    assert str(bridge.discovery_cache_path()).startswith(str(tmp_path / "cache"))
+
+
+def test_negative_result_is_cached_until_powershell_is_installed(bridge, tmp_path):
+    """Test that installing pwsh into a directory already on PATH invalidates "not found" """
+    with pytest.raises(RuntimeError):
+        bridge.PowerShellAgentBridge()
+    assert bridge.discovery_cache_path().exists()
+    with pytest.raises(RuntimeError):
+        bridge.PowerShellAgentBridge()
+    
+    pwsh = install_pwsh(tmp_path)
+    
+    assert bridge.PowerShellAgentBridge().powershell_path == str(pwsh)
+
+
+def test_uninstalling_powershell_invalidates_the_cache(bridge, tmp_path):
+    """Test that a cached path is not used once the executable is gone"""
+    pwsh = install_pwsh(tmp_path)
+    bridge.PowerShellAgentBridge()
+    
+    pwsh.unlink()
+    
+    with pytest.raises(RuntimeError):
+        bridge.PowerShellAgentBridge()
+
+
+def test_refresh_records_a_missing_powershell_like_the_constructor(bridge, tmp_path):
+    """Test that refresh() caches a negative result and raises the constructor's error"""
+    pwsh = install_pwsh(tmp_path)
+    instance = bridge.PowerShellAgentBridge()
+    pwsh.unlink()
+    
+    with pytest.raises(RuntimeError, match="PowerShell not found"):
+        instance.refresh()
+    
+    assert instance.powershell_path is None and not instance.agents_available
+    assert instance._load_cache()["powershell_path"] is None
+
+
+class LoopBoundProvider(FakeProvider):
+    """Fails like an async SDK client used from a loop other than its first"""
+    
+    loop = None
+    
+    async def generate_response(self, prompt, **kwargs):
+        loop = asyncio.get_running_loop()
+        if self.loop not in (None, loop):
+            raise RuntimeError("attached to a different loop")
+        self.loop = loop
+        return await super().generate_response(prompt, **kwargs)
+
+
+def test_python_bridge_reuses_one_event_loop(bridge, make_ai):
+    """Test that repeated bridge calls share a loop and keep the caller's context"""
+    python_bridge = bridge.PythonAIBridge(str(BRIDGE_PATH.parents[2]))
+    python_bridge._ai = make_ai(LoopBoundProvider("claude", reply="hello"))
+    request_id = contextvars.ContextVar("request_id", default=None)
+    seen = []
+    
+    async def read_context():
+        seen.append(request_id.get())
+    
+    try:
+        assert python_bridge.ask_claude("one") == "hello"
+        assert python_bridge.ask_claude("two") == "hello"
+        assert python_bridge.ask_all("three") == {"claude": "hello"}
+        request_id.set("abc")
+        python_bridge._run(read_context())
+    finally:
+        python_bridge.close()
+    
+    assert seen == ["abc"]
+
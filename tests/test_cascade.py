@@ -0,0 +1,67 @@
+"""
+Tests for small-to-large model cascades
+"""
+
+from ai_powerhouse.cascade import Cascade, CascadeStep, json_format, non_empty, self_consistency
+from ai_powerhouse.response import AIResponse
+
+from tests.conftest import FakeProvider
+
+
+class ModelProvider(FakeProvider):
+    """Answers depend on the requested model"""
+    
+    def __init__(self, answers, **kwargs):
+        super().__init__(**kwargs)
+        self.answers = answers
+        self.models = []
+    
+    async def generate_response(self, prompt: str, **kwargs) -> AIResponse:
+        model = kwargs.get("model") or self.model
+        self.models.append(model)
+        answer = self.answers[model]
+        if callable(answer):
+            answer = answer()
+        return AIResponse(text=answer, provider="Fake", model=model, latency=0.01)
+
+
+async def test_fast_answer_is_kept_when_valid(make_ai):
+    provider = ModelProvider({"small": '{"label": "spam"}', "fake-model": '{"label": "ham"}'})
+    ai = make_ai(provider)
+    cascade = Cascade(ai, [CascadeStep("fake", "small"), CascadeStep("fake")], [non_empty(), json_format()])
+    
+    response = await cascade.run("classify")
+    
+    assert response.model == "small"
+    assert provider.models == ["small"]
+    assert cascade.stats.escalation_rate == 0.0
+
+
+async def test_invalid_fast_answer_escalates(make_ai):
+    samples = iter(["yes", "no"])
+    provider = ModelProvider({"small": lambda: next(samples), "fake-model": "definitely yes"})
+    ai = make_ai(provider)
+    cascade = Cascade(ai, [CascadeStep("fake", "small"), CascadeStep("fake")], [self_consistency()])
+    
+    response = await cascade.run("is it?")
+    
+    assert str(response) == "definitely yes"
+    assert provider.models == ["small", "small", "fake-model"]
+    stats = cascade.stats.to_dict()
+    assert stats["escalations"] == 1 and stats["reasons"] == {"inconsistent": 1}
+    assert stats["latency_saved"] < 0
+    assert stats["final_latency_mean"] is not None
+
+
+async def test_ask_cascade_uses_configured_fast_model(make_ai):
+    from ai_powerhouse.config import Config
+    from ai_powerhouse.core import AIPowerhouse
+    
+    ai = AIPowerhouse(Config(openai_api_key="k", openai_model="big", openai_fast_model="small"))
+    ai.providers["openai"] = ModelProvider({"small": "", "openai-model": "answer"}, name="openai")
+    
+    response = await ai.ask_cascade("hi", "openai")
+    
+    assert str(response) == "answer"
+    assert [step.model for step in ai.cascade("openai").steps] == ["small", None]
+    assert ai.cascade("openai").stats.escalations == 1
@@ -0,0 +1,52 @@
+"""
+Tests for the command line interface
+"""
+
+import os
+
+import pytest
+from click.testing import CliRunner
+
+import cli
+
+
+@pytest.fixture
+def no_keys(tmp_path, monkeypatch):
+    """Run from an empty directory with no provider keys or endpoints configured"""
+    monkeypatch.chdir(tmp_path)
+    for name in ("ANTHROPIC_API_KEY", "GOOGLE_API_KEY", "OPENAI_API_KEY",
+                 "ANTHROPIC_API_KEYS", "GOOGLE_API_KEYS", "OPENAI_API_KEYS"):
+        monkeypatch.delenv(name, raising=False)
+    for name in [name for name in os.environ if name.startswith("AI_ENDPOINT_")]:
+        monkeypatch.delenv(name)
+
+
+@pytest.mark.parametrize("args", [["ask", "hello"], ["ask", "--claude", "hello"]])
+def test_ask_without_providers_fails(no_keys, args):
+    """Test that ask reports missing providers and exits non-zero instead of printing nothing"""
+    result = CliRunner().invoke(cli.cli, args)
+    
+    assert result.exit_code == 1
+    assert "No valid providers available" in result.output
+    if "--claude" in args:
+        assert "Not configured: claude" in result.output
+
+
+def test_cascade_reports_escalation_rate_and_latency_saved(no_keys, monkeypatch):
+    """Test that cascade prints its escalation rate and latency estimate on every run"""
+    from ai_powerhouse.config import Config
+    from ai_powerhouse.core import AIPowerhouse
+    from tests.test_cascade import ModelProvider
+    
+    def make_ai():
+        ai = AIPowerhouse(Config(openai_api_key="k", openai_model="big", openai_fast_model="small"))
+        ai.providers["openai"] = ModelProvider({"small": "fast answer", "openai-model": "answer"}, name="openai")
+        return ai
+    
+    monkeypatch.setattr(cli, "AIPowerhouse", make_ai)
+    result = CliRunner().invoke(cli.cli, ["cascade", "hello", "--provider", "openai"])
+    
+    assert result.exit_code == 0, result.output
+    assert "fast answer" in result.output
+    assert "Escalation rate: 0% (0/1)" in result.output
+    assert "estimated latency saved: n/a" in result.output
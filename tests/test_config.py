@@ -49,3 +49,21 @@ def test_config_defaults():
     assert config.openai_model == "gpt-4"
     assert config.max_tokens == 4000
     assert config.temperature == 0.7
+
+
+def test_config_loads_named_endpoints(monkeypatch):
+    """Test OpenAI-compatible endpoints and default routing from the environment"""
+    monkeypatch.setenv("AI_ENDPOINTS", "local, gpu-box")
+    monkeypatch.setenv("AI_ENDPOINT_LOCAL_BASE_URL", "http://127.0.0.1:8000/v1")
+    monkeypatch.setenv("AI_ENDPOINT_LOCAL_MODEL", "llama3")
+    monkeypatch.setenv("AI_ENDPOINT_GPU_BOX_BASE_URL", "http://10.0.0.5:8000/v1")
+    monkeypatch.setenv("AI_ENDPOINT_GPU_BOX_MODEL", "qwen")
+    monkeypatch.setenv("AI_ENDPOINT_GPU_BOX_HEADERS", '{"X-Team": "platform"}')
+    monkeypatch.setenv("DEFAULT_PROVIDERS", "local")
+    
+    config = Config.load_from_env()
+    
+    assert config.endpoints["local"].model == "llama3"
+    assert config.endpoints["gpu-box"].headers == {"X-Team": "platform"}
+    assert config.default_providers == ["local"]
+    assert config.validate_keys()["gpu-box"] is True
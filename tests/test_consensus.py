@@ -0,0 +1,46 @@
+"""
+Tests for local similarity and consensus selection
+"""
+
+from ai_powerhouse.consensus import code_diff, compare_responses, response_similarity
+from ai_powerhouse.response import AIResponse
+from ai_powerhouse.similarity import MinHasher, jaccard, shingles, similarity_matrix
+
+
+def test_minhash_tracks_jaccard():
+    a = "the quick brown fox jumps over the lazy dog " * 3
+    b = a + "and then runs far away into the forest"
+    hasher = MinHasher(num_perm=128)
+    
+    exact = jaccard(shingles(a), shingles(b))
+    estimate = MinHasher.similarity(hasher.signature(a), hasher.signature(b))
+    
+    assert abs(exact - estimate) < 0.2
+    assert hasher.signature(a) == MinHasher(num_perm=128).signature(a)
+    matrix = similarity_matrix([a, b, "unrelated words entirely"], method="minhash")
+    assert matrix[0][1] > matrix[0][2]
+
+
+def test_code_similarity_ignores_formatting():
+    a = "Use this:\n```python\ndef rev(s):\n    return s[::-1]\n```"
+    b = "Here you go.\n```py\ndef rev(s):\n        return   s[::-1]\n```"
+    
+    assert response_similarity(a, b, code_weight=1.0) == 1.0
+    assert code_diff(a, "```python\ndef rev(s):\n    return ''.join(reversed(s))\n```")
+
+
+def test_consensus_picks_medoid_and_skips_failures():
+    responses = {
+        "claude": AIResponse(text="Paris is the capital of France and its largest city."),
+        "gemini": AIResponse(text="The capital of France is Paris, which is also its largest city."),
+        "openai": AIResponse(text="Paris is the capital of France and also its largest city."),
+        "local": AIResponse(text="I am not sure, maybe Lyon or Marseille?"),
+        "broken": AIResponse.failure("timeout", error_type="Timeout"),
+    }
+    
+    result = compare_responses(responses)
+    
+    assert result.winner in ("claude", "openai")
+    assert result.failed == ["broken"]
+    assert result.outliers(0.1) == ["local"]
+    assert result.to_dict()["matrix"]["claude"]["claude"] == 1.0
@@ -0,0 +1,158 @@
+"""
+Tests for the AIPowerhouse orchestrator
+"""
+
+from types import SimpleNamespace
+
+from ai_powerhouse.providers.claude import ClaudeProvider
+from ai_powerhouse.providers.openai_provider import OpenAIProvider
+
+from tests.conftest import FakeProvider
+
+
+async def test_ask_as_completed_yields_fastest_first(make_ai):
+    """Test that results arrive in completion order"""
+    ai = make_ai(
+        FakeProvider("slow", reply="slow answer", delay=0.05),
+        FakeProvider("fast", reply="fast answer", delay=0.0),
+    )
+    
+    results = [item async for item in ai.ask_as_completed("hi")]
+    
+    assert results == [("fast", "fast answer"), ("slow", "slow answer")]
+
+
+async def test_ask_as_completed_deadline(make_ai):
+    """Test that the deadline returns whatever has finished"""
+    ai = make_ai(
+        FakeProvider("slow", delay=5.0),
+        FakeProvider("fast", reply="done"),
+    )
+    
+    results = [item async for item in ai.ask_as_completed("hi", timeout=0.05)]
+    
+    assert results == [("fast", "done")]
+
+
+async def test_ask_keeps_provider_order_and_reports_errors(make_ai):
+    """Test that ask returns every requested provider in order"""
+    ai = make_ai(
+        FakeProvider("one", reply="first", delay=0.02),
+        FakeProvider("two", reply=RuntimeError("boom")),
+        FakeProvider("three", delay=5.0),
+    )
+    
+    responses = await ai.ask("hi", timeout=0.1)
+    
+    assert list(responses) == ["one", "two", "three"]
+    assert responses["one"] == "first"
+    assert responses["two"] == "Error: boom"
+    assert responses["two"].error_type == "RuntimeError"
+    assert responses["three"].startswith("Error: No response within")
+
+
+async def test_default_providers_route_unnamed_calls(make_ai):
+    """Test that calls without providers go to config.default_providers"""
+    local, cloud = FakeProvider("local", reply="local"), FakeProvider("cloud", reply="cloud")
+    ai = make_ai(local, cloud)
+    ai.config.default_providers = ["local"]
+    
+    assert list(await ai.ask("hi")) == ["local"]
+    assert str((await ai.ask("hard", ["cloud"]))["cloud"]) == "cloud"
+    assert len(cloud.prompts) == 1
+
+
+def test_endpoints_become_named_providers():
+    """Test that configured endpoints are created as OpenAI-compatible providers"""
+    from ai_powerhouse.config import Config, EndpointConfig
+    from ai_powerhouse.core import AIPowerhouse
+    from ai_powerhouse.providers import OpenAICompatibleProvider
+    
+    ai = AIPowerhouse(Config(endpoints={
+        "local": EndpointConfig(base_url="http://127.0.0.1:8000/v1", model="llama3")
+    }))
+    
+    provider = ai.providers["local"]
+    assert isinstance(provider, OpenAICompatibleProvider)
+    assert provider.provider_name == "local" and provider.model == "llama3"
+    assert provider.base_url == "http://127.0.0.1:8000/v1"
+
+
+class StubClaudeMessages:
+    """Stands in for anthropic.AsyncAnthropic().messages: one answer per call"""
+    
+    def __init__(self):
+        self.requests = []
+    
+    async def create(self, **request):
+        self.requests.append(request)
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=f"answer {len(self.requests)}")],
+            model=request["model"],
+            usage=SimpleNamespace(input_tokens=5, output_tokens=2),
+            stop_reason="end_turn"
+        )
+
+
+class StubOpenAICompletions:
+    """Stands in for openai.AsyncOpenAI().chat.completions: n choices per call"""
+    
+    def __init__(self):
+        self.requests = []
+    
+    async def create(self, **request):
+        self.requests.append(request)
+        choices = [
+            SimpleNamespace(message=SimpleNamespace(content=f"answer {i + 1}"), finish_reason="stop")
+            for i in range(request["n"])
+        ]
+        return SimpleNamespace(
+            choices=choices,
+            model=request["model"],
+            usage=SimpleNamespace(prompt_tokens=5, completion_tokens=2 * request["n"])
+        )
+
+
+async def test_ask_samples_n_candidates(make_ai):
+    """Test that OpenAI samples n candidates natively and Claude falls back to concurrent calls"""
+    claude = ClaudeProvider("test-key", model="claude-test")
+    claude.client = object()
+    claude.async_client = SimpleNamespace(messages=StubClaudeMessages())
+    openai = OpenAIProvider("test-key", model="gpt-test")
+    openai.client = object()
+    openai.async_client = SimpleNamespace(chat=SimpleNamespace(completions=StubOpenAICompletions()))
+    ai = make_ai()
+    ai.providers.update(claude=claude, openai=openai)
+    
+    responses = await ai.ask("hi", n=3)
+    
+    openai_requests = openai.async_client.chat.completions.requests
+    assert len(openai_requests) == 1 and openai_requests[0]["n"] == 3
+    claude_requests = claude.async_client.messages.requests
+    assert len(claude_requests) == 3 and all("n" not in request for request in claude_requests)
+    for name in ("claude", "openai"):
+        response = responses[name]
+        assert response.candidates == ["answer 1", "answer 2", "answer 3"]
+        assert str(response) == "answer 1"
+        assert response.output_tokens == 6
+    assert responses["claude"].input_tokens == 15
+    assert responses["openai"].input_tokens == 5
+
+
+async def test_openai_refusal_has_empty_text():
+    """Test that a choice with no content (a refusal or tool call) gives empty text, not None"""
+    openai = OpenAIProvider("test-key", model="gpt-test")
+    openai.client = object()
+    completions = StubOpenAICompletions()
+    openai.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    
+    async def refuse(**request):
+        response = await StubOpenAICompletions.create(completions, **request)
+        response.choices[0].message.content = None
+        return response
+    
+    completions.create = refuse
+    response = await openai.generate_response("hi")
+    
+    assert response.ok and str(response) == "" and response.candidates == [""]
+
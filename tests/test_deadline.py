@@ -0,0 +1,89 @@
+"""
+Tests for per-request deadlines and cancellation
+"""
+
+import asyncio
+
+from ai_powerhouse.deadline import Deadline
+from ai_powerhouse.keypool import PooledProvider
+from tests.conftest import FakeProvider
+
+
+class HangingProvider(FakeProvider):
+    """Provider whose call never finishes and notes when it is cancelled"""
+    
+    def __init__(self, name: str = "hanging"):
+        super().__init__(name)
+        self.cancelled = False
+    
+    async def generate_response(self, prompt: str, **kwargs):
+        self.options.append(kwargs)
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def test_deadline_within_keeps_the_earlier_deadline():
+    """Test that an enclosing deadline is only replaced by a sooner one"""
+    outer = Deadline(10.0)
+    
+    assert Deadline.within(None, outer) is outer
+    assert Deadline.within(60.0, outer) is outer
+    assert Deadline.within(0.5, outer).timeout == 0.5
+    assert Deadline.within(None, None) is None
+    assert Deadline(0.0).expired and Deadline(0.0).remaining() == 0.0
+
+
+async def test_ask_provider_timeout_cancels_the_call(make_ai):
+    """Test that an expired deadline cancels the provider call and reports a timeout"""
+    provider = HangingProvider()
+    ai = make_ai(provider)
+    
+    response = await ai.ask_provider("hanging", "hi", timeout=0.05)
+    
+    assert not response.ok
+    assert response.error_type == "Timeout"
+    assert provider.cancelled
+    deadline = provider.options[0]["deadline"]
+    assert 0 < deadline.timeout <= 0.05
+
+
+async def test_ask_passes_deadline_to_providers_and_cancels_stragglers(make_ai):
+    """Test that ask propagates its timeout and cancels providers still running"""
+    fast = FakeProvider("fast", reply="done")
+    slow = HangingProvider("slow")
+    ai = make_ai(fast, slow)
+    
+    responses = await ai.ask("hi", timeout=0.05)
+    await asyncio.sleep(0)
+    
+    assert responses["fast"].text == "done"
+    assert responses["slow"].error_type == "Timeout"
+    assert slow.cancelled
+    assert fast.options[0]["deadline"] is slow.options[0]["deadline"]
+
+
+async def test_cascade_shares_one_deadline_across_steps(make_ai):
+    """Test that a cascade timeout bounds the whole cascade, not each step"""
+    from ai_powerhouse.cascade import Cascade, CascadeStep
+    
+    provider = FakeProvider("fake", reply="")
+    ai = make_ai(provider)
+    cascade = Cascade(ai, [CascadeStep("fake", "small"), CascadeStep("fake")])
+    
+    await cascade.run("hi", timeout=5.0)
+    
+    assert len(provider.options) == 2
+    assert provider.options[0]["deadline"] is provider.options[1]["deadline"]
+
+
+async def test_key_pool_does_not_wait_past_the_deadline():
+    """Test that a pool gives up on keys that free up only after the deadline"""
+    pool = PooledProvider([FakeProvider("only")], rpm_per_key=1, max_wait=30.0)
+    await pool.generate_response("first")
+    
+    response = await asyncio.wait_for(pool.generate_response("second", deadline=Deadline(0.05)), 1.0)
+    
+    assert response.error_type == "KeyPoolExhausted"
@@ -0,0 +1,105 @@
+"""
+Tests for diff-aware code review
+"""
+
+import subprocess
+
+from ai_powerhouse.diff_review import DiffReviewer, find_regions, parse_unified_diff
+from tests.conftest import FakeProvider
+
+
+SOURCE = '''import os
+
+
+def untouched():
+    return 1
+
+
+class Service:
+    def run(self, value):
+        total = value * 2
+        return total
+    
+    def stop(self):
+        return None
+'''
+
+DIFF = '''diff --git a/service.py b/service.py
+--- a/service.py
++++ b/service.py
+@@ -10 +10 @@ class Service:
+-        total = value
++        total = value * 2
+'''
+
+
+def test_parse_unified_diff():
+    """Test extraction of changed new-side lines"""
+    diff = DIFF + '''diff --git a/gone.py b/gone.py
+--- a/gone.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-x = 1
+-y = 2
+'''
+    assert parse_unified_diff(diff) == {"service.py": [10]}
+
+
+def test_parse_unified_diff_added_line_that_looks_like_a_header():
+    """Test that an added line starting with "++ " does not start a new file"""
+    diff = (
+        "diff --git a/x.py b/x.py\n"
+        "--- a/x.py\n"
+        "+++ b/x.py\n"
+        "@@ -1,0 +2 @@\n"
+        "+++ counter\n"
+        "@@ -10 +11 @@\n"
+        "-old = 1\n"
+        "+new = 1\n"
+    )
+    assert parse_unified_diff(diff) == {"x.py": [2, 11]}
+
+
+def test_regions_expand_to_enclosing_function():
+    """Test that a hunk grows to its innermost enclosing definition"""
+    regions = find_regions("service.py", SOURCE, [10])
+    
+    assert [(r.start, r.end, r.symbol, r.changed) for r in regions] == [(9, 11, "run", [10])]
+
+
+async def test_review_sends_regions_and_maps_findings(make_ai, tmp_path):
+    """Test that only the region is sent and findings map to file lines"""
+    (tmp_path / "service.py").write_text(SOURCE)
+    provider = FakeProvider("fake", reply="service.py:10: LOW: doubling may overflow")
+    reviewer = DiffReviewer(make_ai(provider))
+    
+    report = await reviewer.review(DIFF, root=str(tmp_path))
+    
+    prompt = provider.prompts[0]
+    assert "   10+|         total = value * 2" in prompt
+    assert "def untouched" not in prompt
+    assert [(f.path, f.line, f.symbol) for f in report.findings] == [("service.py", 10, "run")]
+
+
+async def test_staged_review_reads_context_from_the_index(make_ai, tmp_path):
+    """Test that a partially staged file is reviewed as staged, not as in the working tree"""
+    def git(*args):
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                       cwd=tmp_path, check=True, capture_output=True)
+    
+    service = tmp_path / "service.py"
+    git("init", "-q")
+    service.write_text(SOURCE.replace("value * 2", "value"))
+    git("add", "service.py")
+    git("commit", "-q", "-m", "base")
+    service.write_text(SOURCE)
+    git("add", "service.py")
+    service.write_text("# unstaged\n# lines\n" + SOURCE)
+    provider = FakeProvider("fake", reply="service.py:10: LOW: doubling may overflow")
+    
+    report = await DiffReviewer(make_ai(provider)).review_git(staged=True, root=str(tmp_path))
+    
+    assert "   10+|         total = value * 2" in provider.prompts[0]
+    assert "unstaged" not in provider.prompts[0]
+    assert [(f.path, f.line, f.symbol) for f in report.findings] == [("service.py", 10, "run")]
+
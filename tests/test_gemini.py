@@ -0,0 +1,89 @@
+"""
+Tests for the Gemini provider's per-instance service clients
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from ai_powerhouse.providers import gemini
+
+
+class StubModel:
+    """Stands in for genai.GenerativeModel, with or without the client attributes"""
+    
+    has_clients = True
+    
+    def __init__(self, model):
+        self.model = model
+        if self.has_clients:
+            self._client = None
+            self._async_client = None
+    
+    async def generate_content_async(self, contents, **options):
+        part = SimpleNamespace(text=f"{self.model}: {contents[-1]['parts'][0]}")
+        candidate = SimpleNamespace(content=SimpleNamespace(parts=[part]), finish_reason=None)
+        return SimpleNamespace(candidates=[candidate], usage_metadata=None)
+
+
+@pytest.fixture
+def stub_sdk(monkeypatch):
+    """Replace google.generativeai and generativelanguage with recording stubs"""
+    configured = []
+    genai = SimpleNamespace(
+        GenerativeModel=StubModel,
+        configure=lambda **options: configured.append(options),
+        types=SimpleNamespace(GenerationConfig=dict),
+    )
+    glm = SimpleNamespace(
+        GenerativeServiceClient=lambda client_options: ("sync", client_options["api_key"]),
+        GenerativeServiceAsyncClient=lambda client_options: ("async", client_options["api_key"]),
+    )
+    monkeypatch.setattr(gemini, "genai", genai)
+    monkeypatch.setattr(gemini, "glm", glm)
+    monkeypatch.setattr(gemini.GeminiProvider, "shared_key", None)
+    return configured
+
+
+def test_installed_sdk_still_has_the_client_attributes():
+    """Test that GenerativeModel still exposes the attributes per-instance clients rely on"""
+    genai = pytest.importorskip("google.generativeai")
+    
+    assert gemini.own_clients(genai.GenerativeModel("gemini-pro"))
+
+
+async def test_each_instance_uses_its_own_key(stub_sdk):
+    """Test that two providers keep separate service clients instead of configuring genai"""
+    first = gemini.GeminiProvider("key-1", model="gemini-test")
+    second = gemini.GeminiProvider("key-2", model="gemini-test")
+    
+    await first.generate_response("hi")
+    
+    assert first.client._client == ("sync", "key-1") and second.client._client == ("sync", "key-2")
+    assert first.client._async_client == ("async", "key-1")
+    assert first._async_model_client("gemini-other")._client == ("sync", "key-1")
+    assert stub_sdk == []
+
+
+async def test_falls_back_to_the_shared_client_without_the_attributes(stub_sdk, monkeypatch):
+    """Test that a GenerativeModel without the private attributes is used as is"""
+    monkeypatch.setattr(StubModel, "has_clients", False)
+    provider = gemini.GeminiProvider("key-1", model="gemini-test")
+    
+    response = await provider.generate_response("hi", model="gemini-other")
+    
+    assert response.ok and response.text == "gemini-other: hi"
+    assert stub_sdk == [{"api_key": "key-1"}]
+    assert not hasattr(provider.client, "_client")
+
+
+def test_shared_client_refuses_a_second_key(stub_sdk, monkeypatch):
+    """Test that without per-instance clients a second key fails instead of replacing the first"""
+    monkeypatch.setattr(StubModel, "has_clients", False)
+    gemini.GeminiProvider("key-1")
+    gemini.GeminiProvider("key-1")
+    
+    with pytest.raises(RuntimeError, match="only one Gemini key"):
+        gemini.GeminiProvider("key-2")
+    assert stub_sdk == [{"api_key": "key-1"}] * 2
+
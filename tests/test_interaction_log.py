@@ -0,0 +1,84 @@
+"""
+Tests for the structured interaction log
+"""
+
+import json
+import time
+
+from ai_powerhouse.config import Config
+from ai_powerhouse.core import AIPowerhouse
+from ai_powerhouse.interaction_log import InteractionLog
+from ai_powerhouse.response import AIResponse
+
+from tests.conftest import FakeProvider
+
+
+async def test_calls_are_logged_and_searchable(tmp_path):
+    """Test that provider calls land in the JSONL log and the full-text index"""
+    ai = AIPowerhouse(Config(interaction_log=str(tmp_path / "interactions.jsonl")))
+    provider = ai.providers["claude"] = FakeProvider("claude", reply="Use functools.lru_cache for memoization")
+    
+    await ai.ask_provider("claude", "How do I cache a function in Python?", system="Be brief")
+    provider.reply = "Consistency, availability, partition tolerance"
+    await ai.ask_provider("claude", "Explain CAP theorem")
+    ai.interaction_log.flush()
+    
+    lines = (tmp_path / "interactions.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["prompt"] for line in lines] == [
+        "How do I cache a function in Python?", "Explain CAP theorem"
+    ]
+    assert json.loads(lines[0])["system"] == "Be brief"
+    
+    matches = ai.search_history("lru_cache memoization")
+    assert [m["prompt"] for m in matches] == ["How do I cache a function in Python?"]
+    assert ai.search_history("theorem", provider_name="gemini") == []
+    assert ai.search_history("") == [] and ai.search_history("   ") == []
+    
+    logged = ai.recall("How do I cache a function in Python?", "claude", system="Be brief")
+    assert logged.text == "Use functools.lru_cache for memoization"
+    assert ai.recall("How do I cache a function in Python?", "claude") is None
+    ai.interaction_log.close()
+
+
+def test_log_rotates_by_size(tmp_path):
+    """Test that the JSONL file is rotated once it exceeds max_bytes"""
+    log = InteractionLog(str(tmp_path / "log.jsonl"), max_bytes=500, backups=2, index=False)
+    for i in range(20):
+        log.record("claude", f"prompt {i} " + "x" * 100, AIResponse(text="ok"))
+        log.flush()
+    log.close()
+    
+    assert (tmp_path / "log.jsonl.1").exists() and (tmp_path / "log.jsonl.2").exists()
+    assert not (tmp_path / "log.jsonl.3").exists()
+    assert log.errors == 0
+
+
+def test_writer_survives_unexpected_errors_and_flush_times_out(tmp_path, monkeypatch):
+    """Test that any write error is counted without killing the writer, and flush can give up"""
+    log = InteractionLog(str(tmp_path / "log.jsonl"), flush_interval=0.01)
+    write = log._write
+    calls = []
+    
+    def flaky_write(entries, connection):
+        calls.append(len(entries))
+        if len(calls) == 1:
+            raise ValueError("unexpected")
+        if len(calls) == 3:
+            time.sleep(0.5)
+        write(entries, connection)
+    
+    monkeypatch.setattr(log, "_write", flaky_write)
+    log.record("claude", "lost", AIResponse(text="ok"))
+    assert log.flush(timeout=5)
+    log.record("claude", "kept", AIResponse(text="ok"))
+    assert log.flush(timeout=5)
+    
+    log.record("claude", "slow", AIResponse(text="ok"))
+    assert not log.flush(timeout=0.05)
+    assert log.flush(timeout=5)
+    log.close()
+    
+    assert log.errors == 1
+    assert [m["prompt"] for m in log.search("kept")] == ["kept"]
+    assert [m["prompt"] for m in log.search("slow")] == ["slow"]
+    assert log.search("lost") == []
@@ -0,0 +1,72 @@
+"""
+Tests for API key pools
+"""
+
+import asyncio
+
+from ai_powerhouse.config import Config
+from ai_powerhouse.core import AIPowerhouse
+from ai_powerhouse.keypool import PooledProvider
+from ai_powerhouse.response import AIResponse
+
+from tests.conftest import FakeProvider
+
+
+class KeyedProvider(FakeProvider):
+    """Fake provider standing in for one API key"""
+    
+    async def generate_response(self, prompt: str, **kwargs) -> AIResponse:
+        if self.reply == "revoked":
+            self.prompts.append(prompt)
+            return AIResponse.failure("Error code: 401 - invalid x-api-key",
+                                      provider=self.provider_name, error_type="AuthenticationError")
+        return await super().generate_response(prompt, **kwargs)
+
+
+async def test_requests_spread_over_least_loaded_keys():
+    keys = [FakeProvider(f"key{i}", reply=f"key{i}", delay=0.02) for i in range(3)]
+    pool = PooledProvider(keys)
+    
+    responses = await asyncio.gather(*(pool.generate_response(f"q{i}") for i in range(6)))
+    
+    assert sorted(str(r) for r in responses) == ["key0", "key0", "key1", "key1", "key2", "key2"]
+    assert [slot.requests for slot in pool.slots] == [2, 2, 2]
+
+
+async def test_failing_key_is_rotated_out():
+    bad, good = KeyedProvider("bad", reply="revoked"), KeyedProvider("good", reply="fine")
+    pool = PooledProvider([bad, good])
+    
+    first = await pool.generate_response("one")
+    second = await pool.generate_response("two")
+    
+    assert str(first) == "fine" and str(second) == "fine"
+    assert len(bad.prompts) == 1 and len(good.prompts) == 2
+    assert pool.slots[0].failures == 1
+
+
+async def test_rpm_budget_exhausts_pool():
+    pool = PooledProvider([FakeProvider("only")], rpm_per_key=1, max_wait=0.1)
+    
+    assert (await pool.generate_response("one")).ok
+    second = await pool.generate_response("two")
+    assert second.error_type == "KeyPoolExhausted"
+
+
+async def test_streaming_fails_over_to_another_key():
+    bad, good = KeyedProvider("bad", reply="revoked"), KeyedProvider("good", reply="fine")
+    pool = PooledProvider([bad, good])
+    pieces = []
+    
+    response = await pool.generate_stream("one", pieces.append)
+    
+    assert str(response) == "fine" and pieces == ["fine"]
+    assert pool.slots[0].failures == 1
+
+
+def test_multiple_keys_create_a_pool():
+    ai = AIPowerhouse(Config(anthropic_api_key="k1", anthropic_api_keys=["k1", "k2", "k3"]))
+    
+    pool = ai.providers["claude"]
+    assert isinstance(pool, PooledProvider)
+    assert [slot.provider.api_key for slot in pool.slots] == ["k1", "k2", "k3"]
@@ -0,0 +1,104 @@
+"""
+Tests for code-context minification
+"""
+
+from ai_powerhouse.agents import Agent
+from ai_powerhouse.minify import minify_source, skip_reason
+
+from tests.conftest import FakeProvider
+
+
+SOURCE = "\n".join([
+    "#!/usr/bin/env python",
+    "# Copyright (c) 2024 Example Corp.",
+    "# Licensed under the MIT License.",
+    "",
+    "import os",
+    "",
+    "",
+    "",
+    "# One",
+    "# long",
+    "# comment",
+    "# block",
+    "def f(x):",
+    "    s = '# not a comment'",
+    "    return x + 1  # kept",
+    "",
+    "TABLE = [",
+] + [f"    {i}, {i * 2}," for i in range(30)] + [
+    "]",
+    "print(f(os.sep))",
+])
+
+
+def test_minify_elides_noise_and_maps_lines():
+    """Test that headers, comment runs, blank runs and data are elided with a line map"""
+    result = minify_source(SOURCE, "pkg/module.py")
+    lines = result.text.splitlines()
+    
+    assert "Copyright" not in result.text and "# long" not in result.text
+    assert "# [lines 2-4 elided: license header]" in lines
+    assert "    s = '# not a comment'" in lines and "    return x + 1  # kept" in lines
+    assert any("elided: data" in line for line in lines)
+    assert "" not in lines[lines.index("import os") + 2:lines.index("def f(x):")]
+    
+    def_line = lines.index("def f(x):") + 1
+    assert result.original_line(def_line) == 13
+    assert result.remap(f"Bug on line {def_line}") == "Bug on line 13"
+    assert result.remap(f"See module.py:{def_line} and #L{def_line}") == "See module.py:13 and #L13"
+    assert result.remap(f"other.py:{def_line} fits in L2 cache") == f"other.py:{def_line} fits in L2 cache"
+    assert result.original_line(len(lines)) == SOURCE.count("\n") + 1
+    assert result.tokens_saved > 0 and result.tokens < result.original_tokens
+
+
+def test_block_comments_and_whole_file_skips():
+    """Test C-style block comments and lockfile/vendored placeholders"""
+    source = "/*\n * Copyright 2020\n */\nconst a = 1; /* short */\n/**\n * a\n * b\n * c\n */\nfunction b() {}\n"
+    result = minify_source(source, "src/app.js")
+    
+    assert result.text == (
+        "// [lines 1-3 elided: license header]\nconst a = 1; /* short */\n"
+        "// [lines 5-9 elided: comments]\nfunction b() {}"
+    )
+    assert skip_reason("package-lock.json") == "lockfile"
+    assert skip_reason("third_party/lib/x.c") == "vendored file"
+    assert skip_reason("src/app.js") is None
+    assert minify_source("{}", "web/package-lock.json").text.startswith("[lockfile elided")
+
+
+async def test_repository_analysis_reports_savings(make_ai, tmp_path):
+    """Test that repository analysis sends minified files and totals the savings"""
+    from ai_powerhouse.repo_analysis import RepositoryAnalyzer
+    
+    (tmp_path / "module.py").write_text(SOURCE)
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "vendor" / "lib.py").write_text("x = 1\n")
+    provider = FakeProvider("claude")
+    analyzer = RepositoryAnalyzer(make_ai(provider))
+    
+    report = await analyzer.analyze(str(tmp_path))
+    
+    assert list(report.files) == ["module.py"]
+    assert report.tokens_saved > 0
+    assert [p.name for p in RepositoryAnalyzer(make_ai(provider), minify=False).discover(tmp_path)] == ["module.py"]
+    assert "Copyright" not in provider.prompts[0]
+
+
+async def test_findings_on_minified_files_cite_original_lines(make_ai, tmp_path):
+    """Test that agent and repository findings report line numbers of the original file"""
+    from ai_powerhouse.repo_analysis import RepositoryAnalyzer
+    
+    source = tmp_path / "module.py"
+    source.write_text(SOURCE)
+    def_line = minify_source(SOURCE, str(source)).text.splitlines().index("def f(x):") + 1
+    provider = FakeProvider("claude", reply=f"Off-by-one on line {def_line}")
+    ai = make_ai(provider)
+    
+    response = await Agent("code-review", "Review code").run(ai, file_path=str(source), provider="claude")
+    report = await RepositoryAnalyzer(ai).analyze(str(tmp_path))
+    
+    assert def_line != 13
+    assert response.text == "Off-by-one on line 13"
+    assert report.files["module.py"].results["claude"] == "Off-by-one on line 13"
+
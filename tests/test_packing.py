@@ -0,0 +1,97 @@
+"""
+Tests for micro-batching of short prompts
+"""
+
+import asyncio
+import re
+
+from ai_powerhouse.packing import pack_prompts, unpack_reply
+from ai_powerhouse.response import AIResponse
+
+from tests.conftest import FakeProvider
+
+
+class EchoProvider(FakeProvider):
+    """Answers every packed slot with its upper-cased prompt, except skipped ones"""
+    
+    def __init__(self, skip=(), **kwargs):
+        super().__init__(**kwargs)
+        self.skip = set(skip)
+    
+    async def generate_response(self, prompt: str, **kwargs) -> AIResponse:
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        slots = re.findall(r"^<<<(\d+)>>>\n(.*)$", prompt, re.MULTILINE)
+        if not slots:
+            return AIResponse(text=prompt.upper(), provider="Echo", input_tokens=1, output_tokens=1)
+        text = "\n".join(
+            f"<<<{n}>>>\n{body.upper()}" for n, body in slots if body not in self.skip
+        )
+        return AIResponse(text=text, provider="Echo", input_tokens=40, output_tokens=20)
+
+
+class TruncatingProvider(EchoProvider):
+    """Cuts packed replies off half-way through the last answer, as a token limit would"""
+    
+    async def generate_response(self, prompt: str, **kwargs) -> AIResponse:
+        response = await super().generate_response(prompt, **kwargs)
+        if "<<<" in response.text:
+            response.text = response.text[:-3]
+            response.finish_reason = "length"
+        return response
+
+
+def test_unpack_reply_marks_missing_slots():
+    """Test that slots missing or empty in a packed reply come back as None"""
+    reply = "<<<2>>>\nsecond\n<<<1>>>\nfirst\n<<<3>>>\n\n"
+    assert unpack_reply(reply, 4) == ["first", "second", None, None]
+    assert "<<<2>>>\nb" in pack_prompts(["a", "b"])
+
+
+async def test_ask_packed_batches_and_retries_unparsed_slots(make_ai):
+    """Test that short prompts share one request and dropped slots are retried alone"""
+    provider = EchoProvider(name="echo", skip={"beta"})
+    ai = make_ai(provider)
+    ai.config.pack_window = 0.05
+    
+    prompts = ["alpha", "beta", "gamma", "x" * 600]
+    responses = await asyncio.gather(*(ai.ask_packed(p, "echo") for p in prompts))
+    
+    assert [str(r) for r in responses] == [p.upper() for p in prompts]
+    packer = ai._packers["echo"]
+    # One packed request, one retry for the dropped slot, one long prompt sent alone
+    assert len(provider.prompts) == 3
+    assert packer.prompts_packed == 2
+    assert packer.slots_retried == 1
+    assert responses[0].output_tokens is not None
+
+
+async def test_cancelled_caller_does_not_block_its_batch(make_ai):
+    """Test that cancelling one packed caller still answers the others in its batch"""
+    provider = EchoProvider(name="echo", delay=0.02)
+    ai = make_ai(provider)
+    ai.config.pack_window = 0.01
+    
+    cancelled = asyncio.ensure_future(ai.ask_packed("alpha", "echo"))
+    others = [asyncio.ensure_future(ai.ask_packed(p, "echo")) for p in ("beta", "gamma")]
+    await asyncio.sleep(0.02)
+    cancelled.cancel()
+    
+    responses = await asyncio.wait_for(asyncio.gather(*others), 1)
+    assert [str(r) for r in responses] == ["BETA", "GAMMA"]
+    assert len(provider.prompts) == 1
+
+
+async def test_truncated_packed_reply_retries_its_last_slot(make_ai):
+    """Test that the slot cut off by the token limit is sent again on its own"""
+    provider = TruncatingProvider(name="echo")
+    ai = make_ai(provider)
+    ai.config.pack_window = 0.05
+    
+    responses = await asyncio.gather(*(ai.ask_packed(p, "echo") for p in ("alpha", "beta", "gamma")))
+    
+    assert [str(r) for r in responses] == ["ALPHA", "BETA", "GAMMA"]
+    assert provider.prompts[1:] == ["gamma"]
+    assert responses[0].finish_reason is None
+    assert ai._packers["echo"].slots_retried == 1
+
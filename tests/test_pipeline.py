@@ -0,0 +1,65 @@
+"""
+Tests for the agent pipeline executor
+"""
+
+import time
+
+import pytest
+
+from ai_powerhouse.agents import AgentRegistry
+from ai_powerhouse.pipeline import AgentPipeline, PipelineNode
+from tests.conftest import FakeProvider
+
+
+@pytest.fixture
+def registry(tmp_path):
+    prompts = tmp_path / "prompts"
+    prompts.mkdir()
+    for name in ["security", "code-review", "performance", "electronics", "testing", "documentation"]:
+        (prompts / f"{name}-agent.txt").write_text(f"You are the {name} agent.")
+    return AgentRegistry(str(prompts))
+
+
+async def test_default_pipeline_runs_on_critical_path(make_ai, registry, tmp_path):
+    """Test that independent agents overlap and dependents see upstream output"""
+    source = tmp_path / "module.py"
+    source.write_text("def f():\n    return 1\n")
+    provider = FakeProvider("claude", reply="finding", delay=0.1)
+    pipeline = AgentPipeline.default(ai=make_ai(provider), registry=registry)
+    
+    start = time.perf_counter()
+    result = await pipeline.run(str(source))
+    elapsed = time.perf_counter() - start
+    
+    assert set(result.responses) == {"security", "review", "performance", "electronics", "testing", "docs"}
+    assert result.ok
+    assert elapsed < 0.35  # two levels deep, not six agents in sequence
+    testing_prompt = next(p for p in provider.prompts if "Generate tests" in p)
+    assert "## review agent\nfinding" in testing_prompt
+
+
+def test_cycles_and_unknown_dependencies_are_rejected(make_ai, registry):
+    """Test graph validation"""
+    with pytest.raises(ValueError, match="cycle"):
+        AgentPipeline(
+            [PipelineNode("security", depends_on=["review"]), PipelineNode("review", depends_on=["security"])],
+            ai=make_ai(), registry=registry
+        )
+    with pytest.raises(ValueError, match="unknown"):
+        AgentPipeline([PipelineNode("testing", depends_on=["review"])], ai=make_ai(), registry=registry)
+
+
+async def test_pipeline_maps_lines_back_unless_raw(make_ai, registry, tmp_path):
+    """Test that findings cite original lines, and minify=False sends the file verbatim"""
+    source = tmp_path / "module.py"
+    source.write_text("# Copyright 2024 Example\n# Licensed under MIT\n\ndef f():\n    return 1\n")
+    provider = FakeProvider("claude", reply="Bug on line 2")
+    
+    minified = await AgentPipeline([PipelineNode("review")], ai=make_ai(provider), registry=registry).run(str(source))
+    raw = await AgentPipeline([PipelineNode("review")], ai=make_ai(provider), registry=registry,
+                              minify=False).run(str(source))
+    
+    assert str(minified.responses["review"]) == "Bug on line 4"
+    assert "Copyright" not in provider.prompts[0] and "Copyright" in provider.prompts[1]
+    assert str(raw.responses["review"]) == "Bug on line 2" and raw.context is None
+
@@ -0,0 +1,76 @@
+"""
+Tests for the per-stage profiling hooks
+"""
+
+import pytest
+
+from ai_powerhouse import profiling
+from tests.conftest import FakeProvider
+
+
+@pytest.fixture
+def profiler():
+    profiler = profiling.enable()
+    yield profiler
+    profiling.disable()
+
+
+def test_stage_is_a_shared_no_op_when_disabled():
+    """Test that disabled stages allocate nothing and record nothing"""
+    assert profiling.active() is None
+    assert profiling.stage("a") is profiling.stage("b", "label")
+    with profiling.stage("a"):
+        pass
+
+
+def test_nested_stages_report_total_and_self_time(profiler, tmp_path):
+    """Test that stages nest into paths listed depth-first with self time"""
+    with profiling.stage("outer"):
+        with profiling.stage("inner", "x"):
+            pass
+        with profiling.stage("inner", "x"):
+            pass
+    profiler.add("imports", 0.5)
+    
+    rows = {tuple(row["path"]): row for row in profiler.report()}
+    
+    assert list(rows) == [("outer",), ("outer", "inner:x"), ("imports",)]
+    assert rows[("outer", "inner:x")]["calls"] == 2
+    outer = rows[("outer",)]
+    assert outer["self"] == pytest.approx(outer["total"] - rows[("outer", "inner:x")]["total"])
+    
+    output = tmp_path / "stages.folded"
+    profiler.dump(str(output))
+    assert "imports 500000\n" in output.read_text()
+
+
+async def test_concurrent_provider_calls_nest_per_task(profiler, make_ai):
+    """Test that each provider call is timed under the stage that started it"""
+    ai = make_ai(FakeProvider("one", delay=0.01), FakeProvider("two", delay=0.01))
+    
+    with profiling.stage("command"):
+        await ai.ask("hi")
+    
+    paths = [tuple(row["path"]) for row in profiler.report()]
+    assert ("command", "generate:one") in paths
+    assert ("command", "generate:two") in paths
+
+
+def test_profiled_decorator_and_cprofile_dump(tmp_path):
+    """Test the decorator stage and that cProfile stats are only dumped when enabled"""
+    @profiling.profiled("work")
+    def work():
+        return 42
+    
+    assert work() == 42
+    profiler = profiling.enable(cprofile=True)
+    try:
+        assert work() == 42
+    finally:
+        profiling.disable()
+    
+    assert [row["stage"] for row in profiler.report()] == ["work"]
+    profiler.dump(str(tmp_path / "run.prof"))
+    assert (tmp_path / "run.prof").stat().st_size > 0
+    with pytest.raises(RuntimeError):
+        profiling.Profiler().dump(str(tmp_path / "other.prof"))
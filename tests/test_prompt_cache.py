@@ -0,0 +1,70 @@
+"""
+Tests for the near-duplicate prompt cache
+"""
+
+from ai_powerhouse.prompt_cache import PromptCache, normalize_prompt
+from ai_powerhouse.response import AIResponse
+
+from tests.conftest import FakeProvider
+
+
+PROMPT = (
+    "Summarize the following incident report for the on-call channel: the payment "
+    "service returned errors for checkout requests after the deploy at 2024-05-01 10:32, "
+    "error rates went back to normal after the rollback"
+)
+
+
+def test_normalization_masks_volatile_parts():
+    assert normalize_prompt("Run  at 2024-05-01T10:32:00Z ") == normalize_prompt("run at 2025-01-02T08:00:00Z")
+    assert normalize_prompt("id 123e4567-e89b-12d3-a456-426614174000") == "id <v>"
+
+
+def test_similar_prompts_hit_and_unrelated_miss():
+    """Test that near duplicates hit above the threshold and scopes stay separate"""
+    cache = PromptCache()
+    cache.put(PROMPT, AIResponse(text="summary"), scope="claude")
+    
+    reworded = PROMPT.replace("after the rollback", "once the rollback finished") + "."
+    assert cache.get(" ".join(PROMPT.upper().split()), "claude", threshold=1.0).text == "summary"
+    assert cache.get(PROMPT.replace("10:32", "11:05"), "claude").text == "summary"
+    assert cache.get(reworded, "claude", threshold=0.6).text == "summary"
+    assert cache.get(reworded, "claude", threshold=0.99) is None
+    assert cache.get(PROMPT, "gemini") is None
+    assert cache.get("Write a haiku about autumn leaves falling", "claude", threshold=0.3) is None
+    assert cache.stats()["exact_hits"] == 1 and cache.stats()["similar_hits"] == 2
+
+
+def test_exact_threshold_does_not_ignore_dates():
+    """Test that threshold=1.0 does not return the answer for a different date"""
+    cache = PromptCache()
+    cache.put("Summarize incidents on 2026-09-01", AIResponse(text="September"))
+    
+    assert cache.get("Summarize incidents on 2026-10-01", threshold=1.0) is None
+    assert cache.get("summarize incidents  on 2026-09-01", threshold=1.0).text == "September"
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PromptCache(max_entries=2)
+    for name in ("first prompt text", "second prompt text", "third prompt text"):
+        cache.put(name, AIResponse(text=name))
+    
+    assert len(cache) == 2
+    assert cache.get("first prompt text", threshold=1.0) is None
+    assert all(key in cache.entries for bucket in cache.buckets.values() for key in bucket)
+
+
+async def test_ask_uses_cache_only_when_opted_in(make_ai):
+    """Test that ask skips providers with a cached near-duplicate answer"""
+    provider = FakeProvider("claude", reply="summary")
+    ai = make_ai(provider)
+    
+    await ai.ask(PROMPT, ["claude"], cache_similarity=0.8)
+    responses = await ai.ask(PROMPT.replace("2024-05-01 10:32", "2024-06-11 09:15"), ["claude"],
+                             cache_similarity=0.8)
+    assert responses["claude"].text == "summary" and responses["claude"].latency == 0.0
+    assert len(provider.prompts) == 1
+    
+    await ai.ask(PROMPT, ["claude"])
+    await ai.ask(PROMPT, ["claude"], cache_similarity=0.8, temperature=0.0)
+    assert len(provider.prompts) == 3
@@ -0,0 +1,55 @@
+"""
+Tests for the provider registry and lazy provider creation
+"""
+
+from ai_powerhouse.config import Config
+from ai_powerhouse.core import AIPowerhouse
+from ai_powerhouse.providers import registry
+from ai_powerhouse.providers.registry import ProviderSpec
+
+from tests.conftest import FakeProvider
+
+
+class PluginProvider(FakeProvider):
+    """Provider shipped by a hypothetical third-party package"""
+    
+    def __init__(self, api_key: str, model: str):
+        super().__init__(name="plugin", reply=f"{model} via {api_key}")
+
+
+PLUGIN = ProviderSpec(
+    "plugin", "tests.test_registry:PluginProvider",
+    api_key_env="PLUGIN_API_KEY", model_env="PLUGIN_MODEL", default_model="plugin-small"
+)
+
+
+class FakeEntryPoint:
+    name = "plugin"
+    
+    def load(self):
+        return PLUGIN
+
+
+def test_builtin_providers_are_created_on_first_use():
+    """Test that configured providers are registered but not instantiated up front"""
+    ai = AIPowerhouse(Config(anthropic_api_key="test-key"))
+    
+    assert ai.get_available_providers() == ["claude"]
+    assert not ai.providers.is_loaded("claude")
+    assert ai.providers["claude"].model == "claude-3-sonnet-20240229"
+    assert ai.providers.is_loaded("claude")
+
+
+async def test_entry_point_providers_are_discovered(monkeypatch):
+    """Test that providers from entry points are configured from the environment"""
+    monkeypatch.setattr(registry, "_entry_points", lambda: [FakeEntryPoint()])
+    registry.provider_specs.cache_clear()
+    monkeypatch.setenv("PLUGIN_API_KEY", "secret")
+    try:
+        ai = AIPowerhouse(Config())
+        assert "plugin" in ai.providers and not ai.providers.is_loaded("plugin")
+        response = await ai.ask_provider("plugin", "hello")
+    finally:
+        registry.provider_specs.cache_clear()
+    
+    assert str(response) == "plugin-small via secret"
@@ -0,0 +1,43 @@
+"""
+Tests for incremental repository analysis
+"""
+
+from ai_powerhouse.repo_analysis import RepositoryAnalyzer
+from tests.conftest import FakeProvider
+
+
+async def test_unchanged_files_reuse_manifest(make_ai, tmp_path):
+    """Test that a second run only analyses changed files"""
+    provider = FakeProvider("fake", reply="looks fine")
+    ai = make_ai(provider)
+    (tmp_path / "a.py").write_text("print('a')\n")
+    (tmp_path / "b.py").write_text("print('b')\n")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.js").write_text("module.exports = 1\n")
+    analyzer = RepositoryAnalyzer(ai, concurrency=2)
+    
+    first = await analyzer.analyze(str(tmp_path))
+    assert (first.analyzed, first.reused) == (2, 0)
+    assert first.files["a.py"].results == {"fake": "looks fine"}
+    
+    (tmp_path / "b.py").write_text("print('changed')\n")
+    (tmp_path / "c.py").write_text("print('a')\n")
+    second = await analyzer.analyze(str(tmp_path))
+    
+    assert (second.analyzed, second.reused) == (1, 2)
+    assert second.files["c.py"].cached
+    assert len(provider.prompts) == 3
+
+
+async def test_failures_are_not_cached(make_ai, tmp_path):
+    """Test that failed analyses are retried on the next run"""
+    provider = FakeProvider("fake", reply=RuntimeError("quota"))
+    ai = make_ai(provider)
+    (tmp_path / "a.py").write_text("x = 1\n")
+    analyzer = RepositoryAnalyzer(ai)
+    
+    first = await analyzer.analyze(str(tmp_path))
+    second = await analyzer.analyze(str(tmp_path))
+    
+    assert first.failed == 1 and second.failed == 1
+    assert len(provider.prompts) == 2
@@ -0,0 +1,49 @@
+"""
+Tests for structured provider responses
+"""
+
+from ai_powerhouse.response import AIResponse
+
+
+def test_response_behaves_like_text():
+    """Test the string compatibility shim"""
+    response = AIResponse(text="Hello, World!", provider="Claude", model="claude-3")
+    
+    assert response == "Hello, World!"
+    assert str(response) == "Hello, World!"
+    assert len(response) == 13
+    assert response[:5] == "Hello"
+    assert "World" in response
+    assert response.upper() == "HELLO, WORLD!"
+    assert response + "?" == "Hello, World!?"
+
+
+def test_failure_keeps_error_out_of_text():
+    """Test that failures are distinguishable from answers"""
+    response = AIResponse.failure(ValueError("bad key"), provider="OpenAI")
+    
+    assert not response.ok
+    assert response.text == ""
+    assert response.error_type == "ValueError"
+    assert str(response) == "Error: bad key"
+
+
+def test_usage_totals_and_slots():
+    """Test usage accounting and the compact slot layout"""
+    response = AIResponse(text="hi", input_tokens=10, output_tokens=5)
+    
+    assert response.total_tokens == 15
+    assert AIResponse(text="hi").total_tokens is None
+    assert not hasattr(response, "__dict__")
+    assert response.to_dict()["input_tokens"] == 10
+
+
+def test_combine_failed_samples_keeps_first_error():
+    """Test merging samples when every call failed"""
+    failures = [AIResponse.failure("quota", provider="Claude"), AIResponse.failure("later")]
+    
+    combined = AIResponse.combine(failures)
+    
+    assert combined is failures[0]
+    assert AIResponse(text="x").candidates == ["x"]
+    assert combined.candidates == []
@@ -0,0 +1,120 @@
+"""
+Tests for the priority-aware request scheduler
+"""
+
+import asyncio
+
+import pytest
+
+from ai_powerhouse.config import Config
+from ai_powerhouse.core import AIPowerhouse
+from ai_powerhouse.scheduler import BATCH, INTERACTIVE, Scheduler, SchedulerFull, request_class
+
+from tests.conftest import FakeProvider
+
+
+def scheduled_ai(provider: FakeProvider, **settings) -> AIPowerhouse:
+    ai = AIPowerhouse(Config(**{"scheduler_concurrency": 2, **settings}))
+    ai.providers[provider.name] = provider
+    return ai
+
+
+async def test_interactive_requests_skip_the_batch_backlog():
+    """Test that a reserved slot keeps interactive latency flat under a batch flood"""
+    provider = FakeProvider("claude", delay=0.05)
+    ai = scheduled_ai(provider)
+    
+    batch = [asyncio.ensure_future(ai.ask_provider("claude", f"bulk {i}", priority=BATCH)) for i in range(8)]
+    await asyncio.sleep(0.01)
+    response = await ai.ask_provider("claude", "interactive", priority=INTERACTIVE)
+    
+    assert response.ok
+    assert sum(task.done() for task in batch) <= 1
+    await asyncio.gather(*batch)
+    stats = ai.scheduler_report()["claude"]["classes"]
+    assert stats[INTERACTIVE]["max_wait"] < 0.01
+    assert stats[BATCH]["completed"] == 8
+
+
+async def test_tenants_share_by_weight():
+    """Test that a tenant with twice the weight is served twice as often while both wait"""
+    scheduler = Scheduler(1, reserved=0, weights={"big": 2})
+    blocker = await scheduler.acquire()
+    order = []
+    
+    async def request(tenant):
+        async with scheduler.slot(tenant=tenant):
+            order.append(tenant)
+    
+    tasks = [asyncio.ensure_future(request(tenant)) for tenant in ["small"] * 6 + ["big"] * 6]
+    await asyncio.sleep(0)
+    scheduler.release(blocker)
+    await asyncio.gather(*tasks)
+    
+    assert order[:6].count("big") == 4
+    assert scheduler.in_flight == 0
+
+
+async def test_full_queue_rejects_with_scheduler_full():
+    provider = FakeProvider("claude", delay=0.05)
+    ai = scheduled_ai(provider, scheduler_reserved=0, scheduler_max_queue=1)
+    
+    with request_class(BATCH, tenant="nightly"):
+        responses = await asyncio.gather(*(ai.ask_provider("claude", f"q{i}") for i in range(4)))
+    
+    assert [response.ok for response in responses] == [True, True, True, False]
+    assert responses[-1].error_type == "SchedulerFull"
+    assert ai.scheduler_report()["claude"]["classes"][BATCH]["rejected"] == 1
+
+
+async def test_cancelled_waiters_leave_the_queue():
+    scheduler = Scheduler(1, reserved=0, max_queue=1)
+    blocker = await scheduler.acquire()
+    waiter = asyncio.ensure_future(scheduler.acquire())
+    await asyncio.sleep(0)
+    
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert scheduler.stats["normal"].queued == 0
+    
+    scheduler.release(blocker)
+    ticket = await asyncio.wait_for(scheduler.acquire(), 1)
+    assert scheduler.in_flight == 1
+    scheduler.release(ticket)
+
+
+async def test_costly_requests_hold_one_slot_per_unit():
+    """Test that a request with cost 2 waits until two slots are free"""
+    scheduler = Scheduler(3, reserved=0)
+    first = await scheduler.acquire(cost=2)
+    second = asyncio.ensure_future(scheduler.acquire(cost=2))
+    await asyncio.sleep(0)
+    
+    assert not second.done() and scheduler.in_flight == 2
+    scheduler.release(first)
+    ticket = await asyncio.wait_for(second, 1)
+    assert scheduler.in_flight == 2
+    scheduler.release(ticket)
+    assert scheduler.in_flight == 0
+    
+    # A cost above the limit is capped so the request can still start
+    ticket = await asyncio.wait_for(scheduler.acquire(cost=10), 1)
+    assert scheduler.in_flight == 3
+    scheduler.release(ticket)
+
+
+async def test_n_candidates_take_n_slots():
+    """Test that a call sampling n candidates holds n slots while it runs"""
+    provider = FakeProvider("claude", delay=0.05)
+    ai = scheduled_ai(provider, scheduler_concurrency=4)
+    
+    sampling = asyncio.ensure_future(ai.ask_provider("claude", "pick one", n=3))
+    await asyncio.sleep(0.01)
+    assert ai.scheduler("claude").in_flight == 3
+    waiting = asyncio.ensure_future(ai.ask_provider("claude", "next"))
+    await asyncio.sleep(0.01)
+    
+    assert provider.prompts == ["pick one"]
+    await asyncio.gather(sampling, waiting)
+    assert provider.prompts == ["pick one", "next"]
@@ -0,0 +1,91 @@
+"""
+Tests for multi-turn sessions with compacted history
+"""
+
+import asyncio
+
+import pytest
+
+from ai_powerhouse.session import SUMMARY_HEADER, estimate_tokens
+
+from tests.conftest import FakeProvider
+
+
+async def test_session_sends_history_and_system(make_ai):
+    """Test that earlier turns are sent as messages before the new prompt"""
+    provider = FakeProvider("claude", reply="A generator yields values lazily.")
+    chat = make_ai(provider).session("claude", system="Be brief")
+    
+    await chat.ask("What is a generator?")
+    await chat.ask("Show me one")
+    
+    assert provider.options[0]["history"] == []
+    assert provider.options[1]["history"] == [
+        {"role": "user", "content": "What is a generator?"},
+        {"role": "assistant", "content": "A generator yields values lazily."},
+    ]
+    assert provider.options[1]["system"] == "Be brief"
+
+
+async def test_session_compacts_old_turns_within_budget(make_ai):
+    """Test that history stays bounded and the prefix only changes on compaction"""
+    provider = FakeProvider("claude", reply="Here is a fairly long answer. " * 10)
+    chat = make_ai(provider).session("claude", system="Be brief", token_budget=400)
+    
+    for i in range(30):
+        await chat.ask(f"Question number {i}? Please explain in detail.")
+        assert chat.tokens <= 400
+    
+    sizes = [sum(estimate_tokens(m["content"]) for m in options["history"]) for options in provider.options]
+    assert max(sizes[10:]) <= 400
+    assert chat.summarized_turns > 0 and chat.turns
+    assert SUMMARY_HEADER in provider.options[-1]["system"]
+    prefixes = [options["system"] for options in provider.options]
+    assert len(set(prefixes)) <= chat.compactions + 1
+    assert "Question number 29?" in provider.prompts[-1]
+    
+    chat.reset()
+    assert chat.to_dict()["compactions"] == 0 and chat.summarized_turns == 0
+
+
+async def test_recent_turns_are_never_folded(make_ai):
+    """Test that the latest turns stay verbatim even when they alone exceed the budget"""
+    provider = FakeProvider("claude", reply="A long and detailed answer. " * 20)
+    chat = make_ai(provider).session("claude", token_budget=50)
+    
+    for i in range(5):
+        await chat.ask(f"Question {i}")
+        assert 1 <= len(chat.turns) <= chat.keep_turns
+    
+    await chat.ask("Follow-up")
+    assert provider.options[-1]["history"][-2:] == chat.turns[-2].to_messages()
+    assert chat.turns[-1].prompt == "Follow-up"
+    assert chat.summarized_turns == 4
+
+
+async def test_failed_turns_are_not_remembered(make_ai):
+    """Test that failed answers do not enter the history"""
+    chat = make_ai(FakeProvider("claude")).session("missing")
+    
+    response = await chat.ask("hello")
+    
+    assert not response.ok
+    assert chat.turns == [] and chat.tokens == 0
+
+
+async def test_session_streams_and_survives_cancellation(make_ai):
+    """Test that a cancelled answer leaves the session usable and out of the history"""
+    provider = FakeProvider("claude", reply="Streamed reply", delay=0.05)
+    chat = make_ai(provider).session("claude")
+    pieces = []
+    
+    task = asyncio.ensure_future(chat.ask("Slow question", on_text=pieces.append))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert chat.turns == [] and pieces == []
+    
+    response = await chat.ask("Next question", on_text=pieces.append)
+    assert response.ok and pieces == ["Streamed reply"]
+    assert [turn.prompt for turn in chat.turns] == ["Next question"]
@@ -0,0 +1,85 @@
+"""
+Tests for shadow traffic to candidate providers
+"""
+
+import asyncio
+
+from ai_powerhouse.config import Config
+from ai_powerhouse.core import AIPowerhouse
+from ai_powerhouse.response import AIResponse
+from ai_powerhouse.scheduler import BATCH, INTERACTIVE
+
+from tests.conftest import FakeProvider
+
+
+async def test_shadow_never_delays_primary(make_ai):
+    """Test that the primary answer returns before a slow shadow call finishes"""
+    primary = FakeProvider("claude", reply="Paris is the capital of France.", delay=0.01)
+    candidate = FakeProvider("local", reply="Paris is the capital of France.", delay=0.2)
+    ai = make_ai(primary, candidate)
+    ai.enable_shadow("claude", "local:llama-3", sample_rate=1.0)
+    
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    response = await ai.ask_provider("claude", "Capital of France?", temperature=0.1)
+    
+    assert response.text == "Paris is the capital of France."
+    assert loop.time() - start < 0.15
+    assert ai.shadow_report()["claude"]["pairs"] == 0
+    
+    await ai.drain_shadow()
+    report = ai.shadow_report()["claude"]
+    assert report["pairs"] == 1 and report["candidate"] == "local:llama-3"
+    assert report["similarity_mean"] == 1.0
+    assert candidate.options[0]["model"] == "llama-3"
+    assert candidate.options[0]["temperature"] == 0.1
+
+
+async def test_shadow_cap_drops_instead_of_queueing(make_ai):
+    """Test that shadow calls beyond the cap are dropped and sampling applies"""
+    candidate = FakeProvider("local", delay=0.05)
+    ai = make_ai(FakeProvider("claude"), candidate)
+    ai.enable_shadow("claude", "local", sample_rate=1.0, max_concurrency=2)
+    
+    await asyncio.gather(*(ai.ask_provider("claude", f"q{i}") for i in range(5)))
+    await ai.drain_shadow()
+    
+    report = ai.shadow_report()["claude"]
+    assert report["mirrored"] == 2 and report["dropped"] == 3
+    assert report["pairs"] == 2 and len(candidate.prompts) == 2
+    
+    ai.enable_shadow("claude", "local", sample_rate=0.0)
+    await ai.ask_provider("claude", "unsampled")
+    assert ai.shadow_report()["claude"]["mirrored"] == 0
+
+
+async def test_failed_primary_calls_are_compared(make_ai):
+    """Test that primary failures are recorded as pairs and counted as primary errors"""
+    class FailingProvider(FakeProvider):
+        async def generate_response(self, prompt, **kwargs):
+            return AIResponse.failure("overloaded", provider=self.name, error_type="OverloadedError")
+    
+    ai = make_ai(FailingProvider("claude"), FakeProvider("local", reply="fine"))
+    ai.enable_shadow("claude", "local", sample_rate=1.0)
+    
+    await ai.ask_provider("claude", "hello")
+    await ai.drain_shadow()
+    
+    report = ai.shadow_report()["claude"]
+    assert report["pairs"] == 1 and report["unpaired"] == 0
+    assert report["primary_stats"]["errors"] == 1 and report["candidate_stats"]["errors"] == 0
+
+
+async def test_shadow_calls_are_scheduled_as_batch():
+    """Test that shadow calls wait in the candidate's scheduler at batch priority"""
+    provider = FakeProvider("claude")
+    ai = AIPowerhouse(Config(scheduler_concurrency=2))
+    ai.providers["claude"] = provider
+    ai.enable_shadow("claude", "claude:claude-next", sample_rate=1.0)
+    
+    await ai.ask_provider("claude", "hello", priority=INTERACTIVE)
+    await ai.drain_shadow()
+    
+    classes = ai.scheduler_report()["claude"]["classes"]
+    assert classes[INTERACTIVE]["completed"] == 1 and classes[BATCH]["completed"] == 1
+    assert provider.options[1]["model"] == "claude-next"
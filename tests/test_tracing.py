@@ -0,0 +1,89 @@
+"""
+Tests for tracing spans and trace context propagation
+"""
+
+import json
+
+import pytest
+
+from ai_powerhouse import tracing
+from ai_powerhouse.agents import Agent
+from tests.conftest import FakeProvider
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracing.configure(str(path))
+    yield path
+    tracing.configure(None)
+
+
+def read_spans(path):
+    tracing.flush()
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource in json.loads(line)["resourceSpans"]:
+            for scope in resource["scopeSpans"]:
+                spans.extend(scope["spans"])
+    return {span["name"]: span for span in spans}
+
+
+def attributes(span):
+    return {item["key"]: next(iter(item["value"].values())) for item in span["attributes"]}
+
+
+def test_span_is_a_no_op_when_disabled():
+    """Test that spans cost nothing and export nothing while tracing is off"""
+    assert not tracing.enabled()
+    with tracing.span("anything") as span:
+        span.set_attribute("key", "value")
+    assert tracing.child_env() is None
+
+
+async def test_agent_and_provider_spans_nest_in_one_trace(trace_file, make_ai):
+    """Test that provider calls are client spans under the agent that made them"""
+    ai = make_ai(FakeProvider("fake", reply="looks fine"), FakeProvider("broken", reply=RuntimeError("boom")))
+    
+    with tracing.span("root"):
+        await Agent("review", "You review code").ask(ai, "check this", provider="fake")
+        with pytest.raises(RuntimeError):
+            await ai.ask_provider("broken", "hi")
+    
+    spans = read_spans(trace_file)
+    root, agent, chat = spans["root"], spans["agent review"], spans["chat fake"]
+    assert {root["traceId"], agent["traceId"], chat["traceId"]} == {root["traceId"]}
+    assert agent["parentSpanId"] == root["spanId"]
+    assert chat["parentSpanId"] == agent["spanId"]
+    assert chat["kind"] == tracing.KINDS["client"]
+    assert attributes(chat)["gen_ai.system"] == "fake"
+    assert attributes(chat)["gen_ai.usage.output_tokens"] == "2"
+    assert chat["status"]["code"] == tracing.STATUS_UNSET
+    assert spans["chat broken"]["status"]["code"] == tracing.STATUS_ERROR
+
+
+def test_child_env_propagates_the_current_span(trace_file, monkeypatch):
+    """Test that a child process environment continues the trace into the same file"""
+    with tracing.span("bridge") as span:
+        env = tracing.child_env({})
+    
+    assert env[tracing.TRACE_FILE_ENV] == str(trace_file)
+    assert tracing.parse_traceparent(env[tracing.TRACEPARENT_ENV]) == (span.trace_id, span.span_id)
+    
+    # A process started with that environment joins the trace
+    monkeypatch.setenv(tracing.TRACEPARENT_ENV, env[tracing.TRACEPARENT_ENV])
+    with tracing.span("child") as child:
+        pass
+    assert (child.trace_id, child.parent_id) == (span.trace_id, span.span_id)
+
+
+def test_malformed_traceparent_starts_a_new_trace(trace_file, monkeypatch):
+    """Test that a bad TRACEPARENT is ignored"""
+    monkeypatch.setenv(tracing.TRACEPARENT_ENV, "not-a-traceparent")
+    with pytest.raises(ValueError):
+        with tracing.span("failing") as span:
+            raise ValueError("bad input")
+    
+    assert span.parent_id is None and len(span.trace_id) == 32
+    exported = read_spans(trace_file)["failing"]
+    assert exported["status"] == {"code": tracing.STATUS_ERROR, "message": "bad input"}